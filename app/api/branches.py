@@ -1,16 +1,19 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List
-from app.domain.schemas import ForkReq, ForkRes, SetActiveBranchReq, BranchOut
+from app.domain.schemas import ForkReq, ForkRes, SetActiveBranchReq, BranchOut, SessionTreeOut
 from app.domain.services.version_control import VersionControl
-from app.db.repos.branch import BranchRepo
-from app.db.repos.session import SessionRepo
 from app.db.repos.utterance import UtteranceRepo
-from app.db.repos.replay_event_repo import ReplayEventRepo
+from app.core.container import get_container
 
 router = APIRouter()
 
 def get_vc():
-    return VersionControl(BranchRepo(), SessionRepo())
+    return get_container().vc
+
+def get_utterance_repo():
+    return get_container().utterance_repo
 
 @router.post("/sessions/{session_id}/fork", response_model=ForkRes)
 async def fork_branch(session_id: str, req: ForkReq, vc: VersionControl = Depends(get_vc)):
@@ -33,19 +36,41 @@ async def set_active_branch(session_id: str, req: SetActiveBranchReq, vc: Versio
 async def list_branches(session_id: str, vc: VersionControl = Depends(get_vc)):
     return await vc.list_branches(session_id)
 
+@router.get("/sessions/{session_id}/tree", response_model=SessionTreeOut)
+async def get_session_tree(
+    session_id: str,
+    vc: VersionControl = Depends(get_vc),
+    utterance_repo: UtteranceRepo = Depends(get_utterance_repo)
+):
+    """Whole branch tree with per-branch utterance counts."""
+    counts = await utterance_repo.count_by_branch(session_id)
+    tree = await vc.get_session_tree(session_id, counts)
+    if not tree.branches:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return tree
+
+
+def get_materialize_service():
+    # Shares cached prefix segments with the transcript endpoints
+    return get_container().materialize_service
 
 @router.get("/sessions/{session_id}/branches/{branch_id}/materialized_timeline")
 async def get_materialized_timeline(
     session_id: str, 
     branch_id: str,
-    branch_repo: BranchRepo = Depends(BranchRepo),
-    utterance_repo: UtteranceRepo = Depends(UtteranceRepo),
-    replay_event_repo: ReplayEventRepo = Depends(ReplayEventRepo)
+    service = Depends(get_materialize_service)
 ):
-    from app.domain.services.transcript_resolver import TranscriptResolver
-    from app.domain.services.materialize_timeline import MaterializeTimelineService
-    
-    resolver = TranscriptResolver(branch_repo, utterance_repo)
-    service = MaterializeTimelineService(branch_repo, utterance_repo, replay_event_repo, resolver)
-    
     return await service.get_materialized_timeline(session_id, branch_id)
+
+@router.get("/sessions/{session_id}/branches/{branch_id}/materialized_timeline/stream")
+async def stream_materialized_timeline(
+    session_id: str, 
+    branch_id: str,
+    service = Depends(get_materialize_service)
+):
+    """Materialized timeline as NDJSON, one item per line, for very long timelines."""
+    async def lines():
+        async for item in service.iter_materialized_timeline(session_id, branch_id):
+            yield json.dumps(item) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
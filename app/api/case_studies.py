@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.domain.schemas import CaseStudyCreate, CaseStudyOut
 from app.db.repos.case_study import CaseStudyRepo
+from app.core.container import get_container
 
 router = APIRouter()
 
 def get_repo():
-    return CaseStudyRepo()
+    return get_container().case_study_repo
 
 @router.post("/case-studies", response_model=CaseStudyOut)
 async def create_case_study(cs: CaseStudyCreate, repo: CaseStudyRepo = Depends(get_repo)):
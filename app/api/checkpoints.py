@@ -3,11 +3,15 @@ from typing import List
 from app.domain.schemas import CheckpointOut
 from app.domain.services.checkpointing import Checkpointing
 from app.db.repos.checkpoint import CheckpointRepo
+from app.core.container import get_container
 
 router = APIRouter()
 
 def get_checkpointing():
-    return Checkpointing(CheckpointRepo())
+    return get_container().checkpointing
+
+def get_checkpoint_repo():
+    return get_container().checkpoint_repo
 
 @router.get("/sessions/{session_id}/branches/{branch_id}/checkpoints", response_model=List[CheckpointOut])
 async def list_checkpoints(session_id: str, branch_id: str, cp: Checkpointing = Depends(get_checkpointing)):
@@ -18,7 +22,7 @@ async def get_checkpoint_by_utterance(
     session_id: str, 
     branch_id: str, 
     at_utterance_id: str, 
-    repo: CheckpointRepo = Depends(CheckpointRepo)
+    repo: CheckpointRepo = Depends(get_checkpoint_repo)
 ):
     ckpt = await repo.get_by_utterance(session_id, branch_id, at_utterance_id)
     if not ckpt:
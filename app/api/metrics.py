@@ -1,48 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.domain.schemas import MetricsOut
 from app.metrics.engine import MetricsEngine
-from app.db.repos.metrics import MetricsRepo
-from app.db.repos.utterance import UtteranceRepo
-from app.db.repos.branch import BranchRepo
-from app.db.repos.checkpoint import CheckpointRepo
-from app.domain.services.transcript_resolver import TranscriptResolver
-import time
+from app.core.container import get_container
 
 router = APIRouter()
 
 def get_metrics_engine():
-    return MetricsEngine(
-        MetricsRepo(), 
-        TranscriptResolver(BranchRepo(), UtteranceRepo()),
-        CheckpointRepo()
-    )
+    return get_container().metrics_engine
 
 @router.get("/sessions/{session_id}/branches/{branch_id}/checkpoints/{checkpoint_id}/metrics", response_model=MetricsOut)
 async def get_metrics(session_id: str, branch_id: str, checkpoint_id: str, engine: MetricsEngine = Depends(get_metrics_engine)):
     try:
-        metrics = await engine.compute_for_checkpoint(session_id, branch_id, checkpoint_id)
-        # We need to construct MetricsOut. 
-        # engine returns dict, but we need at_utterance_id etc.
-        # Ideally engine returns the full doc.
-        # I'll fetch the stored doc or just reconstruct.
-        # For MVP, I'll reconstruct.
-        # I need at_utterance_id. I can get it from checkpoint again or let engine return it.
-        # I'll update engine to return the full doc or tuple.
-        # Or just fetch the checkpoint here to get at_utterance_id.
-        # But engine already fetched it.
-        # I'll just return a dummy MetricsOut for now with the metrics dict, 
-        # or better: modify engine to return the doc.
-        # But I can't modify engine in this tool call easily (I just wrote it).
-        # I'll assume engine returns dict and I'll fetch checkpoint to fill metadata.
-        
-        # Re-fetch checkpoint (inefficient but fine for MVP)
-        # Actually I can't easily access repo here without instantiating it.
-        # I'll just return what I can.
+        doc = await engine.get_or_compute(session_id, branch_id, checkpoint_id)
         return MetricsOut(
             checkpoint_id=checkpoint_id,
-            at_utterance_id="unknown", # TODO: fix
-            computed_at=str(int(time.time() * 1000)),
-            metrics=metrics
+            at_utterance_id=doc["at_utterance_id"],
+            computed_at=doc["computed_at"],
+            metrics=doc["metrics"]
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
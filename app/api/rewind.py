@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.domain.schemas import RewindReq, ContinueFromRewindReq, InterveneRes, RewindToReq, RewindPlanRes, ReplayUtteranceView
 from app.db.repos.session import SessionRepo
-from app.db.repos.utterance import UtteranceRepo
 from app.domain.services.version_control import VersionControl
-from app.domain.services.transcript_resolver import TranscriptResolver
+from app.domain.services.rewind_service import RewindService
 from app.api.branches import get_vc
 from app.db.repos.checkpoint import CheckpointRepo
-from app.db.repos.branch import BranchRepo
-from app.db.repos.replay_event_repo import ReplayEventRepo
+from app.core.container import get_container
 import uuid
 
 router = APIRouter()
 
+def get_session_repo():
+    return get_container().session_repo
+
+def get_checkpoint_repo():
+    return get_container().checkpoint_repo
+
+def get_rewind_service():
+    return get_container().rewind_service
+
 @router.post("/sessions/{session_id}/rewind")
-async def rewind(session_id: str, req: RewindReq, session_repo: SessionRepo = Depends(SessionRepo)):
+async def rewind(session_id: str, req: RewindReq, session_repo: SessionRepo = Depends(get_session_repo)):
     # Verify checkpoint exists? Optional.
     await session_repo.update(session_id, {
         "playhead": {
@@ -28,8 +35,8 @@ async def continue_from_rewind(
     session_id: str, 
     req: ContinueFromRewindReq, 
     vc: VersionControl = Depends(get_vc),
-    session_repo: SessionRepo = Depends(SessionRepo),
-    checkpoint_repo: CheckpointRepo = Depends(CheckpointRepo)
+    session_repo: SessionRepo = Depends(get_session_repo),
+    checkpoint_repo: CheckpointRepo = Depends(get_checkpoint_repo)
 ):
     # Get playhead
     session = await session_repo.get(session_id)
@@ -68,15 +75,8 @@ async def continue_from_rewind(
 async def rewind_plan(
     session_id: str,
     req: RewindToReq,
-    vc: VersionControl = Depends(get_vc),
-    checkpoint_repo: CheckpointRepo = Depends(CheckpointRepo),
-    utterance_repo: UtteranceRepo = Depends(UtteranceRepo),
-    branch_repo: BranchRepo = Depends(BranchRepo),
-    replay_event_repo: ReplayEventRepo = Depends(ReplayEventRepo)
+    service: RewindService = Depends(get_rewind_service)
 ):
-    from app.domain.services.rewind_service import RewindService
-    service = RewindService(vc, checkpoint_repo, utterance_repo, branch_repo, replay_event_repo)
-    
     try:
         return await service.create_rewind_plan(
             session_id, req.branch_id, req.target_utterance_id, req.created_by
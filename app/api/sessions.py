@@ -1,165 +1,75 @@
-import asyncio
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import logging
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
 from app.domain.schemas import SessionStartReq, SessionStartRes
 from app.domain.services.session_manager import SessionManager
-from app.db.repos.session import SessionRepo
-from app.db.repos.branch import BranchRepo
-from app.db.repos.utterance import UtteranceRepo
-from app.db.repos.case_study import CaseStudyRepo
+from app.core.config import settings
+from app.core.container import get_container
+from app.livekit.host import conductor_host, HostFullError
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# Global registry of active simulation tasks
-# In a real production app with multiple workers, this would need Redis/Celery
-active_simulations: dict[str, asyncio.Task] = {}
+# Host API calls are rare (start/stop); don't hang a request on a dead host
+HOST_TIMEOUT_S = 10.0
 
 def get_session_manager():
-    return SessionManager(SessionRepo(), BranchRepo(), UtteranceRepo(), CaseStudyRepo())
+    return get_container().session_manager
 
 @router.post("/sessions/start", response_model=SessionStartRes)
 async def start_session(
-    req: SessionStartReq, 
+    req: SessionStartReq,
     mgr: SessionManager = Depends(get_session_manager)
 ):
+    # Refuse before creating the session if we already know there's no room
+    if not settings.CONDUCTOR_HOST_URL and conductor_host.full:
+        raise HTTPException(status_code=503, detail="Conductor host is full")
     try:
         res = await mgr.start_session(req)
-        
-        # Spawn Conductor and Agents in background
-        # We use asyncio.create_task to keep a reference for cancellation
-        task = asyncio.create_task(spawn_simulation(res.session_id, res.active_branch_id, res.room_name))
-        active_simulations[res.session_id] = task
-        
-        # Cleanup callback
-        def on_done(t):
-            if res.session_id in active_simulations:
-                del active_simulations[res.session_id]
-        task.add_done_callback(on_done)
-        
+        # Conductor and agents run on the conductor host
+        await launch_simulation(res.session_id, res.active_branch_id, res.room_name)
         return res
+    except HostFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/sessions/{session_id}/stop")
 async def stop_session(session_id: str):
-    if session_id not in active_simulations:
-        # It might have already finished or never started
-        return {"status": "already_stopped"}
-    
-    task = active_simulations[session_id]
-    task.cancel()
-    try:
-        await task
-    except asyncio.CancelledError:
-        pass
-    
-    return {"status": "stopped"}
+    return {"status": await halt_simulation(session_id)}
 
-from app.livekit.conductor import Conductor
-from app.livekit.speaker_worker import SpeakerWorker
-from app.transcription.worker import TranscriptionWorker
-from app.core.config import settings
-from app.domain.services.conductor_writer import ConductorWriter
-from app.metrics.engine import MetricsEngine
-from app.domain.services.transcript_resolver import TranscriptResolver
-from app.db.repos.session import SessionRepo
-from app.db.repos.branch import BranchRepo
-from app.db.repos.utterance import UtteranceRepo
-from app.db.repos.checkpoint import CheckpointRepo
-from app.db.repos.metrics import MetricsRepo
-from app.livekit.tokens import create_token, VideoGrants
-import logging
-
-logger = logging.getLogger(__name__)
-
-async def spawn_simulation(session_id: str, branch_id: str, room_name: str):
-    logger.info(f"Spawning simulation for session {session_id}")
-
-    # 1. Init Repos
-    session_repo = SessionRepo()
-    branch_repo = BranchRepo()
-    utterance_repo = UtteranceRepo()
-    checkpoint_repo = CheckpointRepo()
-    metrics_repo = MetricsRepo()
-
-    # 2. Init Services
-    resolver = TranscriptResolver(branch_repo, utterance_repo)
-    writer = ConductorWriter(session_repo, branch_repo, utterance_repo, checkpoint_repo, resolver)
-    metrics = MetricsEngine(metrics_repo, utterance_repo, resolver)
-    
-    # Rewind Support (Epic 5)
-    from app.domain.services.rewind_service import RewindService
-    from app.domain.services.version_control import VersionControl
-    from app.db.repos.replay_event_repo import ReplayEventRepo
-    
-    vc = VersionControl(branch_repo, session_repo)
-    replay_event_repo = ReplayEventRepo()
-    rewind_service = RewindService(vc, checkpoint_repo, utterance_repo, branch_repo, replay_event_repo)
-    
-    conductor = Conductor(writer, metrics, resolver, rewind_service, replay_event_repo)
-    
-    # 2. Connect Conductor
-    token = create_token(
-        settings.LIVEKIT_API_KEY, 
-        settings.LIVEKIT_API_SECRET, 
-        room_name, 
-        "conductor-bot", 
-        VideoGrants(room_join=True, room_admin=True, room=room_name)
-    )
-    # Conductor will auto-transition to PLAYING_SEED on connect
-    
-    # 3. Init Workers
-    # Transcription Worker (Dedicated STT)
-    from app.domain.services.stt_service import STTService
-    stt_service = STTService() # Uses OpenAI by default
-    transcription_worker = TranscriptionWorker(stt_service)
-    
-    # Connect Conductor & Workers
-    # We need to run them concurrently.
-    # The Conductor's run loop is the main "keep alive".
-    
-    # Start Transcription Worker
-    t_token = create_token(
-        settings.LIVEKIT_API_KEY, 
-        settings.LIVEKIT_API_SECRET, 
-        room_name, 
-        "transcription-worker", 
-        VideoGrants(room_join=True, room=room_name)
-    )
-    await transcription_worker.connect(settings.LIVEKIT_URL, t_token)
-    
-    await conductor.connect(settings.LIVEKIT_URL, token, session_id, branch_id)
-    
-    # 3. Connect Agents (Dumb Speakers)
-    agents = []
-    voice_map = {
-        "alice": {"voice": "nova"},
-        "bob": {"voice": "onyx"}, 
-        "charlie": {"voice": "echo"}
-    }
-    for name in ["alice", "bob", "charlie"]:
-        agent = SpeakerWorker(name, voice_map.get(name, {}))
-        agent_token = create_token(
-            settings.LIVEKIT_API_KEY, 
-            settings.LIVEKIT_API_SECRET, 
-            room_name, 
-            name, 
-            VideoGrants(room_join=True, room=room_name)
-        )
-        await agent.connect(settings.LIVEKIT_URL, agent_token)
-        agents.append(agent)
-
-    # 4. (Removed) Start Seed Playback - handled by Conductor State Machine
+async def launch_simulation(session_id: str, branch_id: str, room_name: str):
+    """Start the session's conductor here or on the dedicated host (CONDUCTOR_HOST_URL)."""
+    if not settings.CONDUCTOR_HOST_URL:
+        await conductor_host.start_session(session_id, branch_id, room_name)
+        return
+    async with httpx.AsyncClient(base_url=settings.CONDUCTOR_HOST_URL, timeout=HOST_TIMEOUT_S) as client:
+        r = await client.post("/sessions", json={
+            "session_id": session_id, "branch_id": branch_id, "room_name": room_name
+        })
+    if r.status_code == 503:
+        raise HostFullError(r.json().get("detail", "Conductor host is full"))
+    r.raise_for_status()
 
+async def halt_simulation(session_id: str) -> str:
+    """
+    Stop the session on whichever host owns it: here, over the owner's
+    advertised URL, or failing that on the owner's next lease heartbeat.
+    """
+    registry = get_container().session_registry
+    lease = await registry.get(session_id)
+    if lease is None or lease.owner == conductor_host.host_id:
+        # It might have already finished or never started
+        return "stopped" if await conductor_host.stop_session(session_id) else "already_stopped"
 
-    # Keep alive (simple loop for prototype)
-    try:
-        while True:
-            await asyncio.sleep(1)
-    except asyncio.CancelledError:
-        logger.info("Simulation stopped")
-    finally:
-        logger.info("Cleaning up resources...")
-        await conductor.disconnect()
-        await transcription_worker.disconnect()
-        for a in agents:
-            await a.disconnect()
+    await registry.request_stop(session_id)
+    if lease.owner_url:
+        try:
+            async with httpx.AsyncClient(base_url=lease.owner_url, timeout=HOST_TIMEOUT_S) as client:
+                r = await client.post(f"/sessions/{session_id}/stop")
+            r.raise_for_status()
+            return r.json().get("status", "stopped")
+        except httpx.HTTPError as e:
+            logger.warning(f"Stop of session {session_id} via {lease.owner_url} failed ({e}); "
+                           f"its owner will stop it on its next heartbeat")
+    return "stopping"
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.domain.schemas import TranscriptViewOut
 from app.domain.services.transcript_resolver import TranscriptResolver
-from app.db.repos.branch import BranchRepo
-from app.db.repos.utterance import UtteranceRepo
+from app.domain.services.transcript_cache import transcript_cache
+from app.core.container import get_container
 
 router = APIRouter()
 
 def get_resolver():
-    return TranscriptResolver(BranchRepo(), UtteranceRepo())
+    return get_container().resolver
 
 @router.get("/sessions/{session_id}/branches/{branch_id}/transcript", response_model=TranscriptViewOut)
 async def get_transcript(session_id: str, branch_id: str, resolver: TranscriptResolver = Depends(get_resolver)):
     return await resolver.get_transcript_view(session_id, branch_id)
+
+@router.get("/internal/transcript-cache/stats")
+async def get_transcript_cache_stats():
+    return transcript_cache.stats()
@@ -1,20 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from app.domain.services.conductor_writer import ConductorWriter
-from app.db.repos.session import SessionRepo
-from app.db.repos.branch import BranchRepo
-from app.db.repos.utterance import UtteranceRepo
-from app.db.repos.checkpoint import CheckpointRepo
-from app.domain.services.transcript_resolver import TranscriptResolver
+from typing import Dict, Any, List, Optional
+from app.domain.services.conductor_writer import ConductorWriter, TurnCommit
+from app.core.container import get_container
 
 router = APIRouter()
 
 def get_writer():
-    return ConductorWriter(
-        SessionRepo(), BranchRepo(), UtteranceRepo(), CheckpointRepo(),
-        TranscriptResolver(BranchRepo(), UtteranceRepo())
-    )
+    return get_container().writer
 
 class AppendReq(BaseModel):
     branch_id: str
@@ -25,6 +18,9 @@ class AppendReq(BaseModel):
     state_snapshot: Dict[str, Any]
     event_id: str
 
+class AppendBatchReq(BaseModel):
+    turns: List[AppendReq]
+
 @router.post("/internal/sessions/{session_id}/append")
 async def append_utterance(session_id: str, req: AppendReq, writer: ConductorWriter = Depends(get_writer)):
     try:
@@ -33,3 +29,13 @@ async def append_utterance(session_id: str, req: AppendReq, writer: ConductorWri
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/internal/sessions/{session_id}/append-batch")
+async def append_batch(session_id: str, req: AppendBatchReq, writer: ConductorWriter = Depends(get_writer)):
+    try:
+        return await writer.append_batch(session_id, [
+            TurnCommit(t.branch_id, t.kind, t.speaker_id, t.text, t.timing, t.state_snapshot, t.event_id)
+            for t in req.turns
+        ])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -9,11 +9,91 @@ load_dotenv(".env.local")
 class Settings(BaseSettings):
     MONGO_URI: str
     MONGO_DB: str = "sim"
+    # Motor connection pool
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_CONNECT_TIMEOUT_MS: int = 20000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = None
+    # Create collection indexes on app startup
+    MONGO_CREATE_INDEXES: bool = True
     LIVEKIT_URL: str
     LIVEKIT_API_KEY: str
     LIVEKIT_API_SECRET: str
     OPENAI_API_KEY: Optional[str] = None
     ELEVEN_API_KEY: Optional[str] = None
+    # Process-wide LLM gateway: concurrent provider calls overall and per
+    # session, attempts per call, and the retry budget (retries allowed as
+    # a fraction of calls, plus a floor per second)
+    LLM_MAX_CONCURRENT: int = 32
+    LLM_MAX_CONCURRENT_PER_SESSION: int = 4
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BUDGET_RATIO: float = 0.1
+    LLM_RETRY_BUDGET_MIN_PER_S: float = 1.0
+    # AI providers: "openai", or "fake" for in-process stand-ins (load tests).
+    # TTS_BACKEND also takes "elevenlabs".
+    LLM_BACKEND: str = "openai"
+    STT_BACKEND: str = "openai"
+    TTS_BACKEND: str = "openai"
+    # Fake backends: mean latencies (LLM time-to-first-token, STT result,
+    # TTS first chunk), their distribution (fixed | uniform | normal |
+    # lognormal) and spread as a fraction of the mean, streaming rate,
+    # speech rate, share of LLM calls failing with a retryable error,
+    # scripted LLM outputs (JSON list) and RNG seed
+    FAKE_LLM_LATENCY_MS: int = 400
+    FAKE_STT_LATENCY_MS: int = 300
+    FAKE_TTS_LATENCY_MS: int = 150
+    FAKE_LATENCY_DIST: str = "lognormal"
+    FAKE_LATENCY_JITTER: float = 0.3
+    FAKE_TOKEN_INTERVAL_MS: int = 15
+    FAKE_TTS_MS_PER_WORD: int = 350
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_SCRIPT_PATH: Optional[str] = None
+    FAKE_SEED: Optional[int] = None
+    # Prompt context: turns always kept verbatim, and how many aged-out
+    # turns to fold into the rolling summary at once
+    LLM_CONTEXT_RECENT_TURNS: int = 10
+    LLM_SUMMARY_BATCH_TURNS: int = 8
+    # Stream live-loop planning and start speaking on the first sentence
+    LLM_STREAM_PLANNING: bool = True
+    # Speculative planning tree: concurrent LLM calls, and likely speakers
+    # to write a line for besides the director's call (only while the LLM
+    # gateway has slots to spare)
+    SPEC_MAX_CONCURRENT_CALLS: int = 3
+    SPEC_TOP_K_SPEAKERS: int = 1
+    # Have speakers pre-synthesize speculated turns (PREPARE_CMD)
+    SPEC_PREPARE_AUDIO: bool = True
+
+    # Conductor host: sessions one host runs at once, loop steps slower than
+    # this are logged against their session, and the URL of a dedicated host
+    # process (app.host_main); unset runs sessions inside the API process
+    CONDUCTOR_MAX_SESSIONS: int = 50
+    CONDUCTOR_SLOW_STEP_MS: int = 50
+    CONDUCTOR_HOST_URL: Optional[str] = None
+    # Run a session's AI speakers on one LiveKit connection (one track each)
+    # instead of one connection per speaker
+    SPEAKER_POOL: bool = False
+    # Conductor packets go only to the participants that use them (speaker
+    # commands to the speaker and the frontend, STOP to the active speaker,
+    # clock and UI updates to the frontend); this mirrors every packet to
+    # the whole room instead, for observers that want the full stream
+    CONDUCTOR_BROADCAST_MIRROR: bool = False
+    # Session registry shared by API and host processes: "mongo", or
+    # "memory" for a single process. Hosts renew their session leases every
+    # TTL/3; a host that misses a TTL loses its sessions to other hosts.
+    # A host's id defaults to hostname-pid, and its advertised URL lets the
+    # API route stops to it directly
+    SESSION_REGISTRY: str = "mongo"
+    SESSION_LEASE_TTL_S: float = 15.0
+    CONDUCTOR_HOST_ID: Optional[str] = None
+    CONDUCTOR_ADVERTISE_URL: Optional[str] = None
+
+    # In-process transcript view cache budget (bytes, estimated)
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Sessions whose branch tree is kept in memory
+    BRANCH_TREE_MAX_SESSIONS: int = 256
 
     model_config = SettingsConfigDict(env_file=".env.local", extra="ignore")
 
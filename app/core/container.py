@@ -0,0 +1,85 @@
+from typing import Optional
+from app.db.repos.session import SessionRepo
+from app.db.repos.branch import BranchRepo
+from app.db.repos.utterance import UtteranceRepo
+from app.db.repos.checkpoint import CheckpointRepo
+from app.db.repos.metrics import MetricsRepo
+from app.db.repos.replay_event_repo import ReplayEventRepo
+from app.db.repos.case_study import CaseStudyRepo
+from app.domain.services.transcript_cache import transcript_cache
+from app.domain.services.branch_tree import branch_trees
+from app.domain.services.llm_gateway import llm_gateway
+from app.domain.services.session_registry import get_session_registry
+from app.domain.services.transcript_resolver import TranscriptResolver
+from app.domain.services.version_control import VersionControl
+from app.domain.services.conductor_writer import ConductorWriter
+from app.domain.services.checkpointing import Checkpointing
+from app.domain.services.session_manager import SessionManager
+from app.domain.services.rewind_service import RewindService
+from app.domain.services.materialize_timeline import MaterializeTimelineService
+from app.metrics.engine import MetricsEngine
+
+
+class ServiceContainer:
+    """
+    Repos and services shared by every request and simulation, so that the
+    in-process caches behind them (transcript segments, branch trees) are
+    actually reused. Services are stateless apart from those caches.
+    """
+    def __init__(self):
+        # Repos
+        self.session_repo = SessionRepo()
+        self.branch_repo = BranchRepo()
+        self.utterance_repo = UtteranceRepo()
+        self.checkpoint_repo = CheckpointRepo()
+        self.metrics_repo = MetricsRepo()
+        self.replay_event_repo = ReplayEventRepo()
+        self.case_study_repo = CaseStudyRepo()
+
+        # Caches
+        self.transcript_cache = transcript_cache
+        self.branch_trees = branch_trees
+        self.llm_gateway = llm_gateway
+
+        # Which conductor host owns which session (SESSION_REGISTRY)
+        self.session_registry = get_session_registry()
+
+        # Services
+        self.resolver = TranscriptResolver(
+            self.branch_repo, self.utterance_repo, self.session_repo, self.transcript_cache
+        )
+        self.vc = VersionControl(self.branch_repo, self.session_repo, self.branch_trees)
+        self.writer = ConductorWriter(
+            self.session_repo, self.branch_repo, self.utterance_repo, self.checkpoint_repo, self.resolver
+        )
+        self.metrics_engine = MetricsEngine(self.metrics_repo, self.resolver, self.checkpoint_repo)
+        self.checkpointing = Checkpointing(self.checkpoint_repo)
+        self.session_manager = SessionManager(
+            self.session_repo, self.branch_repo, self.utterance_repo, self.case_study_repo
+        )
+        self.rewind_service = RewindService(
+            self.vc, self.checkpoint_repo, self.utterance_repo, self.branch_repo, self.replay_event_repo, self.resolver
+        )
+        self.materialize_service = MaterializeTimelineService(
+            self.branch_repo, self.utterance_repo, self.replay_event_repo, self.resolver
+        )
+
+
+_container: Optional[ServiceContainer] = None
+
+
+def init_container() -> ServiceContainer:
+    """Build the container (called from the app lifespan hook)."""
+    global _container
+    _container = ServiceContainer()
+    return _container
+
+
+def get_container() -> ServiceContainer:
+    # Built lazily when the lifespan hook hasn't run (scripts, bare test clients)
+    return _container or init_container()
+
+
+def reset_container() -> None:
+    global _container
+    _container = None
@@ -0,0 +1,84 @@
+from typing import Any, Dict, Iterable
+
+
+class LatencyHistogram:
+    """Counts in fixed log-spaced millisecond buckets."""
+    BOUNDS_MS = (25, 50, 100, 200, 400, 800, 1600, 3200, 6400, 12800)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        i = 0
+        while i < len(self.BOUNDS_MS) and ms > self.BOUNDS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th quantile (max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.BOUNDS_MS[i]) if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class PhaseTimer:
+    """
+    Latency histograms per named phase of a loop, plus the phases of the
+    iteration in progress (for a one-line log per iteration).
+    """
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.current: Dict[str, float] = {}
+
+    def observe(self, phase: str, ms: float) -> None:
+        hist = self.histograms.get(phase)
+        if hist is None:
+            hist = self.histograms[phase] = LatencyHistogram()
+        hist.observe(ms)
+        self.current[phase] = self.current.get(phase, 0.0) + ms
+
+    def reset_current(self) -> Dict[str, float]:
+        current, self.current = self.current, {}
+        return current
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {phase: h.snapshot() for phase, h in self.histograms.items()}
+
+    @staticmethod
+    def combined(timers: Iterable["PhaseTimer"]) -> Dict[str, LatencyHistogram]:
+        """Per-phase histograms summed over several timers (e.g. all sessions)."""
+        out: Dict[str, LatencyHistogram] = {}
+        for timer in timers:
+            for phase, h in timer.histograms.items():
+                out.setdefault(phase, LatencyHistogram()).merge(h)
+        return out
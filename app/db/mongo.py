@@ -1,5 +1,129 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+import threading
+from typing import Any, Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
 from app.core.config import settings
 
-_client = AsyncIOMotorClient(settings.MONGO_URI)
-db = _client[settings.MONGO_DB]
+logger = logging.getLogger(__name__)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters fed by pymongo's CMAP events.
+    Events fire on driver threads, hence the lock.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0 # Connections currently open
+        self.checked_out = 0 # Connections currently in use
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "utilization": self.checked_out / settings.MONGO_MAX_POOL_SIZE if settings.MONGO_MAX_POOL_SIZE else 0.0,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears
+            }
+
+
+pool_stats = PoolStats()
+
+
+def create_client() -> AsyncIOMotorClient:
+    # Motor connects lazily; nothing is opened until the first operation
+    return AsyncIOMotorClient(
+        settings.MONGO_URI,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=[pool_stats]
+    )
+
+
+# Set by connect() from the app lifespan hook; closed again by close()
+_client: Optional[AsyncIOMotorClient] = None
+db: Optional[AsyncIOMotorDatabase] = None
+
+
+def connect() -> AsyncIOMotorDatabase:
+    """Create the client and database handle (called from the app lifespan hook)."""
+    global _client, db
+    if db is None:
+        _client = create_client()
+        db = _client[settings.MONGO_DB]
+    return db
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    # Connects on first use when the lifespan hook hasn't run (scripts, workers)
+    return db if db is not None else connect()
+
+
+async def ensure_indexes() -> None:
+    """Create indexes for every repo. Failures are logged, not raised."""
+    from app.db.repos.branch import BranchRepo
+    from app.db.repos.utterance import UtteranceRepo
+    from app.db.repos.checkpoint import CheckpointRepo
+    from app.db.repos.metrics import MetricsRepo
+    from app.db.repos.replay_event_repo import ReplayEventRepo
+    from app.db.repos.session_lease import SessionLeaseRepo
+
+    for repo_cls in [BranchRepo, UtteranceRepo, CheckpointRepo, MetricsRepo, ReplayEventRepo, SessionLeaseRepo]:
+        try:
+            await repo_cls().ensure_indexes()
+        except Exception as e:
+            logger.error(f"Index creation failed for {repo_cls.__name__}: {e}")
+
+
+def close() -> None:
+    global _client, db
+    if _client is not None:
+        _client.close()
+    _client = None
+    db = None
@@ -1,6 +1,7 @@
 from app.db.repos.base import BaseRepo
 from typing import Any, Dict, List, Optional
 import pymongo
+from pymongo import ReturnDocument
 
 class BranchRepo(BaseRepo):
     def __init__(self):
@@ -16,6 +17,49 @@ class BranchRepo(BaseRepo):
     async def get(self, branch_id: str) -> Optional[Dict[str, Any]]:
         return await self.col.find_one({"_id": branch_id})
 
-    async def list_by_session(self, session_id: str) -> List[Dict[str, Any]]:
-        cursor = self.col.find({"session_id": session_id})
+    async def update(self, branch_id: str, update_dict: Dict[str, Any]) -> None:
+        await self.col.update_one({"_id": branch_id}, {"$set": update_dict})
+
+    async def allocate_seq(self, branch_id: str, utterance_id: str, count: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        Atomically reserve the next `count` seq_in_branch values and record
+        utterance_id as the branch tail. Returns the branch as it was BEFORE
+        the update (so seq_counter + 1 is the first allocated seq and
+        last_utterance_id is the previous tail), or None if the branch has no
+        counter yet.
+        """
+        return await self.col.find_one_and_update(
+            {"_id": branch_id, "seq_counter": {"$exists": True}},
+            {"$inc": {"seq_counter": count}, "$set": {"last_utterance_id": utterance_id}},
+            projection={
+                "seq_counter": 1, "last_utterance_id": 1, "parent_branch_id": 1,
+                "fork_from_utterance_id": 1, "fork_display_prefix": 1, "base_metrics": 1,
+                "last_seed_utterance_id": 1
+            },
+            return_document=ReturnDocument.BEFORE
+        )
+
+    async def release_seq(self, branch_id: str, utterance_id: str, prev_utterance_id: Optional[str],
+                          count: int = 1) -> bool:
+        """
+        Hand back seqs reserved by allocate_seq whose utterances were never
+        written, restoring the previous tail. Only applies while utterance_id
+        is still the tail (nobody allocated since); returns whether it did.
+        """
+        branch = await self.col.find_one_and_update(
+            {"_id": branch_id, "last_utterance_id": utterance_id},
+            {"$inc": {"seq_counter": -count}, "$set": {"last_utterance_id": prev_utterance_id}},
+            projection={"_id": 1}
+        )
+        return branch is not None
+
+    async def init_seq_counter(self, branch_id: str, seq: int, last_utterance_id: Optional[str]) -> None:
+        """Seed the counter for branches created before it existed (no-op if already set)."""
+        await self.col.update_one(
+            {"_id": branch_id, "seq_counter": {"$exists": False}},
+            {"$set": {"seq_counter": seq, "last_utterance_id": last_utterance_id}}
+        )
+
+    async def list_by_session(self, session_id: str, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self.col.find({"session_id": session_id}, projection)
         return await cursor.to_list(None)
@@ -10,11 +10,25 @@ class CheckpointRepo(BaseRepo):
         await self.col.create_index(
             [("session_id", pymongo.ASCENDING), ("branch_id", pymongo.ASCENDING), ("at_utterance_id", pymongo.ASCENDING)]
         )
+        # Timeline-wide lookups ($in on at_utterance_id, see list_by_utterances)
+        await self.col.create_index(
+            [("session_id", pymongo.ASCENDING), ("at_utterance_id", pymongo.ASCENDING)]
+        )
 
     async def create(self, doc: Dict[str, Any]) -> Dict[str, Any]:
         await self.col.insert_one(doc)
         return doc
 
+    async def create_many(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if docs:
+            await self.col.insert_many(docs, ordered=True)
+        return docs
+
+    async def list_by_utterances(self, session_id: str, utterance_ids: List[str],
+                                 projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self.col.find({"session_id": session_id, "at_utterance_id": {"$in": utterance_ids}}, projection)
+        return await cursor.to_list(None)
+
     async def get_by_utterance(self, session_id: str, branch_id: str, utterance_id: str) -> Optional[Dict[str, Any]]:
         return await self.col.find_one({
             "session_id": session_id,
@@ -22,8 +36,8 @@ class CheckpointRepo(BaseRepo):
             "at_utterance_id": utterance_id
         })
 
-    async def list_by_branch(self, session_id: str, branch_id: str) -> List[Dict[str, Any]]:
-        cursor = self.col.find({"session_id": session_id, "branch_id": branch_id}).sort("created_at", pymongo.ASCENDING)
+    async def list_by_branch(self, session_id: str, branch_id: str, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self.col.find({"session_id": session_id, "branch_id": branch_id}, projection).sort("created_at", pymongo.ASCENDING)
         return await cursor.to_list(None)
 
     async def get_first(self, session_id: str, branch_id: str) -> Optional[Dict[str, Any]]:
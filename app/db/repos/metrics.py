@@ -15,6 +15,16 @@ class MetricsRepo(BaseRepo):
         await self.col.insert_one(doc)
         return doc
 
+    async def create_if_absent(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert metrics for a checkpoint unless present; returns the stored doc."""
+        key = {
+            "session_id": doc["session_id"],
+            "branch_id": doc["branch_id"],
+            "checkpoint_id": doc["checkpoint_id"]
+        }
+        await self.col.update_one(key, {"$setOnInsert": doc}, upsert=True)
+        return await self.col.find_one(key)
+
     async def get_by_checkpoint(self, session_id: str, branch_id: str, checkpoint_id: str) -> Optional[Dict[str, Any]]:
         return await self.col.find_one({
             "session_id": session_id,
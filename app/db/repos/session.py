@@ -1,5 +1,6 @@
 from app.db.repos.base import BaseRepo
 from typing import Any, Dict, Optional
+from pymongo import ReturnDocument
 
 class SessionRepo(BaseRepo):
     def __init__(self):
@@ -15,3 +16,17 @@ class SessionRepo(BaseRepo):
 
     async def update(self, session_id: str, update_dict: Dict[str, Any]) -> None:
         await self.col.update_one({"_id": session_id}, {"$set": update_dict})
+
+    async def bump_branches_version(self, session_id: str) -> int:
+        """Record that the session's branches changed; returns the new branches_version."""
+        doc = await self.col.find_one_and_update(
+            {"_id": session_id},
+            {"$inc": {"branches_version": 1}},
+            projection={"branches_version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return doc.get("branches_version", 0) if doc else 0
+
+    async def get_branches_version(self, session_id: str) -> int:
+        doc = await self.col.find_one({"_id": session_id}, projection={"branches_version": 1})
+        return doc.get("branches_version", 0) if doc else 0
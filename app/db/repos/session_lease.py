@@ -0,0 +1,64 @@
+from app.db.repos.base import BaseRepo
+from typing import Any, Dict, List, Optional
+import pymongo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+class SessionLeaseRepo(BaseRepo):
+    """
+    One document per running session (_id = session_id) naming the conductor
+    host that owns it until `lease_expires_at` (epoch seconds). Every write
+    that changes owner is conditional, so two hosts never both win a lease.
+    """
+    def __init__(self):
+        super().__init__("session_leases")
+
+    async def ensure_indexes(self):
+        await self.col.create_index("owner")
+        await self.col.create_index("lease_expires_at")
+
+    async def insert(self, doc: Dict[str, Any]) -> bool:
+        try:
+            await self.col.insert_one(doc)
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def take_over(self, session_id: str, now: float, update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Take an expired lease on one session."""
+        return await self.col.find_one_and_update(
+            {"_id": session_id, "lease_expires_at": {"$lt": now}},
+            {"$set": update, "$inc": {"claims": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def take_any_expired(self, now: float, update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Take the longest-expired lease on a session nobody asked to stop."""
+        return await self.col.find_one_and_update(
+            {"lease_expires_at": {"$lt": now}, "stop_requested": False},
+            {"$set": update, "$inc": {"claims": 1}},
+            sort=[("lease_expires_at", pymongo.ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def renew(self, owner: str, session_ids: List[str], expires_at: float) -> List[Dict[str, Any]]:
+        """Extend the owner's leases; returns the ones it still holds."""
+        query = {"_id": {"$in": session_ids}, "owner": owner}
+        await self.col.update_many(query, {"$set": {"lease_expires_at": expires_at}})
+        return await self.col.find(query).to_list(None)
+
+    async def set_fields(self, session_id: str, owner: Optional[str], update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        query: Dict[str, Any] = {"_id": session_id}
+        if owner is not None:
+            query["owner"] = owner
+        return await self.col.find_one_and_update(query, {"$set": update}, return_document=ReturnDocument.AFTER)
+
+    async def delete(self, session_id: str, owner: str) -> None:
+        await self.col.delete_one({"_id": session_id, "owner": owner})
+
+    async def delete_expired_stopped(self, now: float) -> None:
+        # Stop was requested but the owner died before acting on it
+        await self.col.delete_many({"lease_expires_at": {"$lt": now}, "stop_requested": True})
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self.col.find_one({"_id": session_id})
@@ -2,6 +2,12 @@ from app.db.repos.base import BaseRepo
 from typing import Any, Dict, List, Optional
 import pymongo
 
+# Fields needed to resolve a transcript (skips meta, event_id, timestamps)
+TRANSCRIPT_PROJECTION = {
+    "branch_id": 1, "seq_in_branch": 1, "kind": 1, "speaker_id": 1,
+    "text": 1, "timing": 1, "audio": 1, "seed_idx": 1
+}
+
 class UtteranceRepo(BaseRepo):
     def __init__(self):
         super().__init__("utterances")
@@ -19,14 +25,72 @@ class UtteranceRepo(BaseRepo):
         await self.col.create_index(
             [("session_id", pymongo.ASCENDING), ("branch_id", pymongo.ASCENDING), ("kind", pymongo.ASCENDING), ("seed_idx", pymongo.ASCENDING)]
         )
+        # Writer idempotency (seeds have no event_id); event_ids are only
+        # unique within a session. Replaces the old global event_id index.
+        if "event_id_1" in await self.col.index_information():
+            await self.col.drop_index("event_id_1")
+        await self.col.create_index(
+            [("session_id", pymongo.ASCENDING), ("event_id", pymongo.ASCENDING)],
+            unique=True,
+            partialFilterExpression={"event_id": {"$type": "string"}}
+        )
 
     async def create(self, doc: Dict[str, Any]) -> Dict[str, Any]:
         await self.col.insert_one(doc)
         return doc
 
+    async def create_many(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if docs:
+            await self.col.insert_many(docs, ordered=True)
+        return docs
+
+    async def delete_many(self, utterance_ids: List[str]) -> None:
+        if utterance_ids:
+            await self.col.delete_many({"_id": {"$in": utterance_ids}})
+
     async def get(self, utterance_id: str) -> Optional[Dict[str, Any]]:
         return await self.col.find_one({"_id": utterance_id})
 
-    async def get_by_branch(self, session_id: str, branch_id: str) -> List[Dict[str, Any]]:
-        cursor = self.col.find({"session_id": session_id, "branch_id": branch_id}).sort("seq_in_branch", pymongo.ASCENDING)
+    async def get_many(self, utterance_ids: List[str], projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Utterances by id in one query (unordered)."""
+        cursor = self.col.find({"_id": {"$in": utterance_ids}}, projection)
+        return await cursor.to_list(None)
+
+    async def get_by_branch(self, session_id: str, branch_id: str, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self.col.find({"session_id": session_id, "branch_id": branch_id}, projection).sort("seq_in_branch", pymongo.ASCENDING)
+        return await cursor.to_list(None)
+
+    async def count_by_branch(self, session_id: str) -> Dict[str, int]:
+        """Utterance count of every branch in a session, in one aggregation."""
+        cursor = self.col.aggregate([
+            {"$match": {"session_id": session_id}},
+            {"$group": {"_id": "$branch_id", "count": {"$sum": 1}}}
+        ])
+        return {d["_id"]: d["count"] async for d in cursor}
+
+    async def get_by_event_ids(self, session_id: str, event_ids: List[str]) -> List[Dict[str, Any]]:
+        cursor = self.col.find({"session_id": session_id, "event_id": {"$in": event_ids}})
+        return await cursor.to_list(None)
+
+    async def get_last_in_branch(self, session_id: str, branch_id: str) -> Optional[Dict[str, Any]]:
+        return await self.col.find_one(
+            {"session_id": session_id, "branch_id": branch_id},
+            projection={"seq_in_branch": 1},
+            sort=[("seq_in_branch", pymongo.DESCENDING)]
+        )
+
+    async def get_by_branch_after(self, session_id: str, branch_id: str, after_seq: int,
+                                  projection: Optional[Dict[str, Any]] = TRANSCRIPT_PROJECTION) -> List[Dict[str, Any]]:
+        """Utterances appended to a branch after the given seq_in_branch."""
+        cursor = self.col.find({
+            "session_id": session_id,
+            "branch_id": branch_id,
+            "seq_in_branch": {"$gt": after_seq}
+        }, projection).sort("seq_in_branch", pymongo.ASCENDING)
+        return await cursor.to_list(None)
+
+    async def get_by_branches(self, session_id: str, branch_ids: List[str],
+                              projection: Optional[Dict[str, Any]] = TRANSCRIPT_PROJECTION) -> List[Dict[str, Any]]:
+        """Utterances of several branches in one query, ordered by seq_in_branch."""
+        cursor = self.col.find({"session_id": session_id, "branch_id": {"$in": branch_ids}}, projection).sort("seq_in_branch", pymongo.ASCENDING)
         return await cursor.to_list(None)
@@ -0,0 +1,53 @@
+from typing import Any, Dict, Optional
+from app.domain.schemas import UtteranceView, Timing, AudioRef
+
+
+class UtteranceRow:
+    """
+    Lean, slotted decode of a trusted utterance document.
+    Built without Pydantic validation for internal hot paths (transcript
+    resolution, metrics); to_view() builds the API model once, on demand.
+    """
+    __slots__ = ("utterance_id", "branch_id", "seq_in_branch", "kind", "speaker_id",
+                 "text", "timing", "audio", "display_id", "_view")
+
+    def __init__(self, utterance_id: str, branch_id: Optional[str], seq_in_branch: int, kind: str,
+                 speaker_id: Optional[str], text: str, timing: Dict[str, Any], audio: Dict[str, Any],
+                 display_id: str):
+        self.utterance_id = utterance_id
+        self.branch_id = branch_id
+        self.seq_in_branch = seq_in_branch
+        self.kind = kind
+        self.speaker_id = speaker_id
+        self.text = text
+        self.timing = timing
+        self.audio = audio
+        self.display_id = display_id
+        self._view: Optional[UtteranceView] = None
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any], display_id: str) -> "UtteranceRow":
+        return cls(
+            doc["_id"],
+            doc.get("branch_id"),
+            doc.get("seq_in_branch", 0),
+            doc.get("kind"),
+            doc.get("speaker_id"),
+            doc.get("text", ""),
+            doc.get("timing") or {},
+            doc.get("audio") or {},
+            display_id
+        )
+
+    def to_view(self) -> UtteranceView:
+        if self._view is None:
+            self._view = UtteranceView(
+                utterance_id=self.utterance_id,
+                speaker_id=self.speaker_id,
+                kind=self.kind,
+                text=self.text,
+                timing=Timing(**self.timing),
+                audio=AudioRef(**self.audio),
+                display_id=self.display_id
+            )
+        return self._view
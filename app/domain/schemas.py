@@ -184,6 +184,18 @@ class BranchOut(BaseModel):
     created_at: Optional[str] = None
 
 
+class BranchTreeNodeOut(BranchOut):
+    depth: int = 0
+    children: List[str] = Field(default_factory=list)
+    utterance_count: int = 0
+
+
+class SessionTreeOut(BaseModel):
+    session_id: str
+    root_branch_ids: List[str]
+    branches: List[BranchTreeNodeOut]
+
+
 
 
 class TranscriptViewOut(BaseModel):
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+
+
+@dataclass
+class BranchNode:
+    branch_id: str
+    parent_branch_id: Optional[str]
+    fork_from_utterance_id: Optional[str]
+    fork_from_checkpoint_id: Optional[str]
+    branch_label: str
+    created_at: Optional[str]
+    depth: int = 0
+    children: List[str] = field(default_factory=list)
+
+
+class BranchTree:
+    """Parent -> children adjacency of one session's branches."""
+    def __init__(self, session_id: str, version: int = 0):
+        self.session_id = session_id
+        self.version = version # Session branches_version the tree reflects
+        self.nodes: Dict[str, BranchNode] = {}
+        self.roots: List[str] = []
+
+    @classmethod
+    def from_docs(cls, session_id: str, docs: List[Dict[str, Any]], version: int = 0) -> "BranchTree":
+        tree = cls(session_id, version)
+        for doc in sorted(docs, key=lambda d: d.get("created_at") or ""):
+            tree.nodes[doc["_id"]] = _node(doc)
+        for node in tree.nodes.values():
+            parent = tree.nodes.get(node.parent_branch_id) if node.parent_branch_id else None
+            if parent:
+                parent.children.append(node.branch_id)
+            else:
+                tree.roots.append(node.branch_id)
+        # Depths top-down from the roots
+        stack = [(root, 0) for root in tree.roots]
+        while stack:
+            branch_id, depth = stack.pop()
+            node = tree.nodes[branch_id]
+            node.depth = depth
+            stack.extend((child, depth + 1) for child in node.children)
+        return tree
+
+    def add(self, doc: Dict[str, Any]) -> BranchNode:
+        parent_id = doc.get("parent_branch_id")
+        parent = self.nodes.get(parent_id) if parent_id else None
+        node = _node(doc)
+        node.depth = parent.depth + 1 if parent else 0
+        self.nodes[node.branch_id] = node
+        if parent:
+            parent.children.append(node.branch_id)
+        else:
+            self.roots.append(node.branch_id)
+        return node
+
+    def ancestry(self, branch_id: str) -> List[BranchNode]:
+        """Root-to-self path of a branch."""
+        path = []
+        node = self.nodes.get(branch_id)
+        while node:
+            path.append(node)
+            node = self.nodes.get(node.parent_branch_id) if node.parent_branch_id else None
+        path.reverse()
+        return path
+
+
+def _node(doc: Dict[str, Any]) -> BranchNode:
+    return BranchNode(
+        branch_id=doc["_id"],
+        parent_branch_id=doc.get("parent_branch_id"),
+        fork_from_utterance_id=doc.get("fork_from_utterance_id"),
+        fork_from_checkpoint_id=doc.get("fork_from_checkpoint_id"),
+        branch_label=doc.get("branch_label", ""),
+        created_at=doc.get("created_at")
+    )
+
+
+class BranchTreeRegistry:
+    """
+    In-process branch trees keyed by session, built from one
+    list_by_session query and extended by VersionControl.fork_branch.
+    Branches may be forked by other processes (conductor hosts, other API
+    workers), so reads pass the session's current branches_version and a
+    tree built at another version is dropped. Least recently used sessions
+    are dropped past max_sessions.
+    """
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._trees: "OrderedDict[str, BranchTree]" = OrderedDict()
+
+    def get(self, session_id: str, version: int) -> Optional[BranchTree]:
+        tree = self._trees.get(session_id)
+        if tree is None:
+            return None
+        if tree.version != version:
+            del self._trees[session_id]
+            return None
+        self._trees.move_to_end(session_id)
+        return tree
+
+    def put(self, tree: BranchTree) -> None:
+        self._trees[tree.session_id] = tree
+        self._trees.move_to_end(tree.session_id)
+        while len(self._trees) > self.max_sessions:
+            self._trees.popitem(last=False)
+
+    def on_branch_created(self, session_id: str, doc: Dict[str, Any], version: int) -> None:
+        # Only extend trees already loaded; others are built on next read
+        tree = self._trees.get(session_id)
+        if tree is None:
+            return
+        if tree.version != version - 1:
+            # Missed a fork made elsewhere
+            self.invalidate(session_id)
+            return
+        if doc["_id"] not in tree.nodes:
+            tree.add(doc)
+        tree.version = version
+
+    def invalidate(self, session_id: str) -> None:
+        self._trees.pop(session_id, None)
+
+
+# Process-wide index shared by VersionControl instances
+branch_trees = BranchTreeRegistry(settings.BRANCH_TREE_MAX_SESSIONS)
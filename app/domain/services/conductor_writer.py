@@ -1,11 +1,32 @@
 import uuid
 import time
-from typing import Dict, Any, Optional
+import logging
+from dataclasses import dataclass
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import Dict, Any, List, Optional, Tuple
 from app.db.repos.session import SessionRepo
 from app.db.repos.branch import BranchRepo
 from app.db.repos.utterance import UtteranceRepo
 from app.db.repos.checkpoint import CheckpointRepo
-from app.domain.services.transcript_resolver import TranscriptResolver
+from app.domain.services.transcript_resolver import TranscriptResolver, display_id_for
+from app.metrics.running import fold_turn
+
+logger = logging.getLogger(__name__)
+
+def _is_duplicate_key(e: BulkWriteError) -> bool:
+    return any(err.get("code") == 11000 for err in e.details.get("writeErrors", []))
+
+@dataclass
+class TurnCommit:
+    """One queued turn for ConductorWriter.append_batch."""
+    branch_id: str
+    kind: str
+    speaker_id: Optional[str]
+    text: str
+    timing: Dict[str, int]
+    state_snapshot: Dict[str, Any]
+    event_id: str
+    audio_ref: Optional[Dict[str, Any]] = None
 
 class ConductorWriter:
     def __init__(self, session_repo: SessionRepo, branch_repo: BranchRepo, 
@@ -30,78 +51,309 @@ class ConductorWriter:
         audio_ref: Optional[Dict[str, Any]] = None
     ) -> Dict[str, str]:
         # 1. Idempotency check
-        existing = await self.utterance_repo.col.find_one({"event_id": event_id})
+        existing = await self.utterance_repo.col.find_one({"session_id": session_id, "event_id": event_id})
         if existing:
-            ckpt = await self.checkpoint_repo.get_by_utterance(session_id, branch_id, existing["_id"])
-            return {
-                "utterance_id": existing["_id"],
-                "checkpoint_id": ckpt["_id"] if ckpt else None,
-                "display_id": "existing" # Placeholder
-            }
+            return await self._existing_result(session_id, branch_id, existing)
 
         # 2. Get session
         session = await self.session_repo.get(session_id)
         if not session:
             raise ValueError("Session not found")
         
-        # 3. Determine seq_in_branch
-        utts = await self.utterance_repo.get_by_branch(session_id, branch_id)
-        if utts:
-            last_utt = utts[-1]
-            seq_in_branch = last_utt.get("seq_in_branch", 0) + 1
-            prev_id = last_utt["_id"]
-        else:
-            seq_in_branch = 1
-            prev_id = None
-            
         utterance_id = str(uuid.uuid4())
-        checkpoint_id = str(uuid.uuid4())
-        now_iso = str(int(time.time() * 1000))
+
+        # 3. Allocate seq_in_branch from the branch counter
+        branch = await self._allocate_seq(session_id, branch_id, utterance_id)
+        turn = TurnCommit(branch_id, kind, speaker_id, text, timing, state_snapshot, event_id, audio_ref)
+        running = await self._running_metrics_before(session_id, branch)
+        utt_doc, ckpt_doc = self._build_docs(
+            session_id, turn, utterance_id, branch["seq_counter"] + 1,
+            branch.get("last_utterance_id"), str(int(time.time() * 1000)), running
+        )
+        
+        # 4. Write
+        try:
+            await self.utterance_repo.create(utt_doc)
+        except DuplicateKeyError:
+            # Nothing was written: hand back the seq and tail reserved for it
+            # (unless someone allocated since), so the next turn doesn't chain
+            # onto an utterance that doesn't exist
+            await self.branch_repo.release_seq(branch_id, utterance_id, branch.get("last_utterance_id"))
+            # Lost a race on the unique (session_id, event_id) index; the other write wins
+            existing = await self.utterance_repo.col.find_one({"session_id": session_id, "event_id": event_id})
+            if not existing:
+                raise
+            return await self._existing_result(session_id, branch_id, existing)
+        await self.checkpoint_repo.create(ckpt_doc)
+        
+        await self.session_repo.col.update_one(
+            {"_id": session_id},
+            {"$inc": {"write_version": 1}}
+        )
         
+        # 5. Compute display_id from the branch's fork prefix
+        fork_prefix = await self._get_fork_display_prefix(branch)
+        display_id = display_id_for(utt_doc, fork_prefix)
+                
+        return {
+            "utterance_id": utterance_id,
+            "checkpoint_id": ckpt_doc["_id"],
+            "display_id": display_id
+        }
+
+    async def append_batch(self, session_id: str, turns: List[TurnCommit]) -> List[Dict[str, str]]:
+        """
+        Commit several turns with a fixed number of round trips: one
+        idempotency lookup, one counter $inc per branch, bulk inserts of
+        utterances and checkpoints, then a single write_version bump.
+        Turns keep their order within each branch. Returns one result per
+        turn, in input order.
+
+        Safe to retry after a partial failure: turns whose utterance landed
+        but whose checkpoint didn't get it written now, and a failed
+        utterance insert is taken back (documents and seqs) before raising.
+        """
+        if not turns:
+            return []
+        results: List[Optional[Dict[str, str]]] = [None] * len(turns)
+
+        # 1. Idempotency check for the whole batch
+        existing = {d["event_id"]: d for d in await self.utterance_repo.get_by_event_ids(session_id, [t.event_id for t in turns])}
+        ckpt_by_utt = {}
+        if existing:
+            ckpts = await self.checkpoint_repo.list_by_utterances(
+                session_id, [d["_id"] for d in existing.values()], projection={"at_utterance_id": 1}
+            )
+            ckpt_by_utt = {c["at_utterance_id"]: c for c in ckpts}
+
+        pending_by_branch: Dict[str, List[int]] = {}
+        first_by_event: Dict[str, int] = {}
+        unchecked: List[Tuple[int, Dict[str, Any]]] = [] # Written utterances missing their checkpoint
+        for i, turn in enumerate(turns):
+            if turn.event_id in first_by_event:
+                continue
+            first_by_event[turn.event_id] = i
+            prior = existing.get(turn.event_id)
+            if prior:
+                ckpt = ckpt_by_utt.get(prior["_id"])
+                results[i] = {
+                    "utterance_id": prior["_id"],
+                    "checkpoint_id": ckpt["_id"] if ckpt else None,
+                    "display_id": "existing" # Placeholder
+                }
+                if ckpt is None:
+                    unchecked.append((i, prior))
+            else:
+                pending_by_branch.setdefault(turn.branch_id, []).append(i)
+
+        # 2. Checkpoints an earlier attempt failed to write
+        ckpt_docs = []
+        for i, ckpt_doc in await self._missing_checkpoints(session_id, turns, unchecked):
+            results[i]["checkpoint_id"] = ckpt_doc["_id"]
+            ckpt_docs.append(ckpt_doc)
+
+        # 3. Allocate seqs per branch and build documents
+        now_iso = str(int(time.time() * 1000))
+        utt_docs = []
+        allocations: List[Tuple[str, str, Optional[str], int]] = []
+        for branch_id, idxs in pending_by_branch.items():
+            utterance_ids = [str(uuid.uuid4()) for _ in idxs]
+            branch = await self._allocate_seq(session_id, branch_id, utterance_ids[-1], count=len(idxs))
+            allocations.append((branch_id, utterance_ids[-1], branch.get("last_utterance_id"), len(idxs)))
+            fork_prefix = await self._get_fork_display_prefix(branch)
+            running = await self._running_metrics_before(session_id, branch)
+            seq = branch["seq_counter"]
+            prev_id = branch.get("last_utterance_id")
+            for i, utterance_id in zip(idxs, utterance_ids):
+                seq += 1
+                utt_doc, ckpt_doc = self._build_docs(session_id, turns[i], utterance_id, seq, prev_id, now_iso, running)
+                running = ckpt_doc["state"].get("metrics")
+                utt_docs.append(utt_doc)
+                ckpt_docs.append(ckpt_doc)
+                results[i] = {
+                    "utterance_id": utterance_id,
+                    "checkpoint_id": ckpt_doc["_id"],
+                    "display_id": display_id_for(utt_doc, fork_prefix)
+                }
+                prev_id = utterance_id
+
+        # 4. Write (version bump last, so cached readers only see complete turns)
+        if utt_docs:
+            try:
+                await self.utterance_repo.create_many(utt_docs)
+            except Exception as e:
+                await self._undo_inserts(session_id, utt_docs, allocations)
+                if isinstance(e, BulkWriteError) and _is_duplicate_key(e):
+                    # Lost a race on the unique (session_id, event_id) index; the other writes win
+                    return await self.append_batch(session_id, turns)
+                raise
+        if ckpt_docs:
+            await self.checkpoint_repo.create_many(ckpt_docs)
+        if utt_docs or existing:
+            # Bump on retries too: the failed attempt may have stopped short of it
+            await self.session_repo.col.update_one(
+                {"_id": session_id},
+                {"$inc": {"write_version": len(utt_docs) or 1}}
+            )
+
+        # Duplicate event_ids inside the batch resolve to the first occurrence
+        for i, turn in enumerate(turns):
+            if results[i] is None:
+                results[i] = results[first_by_event[turn.event_id]]
+        return results
+
+    async def _missing_checkpoints(self, session_id: str, turns: List[TurnCommit],
+                                   unchecked: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Checkpoints for utterances written without one, in branch order so
+        each continues the running metrics of the turn before it.
+        """
+        out = []
+        branches: Dict[str, Dict[str, Any]] = {}
+        metrics_by_utt: Dict[str, Optional[Dict[str, Any]]] = {}
+        for i, utt in sorted(unchecked, key=lambda u: (u[1]["branch_id"], u[1]["seq_in_branch"])):
+            branch_id = utt["branch_id"]
+            if branch_id not in branches:
+                branches[branch_id] = await self.branch_repo.get(branch_id)
+                if branches[branch_id] is None:
+                    raise ValueError("Branch not found")
+            prev_id = utt.get("prev_utterance_id")
+            if prev_id in metrics_by_utt:
+                running = metrics_by_utt[prev_id]
+            else:
+                running = await self._running_metrics_at(session_id, branches[branch_id], prev_id)
+            ckpt_doc = self._checkpoint_doc(
+                session_id, turns[i], utt["_id"], utt.get("created_at") or str(int(time.time() * 1000)), running
+            )
+            metrics_by_utt[utt["_id"]] = ckpt_doc["state"].get("metrics")
+            out.append((i, ckpt_doc))
+        return out
+
+    async def _undo_inserts(self, session_id: str, utt_docs: List[Dict[str, Any]],
+                            allocations: List[Tuple[str, str, Optional[str], int]]) -> None:
+        """
+        Take back a failed utterance insert: delete whatever of it landed,
+        then hand its seqs back (where nobody has allocated since). Cached
+        transcripts may have picked the rows up; trim_version makes them
+        reload rather than keep showing them.
+        """
+        try:
+            await self.utterance_repo.delete_many([d["_id"] for d in utt_docs])
+            await self.session_repo.col.update_one(
+                {"_id": session_id},
+                {"$inc": {"write_version": 1, "trim_version": 1}}
+            )
+            for branch_id, utterance_id, prev_id, count in allocations:
+                await self.branch_repo.release_seq(branch_id, utterance_id, prev_id, count)
+        except Exception as e:
+            logger.warning(f"Could not undo a failed turn insert: {e}")
+
+    @staticmethod
+    def _build_docs(session_id: str, turn: TurnCommit, utterance_id: str, seq_in_branch: int,
+                    prev_id: Optional[str], now_iso: str,
+                    running: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         utt_doc = {
             "_id": utterance_id,
             "session_id": session_id,
-            "branch_id": branch_id,
+            "branch_id": turn.branch_id,
             "prev_utterance_id": prev_id,
             "seq_in_branch": seq_in_branch,
-            "kind": kind,
-            "speaker_id": speaker_id,
-            "text": text,
-            "timing": timing,
-            "audio": audio_ref or {},
+            "kind": turn.kind,
+            "speaker_id": turn.speaker_id,
+            "text": turn.text,
+            "timing": turn.timing,
+            "audio": turn.audio_ref or {},
             "meta": {},
-            "event_id": event_id,
+            "event_id": turn.event_id,
             "created_at": now_iso
         }
         
-        ckpt_doc = {
-            "_id": checkpoint_id,
+        return utt_doc, ConductorWriter._checkpoint_doc(session_id, turn, utterance_id, now_iso, running)
+
+    @staticmethod
+    def _checkpoint_doc(session_id: str, turn: TurnCommit, utterance_id: str, now_iso: str,
+                        running: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        state = dict(turn.state_snapshot)
+        if running is not None:
+            # Running aggregates through this turn (see app.metrics.running)
+            state["metrics"] = fold_turn(running, turn.speaker_id, turn.timing)
+        
+        return {
+            "_id": str(uuid.uuid4()),
             "session_id": session_id,
-            "branch_id": branch_id,
+            "branch_id": turn.branch_id,
             "at_utterance_id": utterance_id,
             "created_at": now_iso,
-            "state": state_snapshot
+            "state": state
         }
-        
-        # 4. Write
-        await self.utterance_repo.create(utt_doc)
-        await self.checkpoint_repo.create(ckpt_doc)
-        
-        await self.session_repo.col.update_one(
-            {"_id": session_id},
-            {"$inc": {"write_version": 1}}
-        )
-        
-        # 5. Compute display_id
-        view = await self.transcript_resolver.get_transcript_view(session_id, branch_id)
-        display_id = "unknown"
-        for u in view.utterances:
-            if u.utterance_id == utterance_id:
-                display_id = u.display_id
-                break
-                
+
+    async def _existing_result(self, session_id: str, branch_id: str, existing: Dict[str, Any]) -> Dict[str, str]:
+        ckpt = await self.checkpoint_repo.get_by_utterance(session_id, branch_id, existing["_id"])
         return {
-            "utterance_id": utterance_id,
-            "checkpoint_id": checkpoint_id,
-            "display_id": display_id
+            "utterance_id": existing["_id"],
+            "checkpoint_id": ckpt["_id"] if ckpt else None,
+            "display_id": "existing" # Placeholder
         }
+
+    async def _allocate_seq(self, session_id: str, branch_id: str, utterance_id: str, count: int = 1) -> Dict[str, Any]:
+        branch = await self.branch_repo.allocate_seq(branch_id, utterance_id, count)
+        if branch is None:
+            # Branch predates the counter: seed it from the last stored utterance
+            last = await self.utterance_repo.get_last_in_branch(session_id, branch_id)
+            await self.branch_repo.init_seq_counter(
+                branch_id,
+                last.get("seq_in_branch", 0) if last else 0,
+                last["_id"] if last else None
+            )
+            branch = await self.branch_repo.allocate_seq(branch_id, utterance_id, count)
+        if branch is None:
+            raise ValueError("Branch not found")
+        return branch
+
+    async def _running_metrics_before(self, session_id: str, branch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Running metrics up to the branch tail."""
+        return await self._running_metrics_at(session_id, branch, branch.get("last_utterance_id"))
+
+    async def _running_metrics_at(self, session_id: str, branch: Dict[str, Any],
+                                  prev_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Running metrics through prev_id, the turn before the one being
+        written: its checkpoint, or for a fork's first turn the checkpoint at
+        the fork point. The root falls back to the seed aggregates stored on
+        the branch, but only while no live turn precedes (the anchor is the
+        last seed, or there is none). None if unknown (legacy data, or a
+        missing checkpoint), in which case no running metrics are written and
+        readers recompute them rather than inherit wrong ones.
+        """
+        anchor = prev_id
+        if anchor is None and branch.get("parent_branch_id"):
+            anchor = branch.get("fork_from_utterance_id")
+        if anchor:
+            ckpts = await self.checkpoint_repo.list_by_utterances(session_id, [anchor], projection={"state.metrics": 1})
+            if ckpts:
+                return ckpts[0].get("state", {}).get("metrics")
+        if branch.get("parent_branch_id"):
+            return None
+        if anchor is None or anchor == branch.get("last_seed_utterance_id"):
+            return branch.get("base_metrics")
+        return None
+
+    async def _get_fork_display_prefix(self, branch: Dict[str, Any]) -> Optional[str]:
+        """
+        Display id of the utterance this branch forked from (None for the root).
+        Computed once per branch and cached on the branch document.
+        """
+        if "fork_display_prefix" in branch:
+            return branch["fork_display_prefix"]
+
+        prefix = None
+        fork_from = branch.get("fork_from_utterance_id")
+        if branch.get("parent_branch_id") and fork_from:
+            fork_utt = await self.utterance_repo.get(fork_from)
+            if fork_utt:
+                owner = await self.branch_repo.get(fork_utt["branch_id"])
+                owner_prefix = await self._get_fork_display_prefix(owner) if owner else None
+                prefix = display_id_for(fork_utt, owner_prefix)
+
+        await self.branch_repo.update(branch["_id"], {"fork_display_prefix": prefix})
+        return prefix
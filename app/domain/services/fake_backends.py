@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import json
+import math
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.domain.services.llm_backend import LLMBackend, LLMChunk, Messages, Usage
+
+# In-process stand-ins for the OpenAI LLM, STT and TTS, selected with
+# LLM_BACKEND / STT_BACKEND / TTS_BACKEND = "fake". They cost nothing, need
+# no network and answer with realistic timing, so many simulated sessions
+# can run on one box to measure conductor throughput and gap latency.
+
+CHARS_PER_TOKEN = 4
+
+LINES = [
+    "I think we should look at the numbers first.",
+    "That's fair, but the team is already stretched.",
+    "Can we agree on what success looks like?",
+    "I'm not convinced this solves the real problem.",
+    "Let's try it for a month and review.",
+    "Who owns the follow-up on this?",
+    "We've tried something similar before and it stalled.",
+    "I'd like to hear how the customers see it.",
+]
+
+FACILITATOR_LINES = [
+    "Let's hear from someone who hasn't spoken yet.",
+    "Can you say more about that?",
+    "What would change your mind?",
+]
+
+
+@dataclass
+class Latency:
+    """A latency distribution in milliseconds; jitter is the standard deviation."""
+    mean_ms: float
+    jitter_ms: float = 0.0
+    dist: str = "lognormal" # fixed | uniform | normal | lognormal
+
+    def sample(self, rng: random.Random) -> float:
+        """One draw, in seconds."""
+        mean, sd = self.mean_ms, self.jitter_ms
+        if mean <= 0:
+            return 0.0
+        if sd <= 0 or self.dist == "fixed":
+            ms = mean
+        elif self.dist == "uniform":
+            ms = rng.uniform(mean - sd * math.sqrt(3), mean + sd * math.sqrt(3))
+        elif self.dist == "normal":
+            ms = rng.gauss(mean, sd)
+        elif self.dist == "lognormal":
+            # Parameterized so the draws have the given mean and sd (long right tail)
+            sigma2 = math.log(1 + (sd / mean) ** 2)
+            ms = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.dist}")
+        return max(0.0, ms) / 1000
+
+    @classmethod
+    def from_settings(cls, mean_ms: float) -> "Latency":
+        return cls(mean_ms, mean_ms * settings.FAKE_LATENCY_JITTER, settings.FAKE_LATENCY_DIST)
+
+
+def load_script(path: Optional[str]) -> Optional[List[Any]]:
+    """Scripted outputs: a JSON list of strings or objects, replayed in a loop."""
+    if not path:
+        return None
+    with open(path) as f:
+        script = json.load(f)
+    if not isinstance(script, list) or not script:
+        raise ValueError(f"Fake script {path} must be a non-empty JSON list")
+    return script
+
+
+class FakeLLMError(Exception):
+    """Injected transient failure (FAKE_LLM_ERROR_RATE), retryable like a 503."""
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Answers after a time-to-first-token drawn from `latency`, then one token
+    (CHARS_PER_TOKEN characters) per `token_interval_s`, streamed or not.
+    Replies come from `script` in order if given, else are made up from the
+    prompt: planning and decision calls get valid JSON naming one of the
+    active speakers (never the one who spoke last).
+
+    Usage is estimated from message sizes; a system message seen before
+    counts as cached, the way provider prompt caching would report it.
+    A share `error_rate` of calls fails with FakeLLMError before answering.
+    """
+    def __init__(self, latency: Latency, token_interval_s: float = 0.0,
+                 script: Optional[List[Any]] = None, seed: Optional[int] = None,
+                 error_rate: float = 0.0):
+        self.latency = latency
+        self.token_interval_s = token_interval_s
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self._script: Optional[Iterator[Any]] = itertools.cycle(script) if script else None
+        self._seen_prefixes = set()
+        self.stats = {"calls": 0, "streams": 0, "errors": 0}
+
+    @classmethod
+    def from_settings(cls) -> "FakeLLMBackend":
+        return cls(
+            Latency.from_settings(settings.FAKE_LLM_LATENCY_MS),
+            settings.FAKE_TOKEN_INTERVAL_MS / 1000,
+            load_script(settings.FAKE_SCRIPT_PATH),
+            settings.FAKE_SEED,
+            settings.FAKE_LLM_ERROR_RATE
+        )
+
+    async def complete(self, model: str, messages: Messages, json_mode: bool = False,
+                       temperature: float = 0.7) -> Tuple[str, Optional[Usage]]:
+        self.stats["calls"] += 1
+        text = self._reply(messages, json_mode)
+        await asyncio.sleep(self.latency.sample(self.rng) + self.token_interval_s * _tokens(text))
+        self._maybe_fail()
+        return text, self._usage(messages, text)
+
+    async def stream(self, model: str, messages: Messages, json_mode: bool = False,
+                     temperature: float = 0.7) -> AsyncIterator[LLMChunk]:
+        self.stats["streams"] += 1
+        text = self._reply(messages, json_mode)
+        await asyncio.sleep(self.latency.sample(self.rng))
+        self._maybe_fail()
+        for i in range(0, len(text), CHARS_PER_TOKEN):
+            if i and self.token_interval_s:
+                await asyncio.sleep(self.token_interval_s)
+            yield LLMChunk(text[i:i + CHARS_PER_TOKEN])
+        yield LLMChunk(usage=self._usage(messages, text))
+
+    def is_retryable(self, exc: Exception) -> bool:
+        return isinstance(exc, FakeLLMError)
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            raise FakeLLMError("Injected fake LLM failure")
+
+    def _reply(self, messages: Messages, json_mode: bool) -> str:
+        if self._script:
+            item = next(self._script)
+            return item if isinstance(item, str) else json.dumps(item)
+
+        system = messages[0]["content"] if messages else ""
+        user = messages[-1]["content"] if messages else ""
+        if not json_mode:
+            return self.rng.choice(LINES)
+
+        speaker_id = self._pick_speaker(system, user)
+        if "Who should speak next?" in user:
+            return json.dumps({"speaker_id": speaker_id, "reason": "fake"})
+        text = " ".join(self.rng.sample(LINES, 2))
+        return json.dumps({"speaker_id": speaker_id, "text": text, "reason": "fake"})
+
+    def _pick_speaker(self, system: str, user: str) -> str:
+        speakers = []
+        for line in system.splitlines():
+            if line.startswith("Active Speakers:"):
+                speakers = [s.strip() for s in line.split(":", 1)[1].split(",") if s.strip()]
+        if not speakers:
+            return "silence"
+        # Last line of the history block, e.g. "alice: ..."
+        history = user.rsplit("\n\n", 1)[0].splitlines()
+        last = history[-1].split(":", 1)[0].strip() if history else None
+        candidates = [s for s in speakers if s != last] or speakers
+        return self.rng.choice(candidates)
+
+    def _usage(self, messages: Messages, text: str) -> Usage:
+        prompt = sum(_tokens(m.get("content") or "") for m in messages)
+        cached = 0
+        if messages and messages[0].get("role") == "system":
+            prefix = messages[0]["content"]
+            if hash(prefix) in self._seen_prefixes:
+                cached = _tokens(prefix)
+            self._seen_prefixes.add(hash(prefix))
+        return Usage(prompt_tokens=prompt, cached_tokens=cached, completion_tokens=_tokens(text))
+
+
+class FakeSTTService:
+    """Drop-in for STTService: returns scripted facilitator lines after a delay."""
+    def __init__(self, latency: Latency, script: Optional[List[Any]] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self._script = itertools.cycle(script or FACILITATOR_LINES)
+
+    @classmethod
+    def from_settings(cls) -> "FakeSTTService":
+        return cls(Latency.from_settings(settings.FAKE_STT_LATENCY_MS), seed=settings.FAKE_SEED)
+
+    async def transcribe(self, audio_data: bytes, format: str = "wav", model: str = "whisper-1") -> str:
+        await asyncio.sleep(self.latency.sample(self.rng))
+        return str(next(self._script))
+
+
+class FakeTTS:
+    """
+    Drop-in for a livekit TTS plugin: synthesize() yields silent 20ms frames,
+    as much audio as the text would take to say at `ms_per_word`, after a
+    first-chunk delay. Playback pacing is left to the audio source, as with
+    a real plugin.
+    """
+    SAMPLE_RATE = 24000
+    FRAME_MS = 20
+
+    def __init__(self, latency: Latency, ms_per_word: float = 350, seed: Optional[int] = None):
+        self.latency = latency
+        self.ms_per_word = ms_per_word
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_settings(cls) -> "FakeTTS":
+        return cls(Latency.from_settings(settings.FAKE_TTS_LATENCY_MS), settings.FAKE_TTS_MS_PER_WORD, settings.FAKE_SEED)
+
+    async def synthesize(self, text: str):
+        from livekit import rtc
+
+        await asyncio.sleep(self.latency.sample(self.rng))
+        n_frames = max(1, int(len(text.split()) * self.ms_per_word / self.FRAME_MS))
+        samples = self.SAMPLE_RATE * self.FRAME_MS // 1000
+        for i in range(n_frames):
+            yield SimpleNamespace(frame=rtc.AudioFrame.create(self.SAMPLE_RATE, 1, samples))
+            if i % 50 == 49:
+                await asyncio.sleep(0) # Don't hog the loop on long lines
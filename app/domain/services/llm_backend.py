@@ -0,0 +1,104 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import openai
+from openai import AsyncOpenAI
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+@dataclass
+class Usage:
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass
+class LLMChunk:
+    """One streamed delta; the last chunk of a stream may carry only usage."""
+    text: str = ""
+    usage: Optional[Usage] = None
+
+
+class LLMBackend:
+    """
+    Chat-completion provider behind LLMService. Prompting, parsing and
+    fallbacks stay in the service; a backend only moves messages to a
+    model and text back.
+    """
+    async def complete(self, model: str, messages: Messages, json_mode: bool = False,
+                       temperature: float = 0.7) -> Tuple[str, Optional[Usage]]:
+        raise NotImplementedError
+
+    def stream(self, model: str, messages: Messages, json_mode: bool = False,
+               temperature: float = 0.7) -> AsyncIterator[LLMChunk]:
+        """Async generator of LLMChunk; closing it stops generation."""
+        raise NotImplementedError
+
+    def is_retryable(self, exc: Exception) -> bool:
+        """Transient failures (rate limits, timeouts, 5xx) worth another attempt."""
+        return False
+
+
+class OpenAIBackend(LLMBackend):
+    def __init__(self, max_retries: int = 2):
+        if not settings.OPENAI_API_KEY:
+            logger.warning("OPENAI_API_KEY not set. LLMService will fail.")
+        # max_retries=0 when the caller (LLMGateway) retries itself
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=max_retries)
+
+    async def complete(self, model: str, messages: Messages, json_mode: bool = False,
+                       temperature: float = 0.7) -> Tuple[str, Optional[Usage]]:
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = await self.client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, **kwargs
+        )
+        return response.choices[0].message.content, _usage(response.usage)
+
+    async def stream(self, model: str, messages: Messages, json_mode: bool = False,
+                     temperature: float = 0.7) -> AsyncIterator[LLMChunk]:
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        stream = await self.client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature,
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        try:
+            async for chunk in stream:
+                # Final chunk (no choices) carries the token counts
+                usage = _usage(getattr(chunk, "usage", None))
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text or usage:
+                    yield LLMChunk(text or "", usage)
+        finally:
+            # Stop generation if the caller stopped listening
+            await stream.close()
+
+    def is_retryable(self, exc: Exception) -> bool:
+        # APITimeoutError is an APIConnectionError
+        return isinstance(exc, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+
+def _usage(usage: Any) -> Optional[Usage]:
+    if not usage:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return Usage(
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        cached_tokens=(getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0
+    )
+
+
+def get_llm_backend(name: Optional[str] = None, max_retries: int = 2) -> LLMBackend:
+    """The backend named by LLM_BACKEND: "openai" or "fake"."""
+    name = name or settings.LLM_BACKEND
+    if name == "fake":
+        from app.domain.services.fake_backends import FakeLLMBackend
+        return FakeLLMBackend.from_settings()
+    if name == "openai":
+        return OpenAIBackend(max_retries=max_retries)
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PLAN_INSTRUCTIONS = (
+    "You are a conversation director and roleplayer. "
+    "1. Decide who speaks next based on history/personas (or 'silence'). "
+    "2. If someone speaks, generate their line (natural, concise, 1-2 sentences). "
+    "3. Output JSON with keys in this order: {\"speaker_id\": \"...\", \"text\": \"...\", \"reason\": \"...\"}"
+)
+
+DECIDE_INSTRUCTIONS = (
+    "You are a conversation director for a simulation. "
+    "Your job is to decide who should speak next based on the history and personas. "
+    "You can also choose 'silence' if it's natural for the conversation to pause or if the facilitator should intervene. "
+    "Output valid JSON only: {\"speaker_id\": \"<id>\", \"reason\": \"<chain_of_thought>\"}"
+)
+
+# (previous summary, lines to fold in) -> new summary
+Summarizer = Callable[[str, List[str]], Awaitable[str]]
+
+
+class ContextBuilder:
+    """
+    Builds chat messages whose front never changes within a session: the
+    system message (instructions, personas, case study) is rendered once,
+    so provider-side prompt caching can reuse it. History goes last, as a
+    rolling summary of older turns plus the recent turns verbatim.
+
+    The summary is folded forward in the background in batches, so the
+    call that needs a prompt never waits for it; turns not yet summarized
+    stay verbatim, so nothing drops out of context meanwhile.
+    """
+    def __init__(self, personas: Dict[str, str], active_speakers: List[str],
+                 case_study: Optional[str] = None, summarizer: Optional[Summarizer] = None,
+                 recent_turns: Optional[int] = None, summary_batch: Optional[int] = None):
+        self.personas = personas
+        self.active_speakers = active_speakers
+        self.case_study = case_study
+        self.summarizer = summarizer
+        self.recent_turns = settings.LLM_CONTEXT_RECENT_TURNS if recent_turns is None else recent_turns
+        self.summary_batch = settings.LLM_SUMMARY_BATCH_TURNS if summary_batch is None else summary_batch
+
+        self._prefixes: Dict[str, str] = {}
+        self.summary = ""
+        self.summarized_upto = 0 # history[:summarized_upto] is covered by the summary
+        self._summarized_key: Optional[int] = None # Fingerprint of that prefix
+        self._summary_task: Optional[asyncio.Task] = None
+
+    # Stable prefixes ----------------------------------------------------
+
+    def plan_system(self) -> str:
+        return self._prefix("plan", PLAN_INSTRUCTIONS)
+
+    def decide_system(self) -> str:
+        return self._prefix("decide", DECIDE_INSTRUCTIONS)
+
+    def speaker_system(self, speaker_id: str, persona: Optional[str] = None) -> str:
+        persona = self.personas.get(speaker_id, "") if persona is None else persona
+        instructions = (
+            f"You are {speaker_id}. Roleplay this persona accurately. "
+            f"Persona: {persona}\n"
+            "Keep your response natural, conversational, and concise (1-2 sentences). "
+            "Do not start with 'Alice:' or 'Bob:'. Just the text."
+        )
+        return self._prefix(f"speaker:{speaker_id}", instructions)
+
+    def _prefix(self, key: str, instructions: str) -> str:
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            parts = [
+                instructions,
+                f"Active Speakers: {', '.join(self.active_speakers)}",
+                # Compact and key-sorted so it serializes identically every time
+                "Personas:\n" + json.dumps(self.personas, sort_keys=True, separators=(",", ":"))
+            ]
+            if self.case_study:
+                parts.append(f"Case Study:\n{self.case_study}")
+            prefix = self._prefixes[key] = "\n\n".join(parts)
+        return prefix
+
+    # Variable suffix ----------------------------------------------------
+
+    def history_block(self, history: List[str]) -> str:
+        """Summary of older turns plus every turn it doesn't cover yet."""
+        self._check_summary(history)
+        self._maybe_summarize(history)
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of earlier conversation:\n{self.summary}")
+        parts.append("Recent History:\n" + "\n".join(history[self.summarized_upto:]))
+        return "\n\n".join(parts)
+
+    def _check_summary(self, history: List[str]) -> None:
+        # History was replaced (rewind, branch switch): the summary no longer applies
+        if self.summarized_upto and (
+            len(history) < self.summarized_upto
+            or hash(tuple(history[:self.summarized_upto])) != self._summarized_key
+        ):
+            self.reset_summary()
+
+    def _maybe_summarize(self, history: List[str]) -> None:
+        if not self.summarizer or (self._summary_task and not self._summary_task.done()):
+            return
+        aged_out = len(history) - self.recent_turns - self.summarized_upto
+        if aged_out < self.summary_batch:
+            return
+        upto = self.summarized_upto + aged_out
+        self._summary_task = asyncio.create_task(self._summarize(list(history[:upto]), self.summarized_upto))
+
+    async def _summarize(self, prefix: List[str], start: int) -> None:
+        try:
+            summary = await self.summarizer(self.summary, prefix[start:])
+        except Exception as e:
+            logger.error(f"History summarization failed: {e}")
+            return
+        # Ignore the result if the history was reset meanwhile
+        if self.summarized_upto == start:
+            self.summary = summary
+            self.summarized_upto = len(prefix)
+            self._summarized_key = hash(tuple(prefix))
+            logger.info(f"Rolling summary now covers {len(prefix)} turns")
+
+    def reset_summary(self) -> None:
+        if self._summary_task:
+            self._summary_task.cancel()
+        self.summary = ""
+        self.summarized_upto = 0
+        self._summarized_key = None
@@ -0,0 +1,365 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.timing import LatencyHistogram
+from app.domain.services.llm_backend import LLMBackend, LLMChunk, Messages, Usage, get_llm_backend
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries to a fraction of recent calls: each call
+    deposits `ratio`, each retry withdraws one, and `min_per_s` trickles in
+    so a quiet process can still retry. When the provider is down, retries
+    stop instead of multiplying the load.
+    """
+    def __init__(self, ratio: float, min_per_s: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_s = min_per_s
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._t = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._t) * self.min_per_s)
+        self._t = now
+
+    def deposit(self) -> None:
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+# Marks the end of a stream in the queue between _pump and its reader
+_STREAM_END = object()
+
+
+class _Inflight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+
+class LLMGateway:
+    """
+    Process-wide front for the LLM backend, shared by every session:
+
+    - One backend (one client and connection pool) for the process.
+    - At most `max_concurrent` calls in flight, at most `per_session` per
+      session; the waiting session with the fewest calls in flight goes
+      next, so one busy session can't starve the rest.
+    - Identical in-flight completions from a session (same model and
+      messages, which carry the history) share one call. A stream for a
+      prompt that is already being completed waits for that result.
+    - Transient failures are retried with jittered exponential backoff,
+      within a process-wide RetryBudget.
+    - A stream holds its slot until the provider has sent the whole
+      response, however slowly the caller reads it.
+    - Latency histograms for queueing, completions and streams.
+    """
+    def __init__(self, backend: Optional[LLMBackend] = None, max_concurrent: Optional[int] = None,
+                 per_session: Optional[int] = None, max_attempts: Optional[int] = None,
+                 retry_budget: Optional[RetryBudget] = None, backoff_base_s: float = 0.25,
+                 backoff_max_s: float = 4.0):
+        self._backend = backend
+        self.max_concurrent = max_concurrent or settings.LLM_MAX_CONCURRENT
+        self.per_session = per_session or settings.LLM_MAX_CONCURRENT_PER_SESSION
+        self.max_attempts = max_attempts or settings.LLM_MAX_ATTEMPTS
+        self.retry_budget = retry_budget or RetryBudget(settings.LLM_RETRY_BUDGET_RATIO, settings.LLM_RETRY_BUDGET_MIN_PER_S)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+        # Fair scheduling
+        self._active = 0
+        self._by_session: Dict[str, int] = {}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque() # Sessions with waiters, in round-robin order
+
+        self._inflight: Dict[str, _Inflight] = {}
+
+        # Telemetry
+        self.stats: Dict[str, int] = {
+            "calls": 0, "streams": 0, "coalesced": 0, "retries": 0,
+            "retries_denied": 0, "errors": 0
+        }
+        self.histograms: Dict[str, LatencyHistogram] = {
+            "queue_wait": LatencyHistogram(),
+            "complete": LatencyHistogram(),
+            "stream_first_token": LatencyHistogram(),
+            "stream_total": LatencyHistogram()
+        }
+
+    @property
+    def backend(self) -> LLMBackend:
+        if self._backend is None:
+            # The gateway retries, so the SDK shouldn't as well
+            self._backend = get_llm_backend(max_retries=0)
+        return self._backend
+
+    def client(self, session_id: Optional[str]) -> "GatewayBackend":
+        """An LLMBackend whose calls go through the gateway on behalf of a session."""
+        return GatewayBackend(self, session_id or "")
+
+    # Calls --------------------------------------------------------------
+
+    async def complete(self, session_id: str, model: str, messages: Messages, json_mode: bool = False,
+                       temperature: float = 0.7) -> Tuple[str, Optional[Usage]]:
+        key = self._key(session_id, model, messages, json_mode, temperature)
+        entry = self._inflight.get(key)
+        owner = entry is None or entry.abandoned
+        if owner:
+            entry = self._inflight[key] = _Inflight(asyncio.create_task(
+                self._complete(session_id, model, messages, json_mode, temperature)
+            ))
+            entry.task.add_done_callback(lambda _, e=entry: self._forget(key, e))
+        else:
+            self.stats["coalesced"] += 1
+        entry.waiters += 1
+        try:
+            text, usage = await asyncio.shield(entry.task)
+            # Tokens were spent once; only the caller that started the call reports them
+            return text, usage if owner else None
+        finally:
+            entry.waiters -= 1
+            # Nobody wants the result any more: stop the call
+            if entry.waiters == 0 and not entry.task.done():
+                entry.abandoned = True
+                entry.task.cancel()
+
+    async def _complete(self, session_id: str, model: str, messages: Messages, json_mode: bool,
+                        temperature: float) -> Tuple[str, Optional[Usage]]:
+        self.stats["calls"] += 1
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            async with self._slot(session_id):
+                t0 = time.perf_counter()
+                try:
+                    result = await self.backend.complete(model, messages, json_mode, temperature)
+                    self.histograms["complete"].observe((time.perf_counter() - t0) * 1000)
+                    return result
+                except Exception as e:
+                    error = e
+            await self._before_retry(error, attempt)
+            attempt += 1
+
+    async def stream(self, session_id: str, model: str, messages: Messages, json_mode: bool = False,
+                     temperature: float = 0.7) -> AsyncIterator[LLMChunk]:
+        key = self._key(session_id, model, messages, json_mode, temperature)
+        entry = self._inflight.get(key)
+        if entry and not entry.abandoned:
+            text, _ = await self.complete(session_id, model, messages, json_mode, temperature)
+            yield LLMChunk(text) # Usage is reported by the original call
+            return
+
+        self.stats["streams"] += 1
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            chunks: asyncio.Queue = asyncio.Queue()
+            pump = asyncio.create_task(self._pump(session_id, model, messages, json_mode, temperature, chunks))
+            started = False
+            try:
+                while True:
+                    item = await chunks.get()
+                    if item is _STREAM_END:
+                        return
+                    if isinstance(item, Exception):
+                        # Text already went out: a retry can't take it back
+                        if started:
+                            self.stats["errors"] += 1
+                            raise item
+                        error = item
+                        break
+                    started = True
+                    yield item
+            finally:
+                # Caller stopped reading: stop the upstream response too
+                pump.cancel()
+            await self._before_retry(error, attempt)
+            attempt += 1
+
+    async def _pump(self, session_id: str, model: str, messages: Messages, json_mode: bool,
+                    temperature: float, out: asyncio.Queue) -> None:
+        """
+        Read one upstream stream into `out`, ending with _STREAM_END or the
+        error. The slot is held while the provider streams, not while the
+        caller reads, so a slow consumer doesn't block other calls.
+        """
+        async with self._slot(session_id):
+            t0 = time.perf_counter()
+            started = False
+            chunks = self.backend.stream(model, messages, json_mode, temperature)
+            try:
+                async for chunk in chunks:
+                    if not started:
+                        started = True
+                        self.histograms["stream_first_token"].observe((time.perf_counter() - t0) * 1000)
+                    out.put_nowait(chunk)
+                self.histograms["stream_total"].observe((time.perf_counter() - t0) * 1000)
+                out.put_nowait(_STREAM_END)
+            except Exception as e:
+                out.put_nowait(e)
+            finally:
+                await chunks.aclose()
+
+    async def _before_retry(self, error: Exception, attempt: int) -> None:
+        """Back off before another attempt, or re-raise if the error is final."""
+        if attempt >= self.max_attempts or not self.backend.is_retryable(error):
+            self.stats["errors"] += 1
+            raise error
+        if not self.retry_budget.try_withdraw():
+            self.stats["retries_denied"] += 1
+            self.stats["errors"] += 1
+            raise error
+        self.stats["retries"] += 1
+        delay = random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt))
+        logger.warning(f"LLM call failed ({error}); retry {attempt} in {delay * 1000:.0f}ms")
+        await asyncio.sleep(delay)
+
+    def _forget(self, key: str, entry: _Inflight) -> None:
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+    @staticmethod
+    def _key(session_id: str, model: str, messages: Messages, json_mode: bool, temperature: float) -> str:
+        raw = json.dumps([session_id, model, messages, json_mode, temperature], sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # Scheduling ---------------------------------------------------------
+
+    @asynccontextmanager
+    async def _slot(self, session_id: str):
+        t0 = time.perf_counter()
+        await self._acquire(session_id)
+        self.histograms["queue_wait"].observe((time.perf_counter() - t0) * 1000)
+        try:
+            yield
+        finally:
+            self._release(session_id)
+
+    def spare(self, session_id: Optional[str] = None) -> int:
+        """Calls that could start now without queueing (for a session, if given)."""
+        free = self.max_concurrent - self._active - sum(len(q) for q in self._waiters.values())
+        if session_id is not None:
+            free = min(free, self.per_session - self._by_session.get(session_id, 0) - len(self._waiters.get(session_id, ())))
+        return max(free, 0)
+
+    def _can_run(self, session_id: str) -> bool:
+        return self._active < self.max_concurrent and self._by_session.get(session_id, 0) < self.per_session
+
+    async def _acquire(self, session_id: str) -> None:
+        # Queued calls of the same session go first
+        if session_id not in self._waiters and self._can_run(session_id):
+            self._take(session_id)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        queue = self._waiters.get(session_id)
+        if queue is None:
+            queue = self._waiters[session_id] = deque()
+            self._turns.append(session_id)
+        queue.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self._release(session_id)
+            elif fut in self._waiters.get(session_id, ()):
+                queue = self._waiters[session_id]
+                queue.remove(fut)
+                if not queue:
+                    del self._waiters[session_id]
+                    self._turns.remove(session_id)
+            raise
+
+    def _take(self, session_id: str) -> None:
+        self._active += 1
+        self._by_session[session_id] = self._by_session.get(session_id, 0) + 1
+
+    def _release(self, session_id: str) -> None:
+        self._active -= 1
+        n = self._by_session.get(session_id, 0) - 1
+        if n > 0:
+            self._by_session[session_id] = n
+        else:
+            self._by_session.pop(session_id, None)
+        self._grant()
+
+    def _grant(self) -> None:
+        # The waiting session with the fewest calls in flight goes next
+        # (ties in queue order), skipping sessions at their cap
+        while self._turns and self._active < self.max_concurrent:
+            eligible = None
+            for session_id in list(self._turns):
+                queue = self._waiters[session_id]
+                # Drop waiters cancelled but not yet woken to clean up
+                while queue and queue[0].done():
+                    queue.popleft()
+                if not queue:
+                    del self._waiters[session_id]
+                    self._turns.remove(session_id)
+                elif self._by_session.get(session_id, 0) < self.per_session and (
+                    eligible is None or self._by_session.get(session_id, 0) < self._by_session.get(eligible, 0)
+                ):
+                    eligible = session_id
+            if eligible is None:
+                return
+            queue = self._waiters[eligible]
+            self._take(eligible)
+            queue.popleft().set_result(None)
+            # Back of the line for its next call
+            self._turns.remove(eligible)
+            if queue:
+                self._turns.append(eligible)
+            else:
+                del self._waiters[eligible]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self._active,
+            "waiting": sum(len(q) for q in self._waiters.values()),
+            "sessions_waiting": len(self._waiters),
+            "retry_tokens": round(self.retry_budget.tokens, 2),
+            "histograms": {name: h.snapshot() for name, h in self.histograms.items()}
+        }
+
+
+class GatewayBackend(LLMBackend):
+    """A session's view of the LLMGateway, usable wherever an LLMBackend is."""
+    def __init__(self, gateway: LLMGateway, session_id: str):
+        self.gateway = gateway
+        self.session_id = session_id
+
+    async def complete(self, model: str, messages: Messages, json_mode: bool = False,
+                       temperature: float = 0.7) -> Tuple[str, Optional[Usage]]:
+        return await self.gateway.complete(self.session_id, model, messages, json_mode, temperature)
+
+    def stream(self, model: str, messages: Messages, json_mode: bool = False,
+               temperature: float = 0.7) -> AsyncIterator[LLMChunk]:
+        return self.gateway.stream(self.session_id, model, messages, json_mode, temperature)
+
+    def is_retryable(self, exc: Exception) -> bool:
+        return self.gateway.backend.is_retryable(exc)
+
+
+# Shared by every session in the process
+llm_gateway = LLMGateway()
@@ -1,52 +1,43 @@
 import json
 import logging
-from typing import List, Dict, Optional
-from openai import AsyncOpenAI
-from app.core.config import settings
+from typing import Any, AsyncIterator, List, Dict, Optional
+from app.domain.services.llm_backend import LLMBackend, Usage
+from app.domain.services.llm_gateway import llm_gateway
+from app.domain.services.plan_stream import PlanStreamParser
+from app.domain.services.llm_context import ContextBuilder
 
 logger = logging.getLogger(__name__)
 
 class LLMService:
-    def __init__(self):
-        if not settings.OPENAI_API_KEY:
-            logger.warning("OPENAI_API_KEY not set. LLMService will fail.")
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, case_study: Optional[str] = None, backend: Optional[LLMBackend] = None,
+                 session_id: Optional[str] = None):
+        # Unless given a backend, calls share the process-wide gateway
+        # (one client, global concurrency limit, retries) as this session
+        self.backend = backend or llm_gateway.client(session_id)
+        self.case_study = case_study
+        self.context: Optional[ContextBuilder] = None
+
+        # Telemetry (token counts as reported by the provider)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
 
     async def decide_speaker(self, history: List[str], personas: Dict[str, str], active_speakers: List[str]) -> Dict:
         """
         Decides who speaks next or if silence is appropriate.
         Returns: {"speaker_id": "alice" | "bob" | ... | "silence", "reason": "..."}
         """
-        system_prompt = (
-            "You are a conversation director for a simulation. "
-            "Your job is to decide who should speak next based on the history and personas. "
-            "You can also choose 'silence' if it's natural for the conversation to pause or if the facilitator should intervene. "
-            "Output valid JSON only: {\"speaker_id\": \"<id>\", \"reason\": \"<chain_of_thought>\"}"
-        )
-        
-        user_content = f"""
-        Active Speakers: {', '.join(active_speakers)}
-        
-        Personas:
-        {json.dumps(personas, indent=2)}
-        
-        Recent History:
-        {self._format_history(history)}
-        
-        Who should speak next? Choose one of {active_speakers} or 'silence'.
-        """
+        ctx = self._context_for(personas, active_speakers)
+        user_content = f"{ctx.history_block(history)}\n\nWho should speak next? Choose one of {active_speakers} or 'silence'."
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o", # High intelligence for control logic
-                messages=[
-                    {"role": "system", "content": system_prompt},
+            content, usage = await self.backend.complete(
+                "gpt-4o", # High intelligence for control logic
+                [
+                    {"role": "system", "content": ctx.decide_system()},
                     {"role": "user", "content": user_content}
                 ],
-                response_format={"type": "json_object"},
-                temperature=0.7
+                json_mode=True
             )
-            content = response.choices[0].message.content
+            self._record_usage("decide_speaker", usage)
             return json.loads(content)
         except Exception as e:
             logger.error(f"LLM Decision Error: {e}")
@@ -57,74 +48,108 @@ class LLMService:
         """
         Generates text for the speaker.
         """
-        system_prompt = (
-            f"You are {speaker_id}. Roleplay this persona accurately. "
-            f"Persona: {persona}\n"
-            "Keep your response natural, conversational, and concise (1-2 sentences). "
-            "Do not start with 'Alice:' or 'Bob:'. Just the text."
-        )
-        
-        user_content = f"""
-        Recent History:
-        {self._format_history(history)}
-        
-        Respond to the conversation.
-        """
+        ctx = self.context or self._context_for({speaker_id: persona}, [speaker_id])
+        user_content = f"{ctx.history_block(history)}\n\nRespond to the conversation."
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini", # Faster/Cheaper for text gen
-                messages=[
-                    {"role": "system", "content": system_prompt},
+            content, usage = await self.backend.complete(
+                "gpt-4o-mini", # Faster/Cheaper for text gen
+                [
+                    {"role": "system", "content": ctx.speaker_system(speaker_id, persona)},
                     {"role": "user", "content": user_content}
-                ],
-                temperature=0.7
+                ]
             )
-            return response.choices[0].message.content.strip()
+            self._record_usage("generate_turn_text", usage)
+            return content.strip()
         except Exception as e:
             logger.error(f"LLM Generation Error: {e}")
             return "I have nothing to add right now."
 
-    def _format_history(self, history: List[str]) -> str:
-        # History is expected to be a list of "Speaker: Text" strings
-        return "\n".join(history[-10:])
-
     async def plan_next_turn(self, history: List[str], personas: Dict[str, str], active_speakers: List[str]) -> Dict:
         """
         Consolidated planning: Decides speaker AND generates text in one go.
         Returns: {"speaker_id": "...", "text": "...", "reason": "..."}
         """
-        system_prompt = (
-            "You are a conversation director and roleplayer. "
-            "1. Decide who speaks next based on history/personas (or 'silence'). "
-            "2. If someone speaks, generate their line (natural, concise, 1-2 sentences). "
-            "3. Output JSON: {\"speaker_id\": \"...\", \"text\": \"...\", \"reason\": \"...\"}"
-        )
-        
-        user_content = f"""
-        Active Speakers: {', '.join(active_speakers)}
-        
-        Personas:
-        {json.dumps(personas, indent=2)}
-        
-        Recent History:
-        {self._format_history(history)}
-        
-        Plan the next turn.
-        """
-        
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7
+            content, usage = await self.backend.complete(
+                "gpt-4o", self._plan_messages(history, personas, active_speakers), json_mode=True
             )
-            content = response.choices[0].message.content
+            self._record_usage("plan_next_turn", usage)
             return json.loads(content)
         except Exception as e:
             logger.error(f"LLM Planning Error: {e}")
             return {"speaker_id": "silence", "reason": "Error fallback", "text": ""}
+
+    async def stream_plan_next_turn(self, history: List[str], personas: Dict[str, str], active_speakers: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of plan_next_turn, so speech can start before the
+        completion ends. Yields {"type": "speaker", "speaker_id"} as soon as
+        the speaker is parsed, {"type": "sentence", "text"} per complete
+        sentence of the line, and finally {"type": "done", "plan"}.
+        """
+        parser = PlanStreamParser()
+        stream = None
+        try:
+            stream = self.backend.stream(
+                "gpt-4o", self._plan_messages(history, personas, active_speakers), json_mode=True
+            )
+            async for chunk in stream:
+                if chunk.usage:
+                    self._record_usage("stream_plan_next_turn", chunk.usage)
+                if chunk.text:
+                    for event in parser.feed(chunk.text):
+                        yield event
+        except Exception as e:
+            logger.error(f"LLM Streaming Planning Error: {e}")
+            if parser.speaker_id is None:
+                yield {"type": "done", "plan": {"speaker_id": "silence", "reason": "Error fallback", "text": ""}}
+                return
+        finally:
+            # Stop generation if the caller stopped listening
+            if stream is not None:
+                await stream.aclose()
+
+        for event in parser.finish():
+            yield event
+
+    async def summarize_history(self, summary: str, lines: List[str]) -> str:
+        """Fold older turns into the rolling summary (runs off the hot path)."""
+        content, usage = await self.backend.complete(
+            "gpt-4o-mini",
+            [
+                {"role": "system", "content": (
+                    "You maintain a running summary of a facilitated group conversation. "
+                    "Update the summary with the new lines. Keep who said what, positions, "
+                    "open questions and decisions. At most 200 words."
+                )},
+                {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew lines:\n" + "\n".join(lines)}
+            ],
+            temperature=0.2
+        )
+        self._record_usage("summarize_history", usage)
+        return content.strip()
+
+    def _context_for(self, personas: Dict[str, str], active_speakers: List[str]) -> ContextBuilder:
+        # One builder per cast, so the rendered prefix and summary are reused
+        ctx = self.context
+        if ctx is None or ctx.personas != personas or ctx.active_speakers != active_speakers:
+            ctx = self.context = ContextBuilder(
+                personas, list(active_speakers), self.case_study, summarizer=self.summarize_history
+            )
+        return ctx
+
+    def _plan_messages(self, history: List[str], personas: Dict[str, str], active_speakers: List[str]) -> List[Dict[str, str]]:
+        ctx = self._context_for(personas, active_speakers)
+        return [
+            {"role": "system", "content": ctx.plan_system()},
+            {"role": "user", "content": f"{ctx.history_block(history)}\n\nPlan the next turn."}
+        ]
+
+    def _record_usage(self, call: str, usage: Optional[Usage]) -> None:
+        if usage is None:
+            return
+        self.usage["calls"] += 1
+        self.usage["prompt_tokens"] += usage.prompt_tokens
+        self.usage["cached_tokens"] += usage.cached_tokens
+        self.usage["completion_tokens"] += usage.completion_tokens
+        logger.info(f"LLM {call}: prompt={usage.prompt_tokens} tokens (cached={usage.cached_tokens}), completion={usage.completion_tokens}")
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Literal
+from typing import AsyncIterator, List, Dict, Any, Literal, Optional
 from app.db.repos.branch import BranchRepo
 from app.db.repos.utterance import UtteranceRepo
 from app.db.repos.replay_event_repo import ReplayEventRepo
@@ -7,6 +7,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Utterance fields needed to build a MaterializedItem
+_ITEM_PROJECTION = {"speaker_id": 1, "text": 1, "audio": 1}
+
 class MaterializedItem:
     """Represents an item in a materialized timeline."""
     def __init__(
@@ -62,80 +65,76 @@ class MaterializeTimelineService:
         2. Virtual replay blocks from replay_events (source: replayed)
         3. New turns stored in this branch after divergence (source: new)
         """
-        result = []
-        
+        return [item async for item in self.iter_materialized_timeline(session_id, branch_id)]
+
+    async def iter_materialized_timeline(
+        self, 
+        session_id: str, 
+        branch_id: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Same items as get_materialized_timeline, yielded as they are built."""
         # 1. Get the branch info to find parent/fork point
-        branch = await self.branch_repo.get(session_id, branch_id)
+        branch = await self.branch_repo.get(branch_id)
         if not branch:
             logger.warning(f"Branch {branch_id} not found")
-            return []
+            return
         
-        parent_branch_id = branch.get("parent_id")
-        forked_at_utterance_id = branch.get("forked_at_utterance_id")
+        parent_branch_id = branch.get("parent_branch_id")
+        forked_at_utterance_id = branch.get("fork_from_utterance_id")
         
         # 2. Get replay events targeting this branch
         replay_events = await self.replay_event_repo.list_by_branch(session_id, branch_id)
         
         # 3. Get all utterances for THIS branch (new turns after fork)
-        new_turns = await self.utterance_repo.get_by_branch(session_id, branch_id)
+        new_turns = await self.utterance_repo.get_by_branch(session_id, branch_id, projection=_ITEM_PROJECTION)
         
         # 4. If this is not a forked branch, just return the utterances as "original"
         if not parent_branch_id or not forked_at_utterance_id:
             for u in new_turns:
-                result.append(MaterializedItem(
-                    turn_id=u["_id"],
-                    speaker_id=u.get("speaker_id"),
-                    text=u.get("text", ""),
-                    audio=u.get("audio", {}),
-                    source="original"
-                ).to_dict())
-            return result
+                yield self._item(u, "original")
+            return
         
         # 5. Get base turns from parent branch up to fork point
         parent_view = await self.resolver.get_transcript_view(session_id, parent_branch_id)
-        found_fork = False
         for u in parent_view.utterances:
-            result.append(MaterializedItem(
+            yield MaterializedItem(
                 turn_id=u.utterance_id,
                 speaker_id=u.speaker_id,
                 text=u.text,
                 audio=u.audio.model_dump() if u.audio else {},
                 source="original"
-            ).to_dict())
+            ).to_dict()
             if u.utterance_id == forked_at_utterance_id:
-                found_fork = True
                 break
         
         # 6. Inject replay blocks (from replay_events)
+        # Only completed/canceled replays are shown
+        replay_events = [evt for evt in replay_events if evt.get("status") in ["completed", "canceled"]]
+        
+        # Fetch the replayed turns of every event in one query
+        replayed_ids = [turn_id for evt in replay_events for turn_id in evt.get("replayed_turn_ids", [])]
+        replayed = {}
+        if replayed_ids:
+            docs = await self.utterance_repo.get_many(list(dict.fromkeys(replayed_ids)), projection=_ITEM_PROJECTION)
+            replayed = {u["_id"]: u for u in docs}
+        
         for evt in replay_events:
-            if evt.get("status") not in ["completed", "canceled"]:
-                continue  # Only include completed/canceled replays
-            
-            # Get the replayed turns from the source branch
-            replayed_ids = evt.get("replayed_turn_ids", [])
-            from_branch_id = evt.get("from_branch_id")
-            
-            for turn_id in replayed_ids:
-                # Fetch the original utterance
-                u = await self.utterance_repo.col.find_one({"_id": turn_id})
+            for turn_id in evt.get("replayed_turn_ids", []):
+                u = replayed.get(turn_id)
                 if u:
-                    result.append(MaterializedItem(
-                        turn_id=u["_id"],
-                        speaker_id=u.get("speaker_id"),
-                        text=u.get("text", ""),
-                        audio=u.get("audio", {}),
-                        source="replayed",
-                        replay_event_id=evt.get("replay_event_id")
-                    ).to_dict())
+                    yield self._item(u, "replayed", evt.get("replay_event_id"))
         
         # 7. Append new turns (stored in this branch after divergence)
         for u in new_turns:
-            result.append(MaterializedItem(
-                turn_id=u["_id"],
-                speaker_id=u.get("speaker_id"),
-                text=u.get("text", ""),
-                audio=u.get("audio", {}),
-                source="new"
-            ).to_dict())
-        
-        return result
+            yield self._item(u, "new")
+
+    @staticmethod
+    def _item(u: Dict[str, Any], source: str, replay_event_id: Optional[str] = None) -> Dict[str, Any]:
+        return MaterializedItem(
+            turn_id=u["_id"],
+            speaker_id=u.get("speaker_id"),
+            text=u.get("text", ""),
+            audio=u.get("audio", {}),
+            source=source,
+            replay_event_id=replay_event_id
+        ).to_dict()
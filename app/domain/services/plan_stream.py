@@ -0,0 +1,117 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_SPEAKER_KEY = re.compile(r'"speaker_id"\s*:\s*"')
+_TEXT_KEY = re.compile(r'"text"\s*:\s*"')
+# Sentence end: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _decode_partial(buf: str, pos: int) -> Tuple[str, int, bool]:
+    """
+    Decode a JSON string body from buf[pos:] as far as the buffer allows.
+    Returns (decoded, next_pos, closed); an escape split across deltas is
+    left unread until the rest arrives.
+    """
+    out = []
+    i = pos
+    while i < len(buf):
+        ch = buf[i]
+        if ch == '"':
+            return "".join(out), i + 1, True
+        if ch != "\\":
+            out.append(ch)
+            i += 1
+            continue
+        if i + 1 >= len(buf):
+            break
+        esc = buf[i + 1]
+        if esc == "u":
+            if i + 6 > len(buf):
+                break
+            try:
+                out.append(chr(int(buf[i + 2:i + 6], 16)))
+            except ValueError:
+                pass
+            i += 6
+        else:
+            out.append(_ESCAPES.get(esc, esc))
+            i += 2
+    return "".join(out), i, False
+
+
+class PlanStreamParser:
+    """
+    Incremental reader for the planning JSON as it streams in.
+    feed() returns the events a delta completes: {"type": "speaker"} once the
+    speaker_id string closes, then {"type": "sentence"} for each complete
+    sentence of "text". Sentences are held back until the speaker is known.
+    finish() flushes the remainder and returns the final {"type": "done"}.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.speaker_id: Optional[str] = None
+        self.text = "" # Decoded "text" value so far
+        self._text_pos: Optional[int] = None # Next unread buffer index of the text value
+        self._text_closed = False
+        self._emitted = 0 # Characters of self.text already sent as sentences
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        self.buffer += delta
+        events = []
+
+        if self.speaker_id is None:
+            m = _SPEAKER_KEY.search(self.buffer)
+            if m:
+                value, _, closed = _decode_partial(self.buffer, m.end())
+                if closed:
+                    self.speaker_id = value
+                    events.append({"type": "speaker", "speaker_id": value})
+
+        if self._text_pos is None:
+            m = _TEXT_KEY.search(self.buffer)
+            if m:
+                self._text_pos = m.end()
+        if self._text_pos is not None and not self._text_closed:
+            chunk, self._text_pos, self._text_closed = _decode_partial(self.buffer, self._text_pos)
+            self.text += chunk
+
+        events.extend(self._sentences(final=self._text_closed))
+        return events
+
+    def finish(self) -> List[Dict[str, Any]]:
+        try:
+            plan = json.loads(self.buffer)
+        except ValueError:
+            # Truncated or malformed: keep whatever was parsed
+            plan = {"speaker_id": self.speaker_id or "silence", "text": self.text, "reason": "Partial plan"}
+
+        events = []
+        if self.speaker_id is None and plan.get("speaker_id"):
+            self.speaker_id = plan["speaker_id"]
+            events.append({"type": "speaker", "speaker_id": self.speaker_id})
+        if not self.text and plan.get("text"):
+            self.text = plan["text"]
+        events.extend(self._sentences(final=True))
+        events.append({"type": "done", "plan": plan})
+        return events
+
+    def _sentences(self, final: bool) -> List[Dict[str, Any]]:
+        if self.speaker_id is None:
+            return []
+        pending = self.text[self._emitted:]
+        events = []
+        start = 0
+        for m in _SENTENCE_END.finditer(pending):
+            sentence = pending[start:m.end()].strip()
+            if sentence:
+                events.append({"type": "sentence", "text": sentence})
+            start = m.end()
+        if final and pending[start:].strip():
+            events.append({"type": "sentence", "text": pending[start:].strip()})
+            start = len(pending)
+        self._emitted += start
+        return events
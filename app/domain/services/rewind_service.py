@@ -1,4 +1,5 @@
-from typing import Optional, List, Any
+import bisect
+from typing import Optional, List, Any, Dict, Tuple
 from app.domain.schemas import RewindPlanRes, ReplayUtteranceView
 from app.domain.services.version_control import VersionControl
 from app.domain.services.transcript_resolver import TranscriptResolver
@@ -13,14 +14,34 @@ class RewindService:
         checkpoint_repo: CheckpointRepo,
         utterance_repo: UtteranceRepo,
         branch_repo: BranchRepo,
-        replay_event_repo: Any # Avoid circular import or use forward ref
+        replay_event_repo: Any, # Avoid circular import or use forward ref
+        resolver: Optional[TranscriptResolver] = None
     ):
         self.vc = vc
         self.checkpoint_repo = checkpoint_repo
         self.utterance_repo = utterance_repo
         self.branch_repo = branch_repo
         self.replay_event_repo = replay_event_repo
-        self.resolver = TranscriptResolver(branch_repo, utterance_repo)
+        self.resolver = resolver or TranscriptResolver(branch_repo, utterance_repo)
+
+    @staticmethod
+    def _index_checkpoints(
+        utterance_ids: List[str], ckpts: List[Dict[str, Any]], branch_id: str
+    ) -> Tuple[List[int], Dict[int, Dict[str, Any]]]:
+        """
+        Sorted transcript positions that have a checkpoint on branch_id, and
+        the checkpoint at each. Only checkpoints on the branch being rewound
+        are usable fork points for fork_branch(parent=branch_id).
+        """
+        pos_by_utt = {utt_id: i for i, utt_id in enumerate(utterance_ids)}
+        ckpt_at: Dict[int, Dict[str, Any]] = {}
+        for c in ckpts:
+            if c.get("branch_id") != branch_id:
+                continue
+            pos = pos_by_utt.get(c.get("at_utterance_id"))
+            if pos is not None and pos not in ckpt_at:
+                ckpt_at[pos] = c
+        return sorted(ckpt_at), ckpt_at
 
     async def create_rewind_plan(
         self,
@@ -51,33 +72,32 @@ class RewindService:
         
         logger.info(f"Rewind: Target is at index {target_idx} of {len(view.utterances)}")
         
-        # 2. Get Checkpoint BEFORE target - search backwards for any checkpoint
+        # 2. Get Checkpoint BEFORE target
+        # One query for every checkpoint on the resolved timeline, then an
+        # in-memory index of the positions that have one on this branch.
+        utterance_ids = [u.utterance_id for u in view.utterances]
+        all_ckpts = await self.checkpoint_repo.list_by_utterances(
+            session_id, utterance_ids, projection={"branch_id": 1, "at_utterance_id": 1, "created_at": 1}
+        )
+        ckpt_positions, ckpt_at = self._index_checkpoints(utterance_ids, all_ckpts, branch_id)
+        
         ckpt = None
         fork_from_utterance_id = None
         
-        if target_idx == 0:
-            # Target is first utterance, get the first/root checkpoint
-            ckpt = await self.checkpoint_repo.get_first(session_id, branch_id)
-            logger.info(f"Rewind: Target is first utterance, looking for first checkpoint: {ckpt is not None}")
-        else:
-            # Search backwards from target-1 to find any checkpoint
-            for search_idx in range(target_idx - 1, -1, -1):
-                search_utt_id = view.utterances[search_idx].utterance_id
-                ckpt = await self.checkpoint_repo.get_by_utterance(session_id, branch_id, search_utt_id)
-                if ckpt:
-                    fork_from_utterance_id = search_utt_id
-                    logger.info(f"Rewind: Found checkpoint at index {search_idx} (utterance {search_utt_id})")
-                    break
-            
-            # If no checkpoint found in direct search, try first checkpoint
-            if not ckpt:
-                logger.info("Rewind: No checkpoint found before target, trying first checkpoint")
-                ckpt = await self.checkpoint_repo.get_first(session_id, branch_id)
+        # Nearest checkpoint strictly before the target
+        i = bisect.bisect_left(ckpt_positions, target_idx) - 1
+        if i >= 0:
+            search_idx = ckpt_positions[i]
+            fork_from_utterance_id = utterance_ids[search_idx]
+            ckpt = ckpt_at[search_idx]
+            logger.info(f"Rewind: Found checkpoint at index {search_idx} (utterance {fork_from_utterance_id})")
+        elif ckpt_positions:
+            # Nothing before the target, fall back to the branch's first checkpoint
+            logger.info("Rewind: No checkpoint found before target, using first checkpoint")
+            ckpt = min((ckpt_at[p] for p in ckpt_positions), key=lambda c: c.get("created_at", ""))
         
         if not ckpt:
-            logger.error(f"Rewind: No checkpoint found. Listing all checkpoints for branch...")
-            all_ckpts = await self.checkpoint_repo.list_by_branch(session_id, branch_id)
-            logger.error(f"Rewind: Found {len(all_ckpts)} checkpoints: {[c.get('at_utterance_id') for c in all_ckpts]}")
+            logger.error(f"Rewind: No checkpoint found. Checkpoints on timeline: {[c.get('at_utterance_id') for c in all_ckpts]}")
             raise ValueError("Checkpoint not found before target utterance")
         
         # 3. Fork Branch from the checkpoint BEFORE target
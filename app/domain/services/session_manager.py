@@ -6,6 +6,7 @@ from app.db.repos.branch import BranchRepo
 from app.db.repos.utterance import UtteranceRepo
 from app.db.repos.case_study import CaseStudyRepo
 from app.domain.schemas import SessionStartReq, SessionStartRes
+from app.metrics.running import empty_running, fold_turn
 
 class SessionManager:
     def __init__(self, session_repo: SessionRepo, branch_repo: BranchRepo, 
@@ -37,23 +38,13 @@ class SessionManager:
             "active_branch_id": root_branch_id,
             "room_id": room_name,
             "config": req.config.model_dump(),
-            "write_version": 0
+            "write_version": 0,
+            "branches_version": 0
         }
         await self.session_repo.create(session_doc)
 
-        # 3. Create root branch
-        branch_doc = {
-            "_id": root_branch_id,
-            "session_id": session_id,
-            "parent_branch_id": None,
-            "fork_from_utterance_id": None,
-            "fork_from_checkpoint_id": None,
-            "branch_label": "main",
-            "created_at": now_iso
-        }
-        await self.branch_repo.create(branch_doc)
-
-        # 4. Clone seed utterances
+        # 3. Build seed utterance clones
+        seed_docs = []
         last_seed_id = None
         prev_id = None
         for seed in cs.seed_utterances:
@@ -73,10 +64,37 @@ class SessionManager:
                 "meta": {},
                 "created_at": now_iso
             }
-            await self.utterance_repo.create(utt_doc)
+            seed_docs.append(utt_doc)
             prev_id = utt_id
             last_seed_id = utt_id
 
+        # 4. Create root branch (seq counter continues after the seeds)
+        base_metrics = empty_running()
+        for utt_doc in seed_docs:
+            base_metrics = fold_turn(base_metrics, utt_doc["speaker_id"], utt_doc["timing"])
+        
+        branch_doc = {
+            "_id": root_branch_id,
+            "session_id": session_id,
+            "parent_branch_id": None,
+            "fork_from_utterance_id": None,
+            "fork_from_checkpoint_id": None,
+            "branch_label": "main",
+            "created_at": now_iso,
+            "ancestry": [{"branch_id": root_branch_id, "fork_from_utterance_id": None}],
+            "seq_counter": max((d["seq_in_branch"] for d in seed_docs), default=0),
+            "last_utterance_id": last_seed_id,
+            "fork_display_prefix": None,
+            # Running metrics over the seeds; live turns continue from here
+            "base_metrics": base_metrics,
+            "last_seed_utterance_id": last_seed_id
+        }
+        await self.branch_repo.create(branch_doc)
+
+        # 5. Insert seed utterances
+        for utt_doc in seed_docs:
+            await self.utterance_repo.create(utt_doc)
+
         return SessionStartRes(
             session_id=session_id,
             root_branch_id=root_branch_id,
@@ -0,0 +1,197 @@
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.repos.session_lease import SessionLeaseRepo
+
+
+@dataclass
+class SessionLease:
+    session_id: str
+    branch_id: str
+    room_name: str
+    owner: str # Conductor host id
+    owner_url: Optional[str] = None # Where the owner serves POST /sessions/{id}/stop
+    lease_expires_at: float = 0.0
+    stop_requested: bool = False
+    claims: int = 1 # Hosts that have owned it, counting the first
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "SessionLease":
+        return cls(
+            session_id=doc["_id"], branch_id=doc["branch_id"], room_name=doc["room_name"],
+            owner=doc["owner"], owner_url=doc.get("owner_url"),
+            lease_expires_at=doc.get("lease_expires_at", 0.0),
+            stop_requested=doc.get("stop_requested", False), claims=doc.get("claims", 1)
+        )
+
+
+class SessionRegistry:
+    """
+    Which conductor host runs which session, shared by every API and host
+    process. An owner holds a lease of `ttl_s` and renews it with
+    heartbeats; when a host dies its leases expire and another host
+    reclaims the sessions. Stops are requested through the registry so
+    they reach the owner wherever it runs.
+    """
+    def __init__(self, ttl_s: float, clock: Callable[[], float] = time.time):
+        self.ttl_s = ttl_s
+        self.clock = clock
+
+    async def claim(self, session_id: str, branch_id: str, room_name: str, owner: str,
+                    owner_url: Optional[str] = None) -> bool:
+        """Own a session; False if another host holds a live lease on it."""
+        raise NotImplementedError
+
+    async def heartbeat(self, owner: str, session_ids: List[str]) -> Dict[str, SessionLease]:
+        """Renew the owner's leases; returns those it still holds (others were taken over)."""
+        raise NotImplementedError
+
+    async def reclaim_orphans(self, owner: str, owner_url: Optional[str], limit: int) -> List[SessionLease]:
+        """Take over up to `limit` sessions whose owner stopped renewing."""
+        raise NotImplementedError
+
+    async def release(self, session_id: str, owner: str) -> None:
+        """The session is over: forget it."""
+        raise NotImplementedError
+
+    async def expire(self, session_id: str, owner: str) -> None:
+        """Give the session up now (host shutting down) so another host takes it at once."""
+        raise NotImplementedError
+
+    async def request_stop(self, session_id: str) -> Optional[SessionLease]:
+        """Flag the session for its owner to stop (picked up on its next heartbeat)."""
+        raise NotImplementedError
+
+    async def get(self, session_id: str) -> Optional[SessionLease]:
+        raise NotImplementedError
+
+
+class MongoSessionRegistry(SessionRegistry):
+    def __init__(self, repo: Optional[SessionLeaseRepo] = None, ttl_s: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(ttl_s or settings.SESSION_LEASE_TTL_S, clock)
+        self.repo = repo or SessionLeaseRepo()
+
+    async def claim(self, session_id: str, branch_id: str, room_name: str, owner: str,
+                    owner_url: Optional[str] = None) -> bool:
+        now = self.clock()
+        owned = {"owner": owner, "owner_url": owner_url, "lease_expires_at": now + self.ttl_s}
+        doc = {"_id": session_id, "branch_id": branch_id, "room_name": room_name,
+               "stop_requested": False, "claims": 1, **owned}
+        if await self.repo.insert(doc):
+            return True
+        return await self.repo.take_over(session_id, now, owned) is not None
+
+    async def heartbeat(self, owner: str, session_ids: List[str]) -> Dict[str, SessionLease]:
+        if not session_ids:
+            return {}
+        docs = await self.repo.renew(owner, session_ids, self.clock() + self.ttl_s)
+        return {doc["_id"]: SessionLease.from_doc(doc) for doc in docs}
+
+    async def reclaim_orphans(self, owner: str, owner_url: Optional[str], limit: int) -> List[SessionLease]:
+        now = self.clock()
+        await self.repo.delete_expired_stopped(now)
+        owned = {"owner": owner, "owner_url": owner_url, "lease_expires_at": now + self.ttl_s}
+        leases = []
+        while len(leases) < limit:
+            doc = await self.repo.take_any_expired(now, owned)
+            if doc is None:
+                break
+            leases.append(SessionLease.from_doc(doc))
+        return leases
+
+    async def release(self, session_id: str, owner: str) -> None:
+        await self.repo.delete(session_id, owner)
+
+    async def expire(self, session_id: str, owner: str) -> None:
+        await self.repo.set_fields(session_id, owner, {"lease_expires_at": 0.0})
+
+    async def request_stop(self, session_id: str) -> Optional[SessionLease]:
+        doc = await self.repo.set_fields(session_id, None, {"stop_requested": True})
+        return SessionLease.from_doc(doc) if doc else None
+
+    async def get(self, session_id: str) -> Optional[SessionLease]:
+        doc = await self.repo.get(session_id)
+        return SessionLease.from_doc(doc) if doc else None
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Single-process registry (tests, local runs without sharding)."""
+    def __init__(self, ttl_s: Optional[float] = None, clock: Callable[[], float] = time.time):
+        super().__init__(ttl_s or settings.SESSION_LEASE_TTL_S, clock)
+        self.leases: Dict[str, SessionLease] = {}
+
+    def _expired(self, lease: SessionLease, now: float) -> bool:
+        return lease.lease_expires_at < now
+
+    async def claim(self, session_id: str, branch_id: str, room_name: str, owner: str,
+                    owner_url: Optional[str] = None) -> bool:
+        now = self.clock()
+        lease = self.leases.get(session_id)
+        if lease is None:
+            self.leases[session_id] = SessionLease(session_id, branch_id, room_name, owner, owner_url, now + self.ttl_s)
+            return True
+        if not self._expired(lease, now):
+            return False
+        self._take(lease, owner, owner_url, now)
+        return True
+
+    async def heartbeat(self, owner: str, session_ids: List[str]) -> Dict[str, SessionLease]:
+        out = {}
+        for session_id in session_ids:
+            lease = self.leases.get(session_id)
+            if lease and lease.owner == owner:
+                lease.lease_expires_at = self.clock() + self.ttl_s
+                out[session_id] = SessionLease(**asdict(lease))
+        return out
+
+    async def reclaim_orphans(self, owner: str, owner_url: Optional[str], limit: int) -> List[SessionLease]:
+        now = self.clock()
+        expired = sorted((l for l in self.leases.values() if self._expired(l, now)),
+                         key=lambda l: l.lease_expires_at)
+        leases = []
+        for lease in expired:
+            if lease.stop_requested:
+                del self.leases[lease.session_id]
+            elif len(leases) < limit:
+                self._take(lease, owner, owner_url, now)
+                leases.append(SessionLease(**asdict(lease)))
+        return leases
+
+    def _take(self, lease: SessionLease, owner: str, owner_url: Optional[str], now: float) -> None:
+        lease.owner, lease.owner_url = owner, owner_url
+        lease.lease_expires_at = now + self.ttl_s
+        lease.claims += 1
+
+    async def release(self, session_id: str, owner: str) -> None:
+        lease = self.leases.get(session_id)
+        if lease and lease.owner == owner:
+            del self.leases[session_id]
+
+    async def expire(self, session_id: str, owner: str) -> None:
+        lease = self.leases.get(session_id)
+        if lease and lease.owner == owner:
+            lease.lease_expires_at = 0.0
+
+    async def request_stop(self, session_id: str) -> Optional[SessionLease]:
+        lease = self.leases.get(session_id)
+        if lease is None:
+            return None
+        lease.stop_requested = True
+        return SessionLease(**asdict(lease))
+
+    async def get(self, session_id: str) -> Optional[SessionLease]:
+        lease = self.leases.get(session_id)
+        return SessionLease(**asdict(lease)) if lease else None
+
+
+def get_session_registry(name: Optional[str] = None) -> SessionRegistry:
+    """The registry named by SESSION_REGISTRY: "mongo" or "memory"."""
+    name = name or settings.SESSION_REGISTRY
+    if name == "mongo":
+        return MongoSessionRegistry()
+    if name == "memory":
+        return InMemorySessionRegistry()
+    raise ValueError(f"Unknown session registry: {name}")
@@ -79,3 +79,11 @@ class STTService:
         except Exception as e:
             logger.error(f"STT Error: {e}")
             return ""
+
+
+def get_stt_service():
+    """The STT service named by STT_BACKEND: "openai" or "fake"."""
+    if settings.STT_BACKEND == "fake":
+        from app.domain.services.fake_backends import FakeSTTService
+        return FakeSTTService.from_settings()
+    return STTService()
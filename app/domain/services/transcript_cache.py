@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.domain.rows import UtteranceRow
+
+# Rough per-utterance overhead (ids, timing, audio ref, model objects)
+_UTT_OVERHEAD_BYTES = 512
+
+
+@dataclass
+class BranchSegment:
+    """
+    A branch's own utterances (not its ancestors'), as lean rows.
+    Segments are append-only and shared: every descendant's transcript is a
+    run of ancestor segment prefixes followed by its own segment, so a fork
+    adds one empty segment and memory scales with unique utterances.
+    """
+    branch_id: str
+    parent_fork_disp: Optional[str] # Display prefix of this branch's utterances
+    write_version: int # Session write_version the tail was last read at
+    trim_version: int = 0 # Session trim_version (utterances taken back) it was loaded at
+    ancestry: Optional[List[Dict[str, Any]]] = None # Root-to-self path, once known
+    utterances: List[UtteranceRow] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict) # utterance_id -> position
+    last_seq: int = 0 # Highest seq_in_branch loaded
+    size_bytes: int = 0
+
+    def append(self, row: UtteranceRow) -> None:
+        self.index[row.utterance_id] = len(self.utterances)
+        self.utterances.append(row)
+        self.last_seq = max(self.last_seq, row.seq_in_branch)
+        self.size_bytes += estimate_size([row])
+
+    def end_at(self, utterance_id: Optional[str]) -> Optional[int]:
+        """Length of the prefix ending at utterance_id (None if not loaded)."""
+        pos = self.index.get(utterance_id) if utterance_id else None
+        return pos + 1 if pos is not None else None
+
+
+def estimate_size(utterances: List[UtteranceRow]) -> int:
+    return sum(len(u.text) + len(u.utterance_id) + _UTT_OVERHEAD_BYTES for u in utterances)
+
+
+class TranscriptCache:
+    """
+    In-process LRU of branch segments keyed by (session_id, branch_id),
+    bounded by an estimated byte budget (max_bytes=None: unbounded, never
+    evicts). Freshness is decided by the caller against sessions.write_version.
+    """
+    def __init__(self, max_bytes: Optional[int]):
+        self.max_bytes = max_bytes
+        self._segments: "OrderedDict[Tuple[str, str], BranchSegment]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+
+    def get(self, session_id: str, branch_id: str) -> Optional[BranchSegment]:
+        key = (session_id, branch_id)
+        segment = self._segments.get(key)
+        if segment is not None:
+            self._segments.move_to_end(key)
+        return segment
+
+    def put(self, session_id: str, segment: BranchSegment) -> None:
+        key = (session_id, segment.branch_id)
+        old = self._segments.pop(key, None)
+        if old:
+            self._bytes -= old.size_bytes
+        self._segments[key] = segment
+        self._bytes += segment.size_bytes
+        self._evict()
+
+    def grew(self, segment: BranchSegment, added_bytes: int) -> None:
+        """Account for utterances appended to a cached segment."""
+        self.extensions += 1
+        self._bytes += added_bytes
+        self._evict()
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _evict(self) -> None:
+        if self.max_bytes is None:
+            return
+        # Keep at least the most recent segment even if it alone is over budget
+        while self._bytes > self.max_bytes and len(self._segments) > 1:
+            _, evicted = self._segments.popitem(last=False)
+            self._bytes -= evicted.size_bytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._segments.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        return {
+            "segments": len(self._segments),
+            "utterances": sum(len(s.utterances) for s in self._segments.values()),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "extensions": self.extensions,
+            "evictions": self.evictions
+        }
+
+
+# Process-wide cache shared by all resolvers
+transcript_cache = TranscriptCache(settings.TRANSCRIPT_CACHE_MAX_BYTES)
@@ -1,88 +1,137 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from app.db.repos.branch import BranchRepo
 from app.db.repos.utterance import UtteranceRepo
-from app.domain.schemas import TranscriptViewOut, UtteranceView, Timing, AudioRef
+from app.db.repos.session import SessionRepo
+from app.domain.schemas import TranscriptViewOut, UtteranceView
+from app.domain.rows import UtteranceRow
+from app.domain.services.version_control import resolve_ancestry
+from app.domain.services.transcript_cache import TranscriptCache, BranchSegment
+
+def display_id_for(u: Dict[str, Any], parent_fork_disp: Optional[str]) -> str:
+    """Display id of an utterance given the display id of its branch's fork point."""
+    seq = u.get("seq_in_branch", 0)
+    if u.get("kind") == "seed":
+        return str(u.get("seed_idx", seq))
+    if parent_fork_disp:
+        return f"{parent_fork_disp}.{seq}"
+    # Root branch non-seed
+    return str(seq)
 
 class TranscriptResolver:
-    def __init__(self, branch_repo: BranchRepo, utterance_repo: UtteranceRepo):
+    def __init__(self, branch_repo: BranchRepo, utterance_repo: UtteranceRepo,
+                 session_repo: Optional[SessionRepo] = None, cache: Optional[TranscriptCache] = None):
         self.branch_repo = branch_repo
         self.utterance_repo = utterance_repo
+        # Caching needs the session to read write_version
+        self.session_repo = session_repo
+        self.cache = cache
 
     async def get_transcript_view(self, session_id: str, branch_id: str) -> TranscriptViewOut:
-        # 1. Build branch ancestry
-        chain = []
-        curr_id = branch_id
-        while curr_id:
-            branch = await self.branch_repo.get(curr_id)
+        rows = await self.get_transcript_rows(session_id, branch_id)
+        return self._to_out(session_id, branch_id, [r.to_view() for r in rows])
+
+    async def get_transcript_rows(self, session_id: str, branch_id: str) -> List[UtteranceRow]:
+        """Resolved transcript as lean rows (no Pydantic models built)."""
+        if self.cache and self.session_repo:
+            cache = self.cache
+            session = await self.session_repo.get(session_id) or {}
+            write_version = session.get("write_version", 0)
+            trim_version = session.get("trim_version", 0)
+        else:
+            # Uncached: resolve through a throwaway segment store
+            cache = TranscriptCache(max_bytes=None)
+            write_version = trim_version = 0
+
+        pieces = await self._resolve_pieces(cache, session_id, branch_id, write_version, trim_version)
+        rows = []
+        for segment, end in pieces:
+            rows.extend(segment.utterances[:end])
+        return rows
+
+    async def _resolve_pieces(self, cache: TranscriptCache, session_id: str, branch_id: str,
+                              write_version: int, trim_version: int = 0) -> List[Tuple[BranchSegment, Optional[int]]]:
+        """
+        The branch's transcript as (segment, end) pieces, root first. Ancestor
+        pieces end at the next branch's fork point; the target runs to its tail.
+        Only branches without a cached segment are read, in one query, and
+        only segments whose visible part can still grow are tail-refreshed.
+        Segments loaded before utterances were taken back (trim_version) are
+        reloaded: a tail refresh only ever appends.
+        """
+        # 1. Branch ancestry (materialized on the branch doc, cached on its segment)
+        target = cache.get(session_id, branch_id)
+        chain = target.ancestry if target else None
+        if chain is None:
+            branch = await self.branch_repo.get(branch_id)
             if not branch:
-                break
-            chain.append(branch)
-            curr_id = branch.get("parent_branch_id")
-        chain.reverse() # [root, ..., target]
+                return []
+            chain = await resolve_ancestry(self.branch_repo, branch) # [root, ..., target]
+
+        # 2. Load every uncached branch of the ancestry in one query
+        segments: Dict[str, Optional[BranchSegment]] = {}
+        for entry in chain:
+            segment = cache.get(session_id, entry["branch_id"])
+            segments[entry["branch_id"]] = segment if segment and segment.trim_version == trim_version else None
+        missing = [b_id for b_id, seg in segments.items() if seg is None]
+        loaded: Dict[str, List[Dict[str, Any]]] = {b_id: [] for b_id in missing}
+        if missing:
+            for u in await self.utterance_repo.get_by_branches(session_id, missing):
+                loaded[u["branch_id"]].append(u)
+        hit = not missing
+
+        # 3. Walk root -> target, building or refreshing segments as needed
+        pieces: List[Tuple[BranchSegment, Optional[int]]] = []
+        for i, entry in enumerate(chain):
+            b_id = entry["branch_id"]
+            cut = chain[i + 1].get("fork_from_utterance_id") if i + 1 < len(chain) else None
+            segment = segments[b_id]
+
+            if segment is None:
+                parent_fork_disp = self._fork_display(pieces, entry.get("fork_from_utterance_id")) if i > 0 else None
+                segment = BranchSegment(branch_id=b_id, parent_fork_disp=parent_fork_disp,
+                                        write_version=write_version, trim_version=trim_version)
+                for u in loaded[b_id]:
+                    segment.append(UtteranceRow.from_doc(u, display_id_for(u, parent_fork_disp)))
+                cache.put(session_id, segment)
+            elif segment.end_at(cut) is None and segment.write_version != write_version:
+                # The visible part runs to the tail, which may have grown
+                await self._refresh_tail(cache, session_id, segment, write_version)
+                hit = False
+
+            pieces.append((segment, segment.end_at(cut)))
+
+        pieces[-1][0].ancestry = chain
+        cache.record(hit)
+        return pieces
+
+    async def _refresh_tail(self, cache: TranscriptCache, session_id: str,
+                            segment: BranchSegment, write_version: int) -> None:
+        new_utts = await self.utterance_repo.get_by_branch_after(session_id, segment.branch_id, segment.last_seq)
+        before = segment.size_bytes
+        for u in new_utts:
+            # A concurrent refresh may already have appended it
+            if u.get("seq_in_branch", 0) > segment.last_seq and u["_id"] not in segment.index:
+                segment.append(UtteranceRow.from_doc(u, display_id_for(u, segment.parent_fork_disp)))
+        segment.write_version = write_version
+        cache.grew(segment, segment.size_bytes - before)
+
+    @staticmethod
+    def _fork_display(pieces: List[Tuple[BranchSegment, Optional[int]]], fork_from: Optional[str]) -> Optional[str]:
+        """Display id of the fork utterance within the already resolved prefix."""
+        if not fork_from:
+            return None
+        for segment, end in reversed(pieces):
+            pos = segment.index.get(fork_from)
+            if pos is not None and (end is None or pos < end):
+                return segment.utterances[pos].display_id
+        return None
 
-        # 2. Collect utterances
-        all_utts = []
-        
-        # Map utterance_id -> display_id for fork point lookup
-        utt_display_map = {}
-        
-        for i, branch in enumerate(chain):
-            b_id = branch["_id"]
-            is_target = (i == len(chain) - 1)
-            
-            # Determine cut-off
-            limit_utt_id = None
-            if not is_target:
-                next_branch = chain[i+1]
-                limit_utt_id = next_branch.get("fork_from_utterance_id")
-            
-            # Fetch utterances for this branch
-            utts = await self.utterance_repo.get_by_branch(session_id, b_id)
-            
-            # Filter
-            branch_utts = []
-            for u in utts:
-                branch_utts.append(u)
-                if limit_utt_id and u["_id"] == limit_utt_id:
-                    break
-            
-            # Compute display IDs
-            parent_fork_disp = None
-            if branch.get("parent_branch_id"):
-                fork_from = branch.get("fork_from_utterance_id")
-                if fork_from and fork_from in utt_display_map:
-                    parent_fork_disp = utt_display_map[fork_from]
-            
-            for u in branch_utts:
-                u_id = u["_id"]
-                kind = u.get("kind")
-                seq = u.get("seq_in_branch", 0)
-                
-                if kind == "seed":
-                    disp = str(u.get("seed_idx", seq))
-                else:
-                    if parent_fork_disp:
-                        disp = f"{parent_fork_disp}.{seq}"
-                    else:
-                        # Root branch non-seed
-                        disp = str(seq)
-                
-                utt_display_map[u_id] = disp
-                
-                # Convert to View
-                view = UtteranceView(
-                    utterance_id=u_id,
-                    speaker_id=u.get("speaker_id"),
-                    kind=kind,
-                    text=u.get("text", ""),
-                    timing=Timing(**u.get("timing", {})),
-                    audio=AudioRef(**u.get("audio", {})),
-                    display_id=disp
-                )
-                all_utts.append(view)
-                
+    @staticmethod
+    def _to_out(session_id: str, branch_id: str, utterances: List[UtteranceView]) -> TranscriptViewOut:
+        # The list is built per call; the UtteranceView objects are cached on
+        # their rows and must not be mutated.
         return TranscriptViewOut(
             session_id=session_id,
             branch_id=branch_id,
-            utterances=all_utts
+            utterances=utterances
         )
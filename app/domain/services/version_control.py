@@ -3,12 +3,43 @@ import time
 from typing import List, Dict, Any, Optional
 from app.db.repos.branch import BranchRepo
 from app.db.repos.session import SessionRepo
-from app.domain.schemas import ForkRes, BranchOut
+from app.domain.schemas import ForkRes, BranchOut, BranchTreeNodeOut, SessionTreeOut
+from app.domain.services.branch_tree import BranchTree, BranchTreeRegistry
+
+# Skip the per-branch ancestry path and seed metrics when listing branches
+_BRANCH_SUMMARY_PROJECTION = {"ancestry": 0, "base_metrics": 0, "last_seed_utterance_id": 0}
+
+
+async def resolve_ancestry(branch_repo: BranchRepo, branch: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Root-to-self ancestry path of a branch document.
+    Each entry is {"branch_id", "fork_from_utterance_id"}.
+    Uses the materialized path written at fork time; branches created before
+    the path existed fall back to walking parent_branch_id.
+    """
+    if branch.get("ancestry"):
+        return branch["ancestry"]
+
+    chain = []
+    curr = branch
+    while curr:
+        chain.append({
+            "branch_id": curr["_id"],
+            "fork_from_utterance_id": curr.get("fork_from_utterance_id")
+        })
+        parent_id = curr.get("parent_branch_id")
+        curr = await branch_repo.get(parent_id) if parent_id else None
+    chain.reverse() # [root, ..., branch]
+    return chain
+
 
 class VersionControl:
-    def __init__(self, branch_repo: BranchRepo, session_repo: SessionRepo):
+    def __init__(self, branch_repo: BranchRepo, session_repo: SessionRepo,
+                 trees: Optional[BranchTreeRegistry] = None):
         self.branch_repo = branch_repo
         self.session_repo = session_repo
+        # Shared tree index; without one every get_tree call rebuilds
+        self.trees = trees
 
     async def fork_branch(self, session_id: str, parent_branch_id: str, 
                           from_utterance_id: Optional[str], from_checkpoint_id: Optional[str], 
@@ -25,6 +56,10 @@ class VersionControl:
         
         now_iso = str(int(time.time() * 1000))
         
+        # Materialized ancestry so readers resolve the whole path in one get
+        ancestry = await resolve_ancestry(self.branch_repo, parent)
+        ancestry = ancestry + [{"branch_id": branch_id, "fork_from_utterance_id": from_utterance_id}]
+        
         branch_doc = {
             "_id": branch_id,
             "session_id": session_id,
@@ -32,9 +67,16 @@ class VersionControl:
             "fork_from_utterance_id": from_utterance_id,
             "fork_from_checkpoint_id": from_checkpoint_id,
             "branch_label": label,
-            "created_at": now_iso
+            "created_at": now_iso,
+            "ancestry": ancestry,
+            "seq_counter": 0,
+            "last_utterance_id": None
         }
         await self.branch_repo.create(branch_doc)
+        # Readers in every process check their cached tree against this
+        version = await self.session_repo.bump_branches_version(session_id)
+        if self.trees:
+            self.trees.on_branch_created(session_id, branch_doc, version)
         
         return ForkRes(
             branch_id=branch_id,
@@ -55,7 +97,7 @@ class VersionControl:
         await self.session_repo.update(session_id, {"active_branch_id": branch_id})
 
     async def list_branches(self, session_id: str) -> List[BranchOut]:
-        docs = await self.branch_repo.list_by_session(session_id)
+        docs = await self.branch_repo.list_by_session(session_id, projection=_BRANCH_SUMMARY_PROJECTION)
         return [BranchOut(
             branch_id=d["_id"],
             parent_branch_id=d.get("parent_branch_id"),
@@ -64,3 +106,34 @@ class VersionControl:
             branch_label=d["branch_label"],
             created_at=d.get("created_at")
         ) for d in docs]
+
+    async def get_tree(self, session_id: str) -> BranchTree:
+        tree, version = None, 0
+        if self.trees:
+            # Version first: branches listed after it include every fork it counts
+            version = await self.session_repo.get_branches_version(session_id)
+            tree = self.trees.get(session_id, version)
+        if tree is None:
+            docs = await self.branch_repo.list_by_session(session_id, projection=_BRANCH_SUMMARY_PROJECTION)
+            tree = BranchTree.from_docs(session_id, docs, version)
+            if self.trees and docs:
+                self.trees.put(tree)
+        return tree
+
+    async def get_session_tree(self, session_id: str, utterance_counts: Dict[str, int]) -> SessionTreeOut:
+        tree = await self.get_tree(session_id)
+        return SessionTreeOut(
+            session_id=session_id,
+            root_branch_ids=list(tree.roots),
+            branches=[BranchTreeNodeOut(
+                branch_id=n.branch_id,
+                parent_branch_id=n.parent_branch_id,
+                fork_from_utterance_id=n.fork_from_utterance_id,
+                fork_from_checkpoint_id=n.fork_from_checkpoint_id,
+                branch_label=n.branch_label,
+                created_at=n.created_at,
+                depth=n.depth,
+                children=list(n.children),
+                utterance_count=utterance_counts.get(n.branch_id, 0)
+            ) for n in tree.nodes.values()]
+        )
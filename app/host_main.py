@@ -0,0 +1,63 @@
+import sys
+import typing
+
+# Python 3.9 Compatibility Patch for libraries using TypeAlias
+if sys.version_info < (3, 10):
+    try:
+        from typing_extensions import TypeAlias
+        typing.TypeAlias = TypeAlias
+    except ImportError:
+        pass
+
+# Dedicated conductor host: runs the conductors, transcription workers and
+# speakers of many sessions on one event loop. Point the API at it with
+# CONDUCTOR_HOST_URL, e.g.
+#   uvicorn app.host_main:app --port 8100
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from app.core.logging import setup_logging
+from app.db import mongo
+from app.core.container import init_container, reset_container
+from app.domain.services.llm_gateway import llm_gateway
+from app.livekit.host import conductor_host, HostFullError
+
+setup_logging()
+
+class HostSessionReq(BaseModel):
+    session_id: str
+    branch_id: str
+    room_name: str
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Repos (one Mongo pool) and caches shared by every session on the host
+    mongo.connect()
+    init_container()
+    # Keep leases and reclaim sessions of hosts that died
+    conductor_host.start()
+    yield
+    await conductor_host.shutdown()
+    reset_container()
+    mongo.close()
+
+app = FastAPI(title="Facilitator Gym Conductor Host", lifespan=lifespan)
+
+@app.post("/sessions")
+async def start_session(req: HostSessionReq):
+    try:
+        await conductor_host.start_session(req.session_id, req.branch_id, req.room_name)
+    except HostFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "started"}
+
+@app.post("/sessions/{session_id}/stop")
+async def stop_session(session_id: str):
+    if await conductor_host.stop_session(session_id):
+        return {"status": "stopped"}
+    return {"status": "already_stopped"}
+
+@app.get("/stats")
+async def get_stats():
+    return {"host": conductor_host.snapshot(), "llm": llm_gateway.snapshot()}
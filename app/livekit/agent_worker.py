@@ -2,6 +2,7 @@ import asyncio
 import json
 import logging
 from livekit import rtc
+from app.core.config import settings
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,7 @@ class AgentWorker:
         
         # TTS Plugin
         from app.livekit.tts import get_tts_plugin
-        self.tts = get_tts_plugin("openai") # Default to OpenAI
+        self.tts = get_tts_plugin(settings.TTS_BACKEND)
 
     async def connect(self, url: str, token: str):
         await self.room.connect(url, token)
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from dataclasses import asdict
+from typing import List, Optional
+
+from app.domain.services.conductor_writer import ConductorWriter, TurnCommit
+
+logger = logging.getLogger(__name__)
+
+class CommitError(Exception):
+    """Some turns could not be committed yet; they stay queued for the next attempt."""
+
+
+class CommitQueue:
+    """
+    Write-behind queue for turn commits.
+    The Conductor enqueues a turn and moves on; a single worker drains the
+    queue in FIFO order (so per-branch order is kept) and commits whatever
+    has accumulated with ConductorWriter.append_batch. Failed batches are
+    retried with backoff; the event_id on each turn makes retries idempotent.
+    A batch that still fails on a transient error is held and retried ahead
+    of the next turns. A batch rejected with ValueError (e.g. its branch is
+    gone) is committed turn by turn instead; the turns that are rejected
+    again are quarantined (logged and kept in `quarantined`) so they cannot
+    block the queue.
+    Call flush() before anything that reads the transcript from the DB; it
+    raises CommitError while turns are held.
+    """
+    def __init__(
+        self,
+        writer: ConductorWriter,
+        session_id: str,
+        max_size: int = 64,
+        max_batch: int = 16,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.2,
+        max_retry_delay: float = 5.0
+    ):
+        self.writer = writer
+        self.session_id = session_id
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_retry_delay = max_retry_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._worker: Optional[asyncio.Task] = None
+        self._commit_lock = asyncio.Lock()
+        # Turns whose commit failed, oldest first; they go ahead of new turns
+        self.held: List[TurnCommit] = []
+        # Turns the writer rejected outright; never retried
+        self.quarantined: List[TurnCommit] = []
+        self.last_error: Optional[Exception] = None
+
+        # Telemetry
+        self.committed = 0
+        self.retries = 0
+        self.failed = 0 # Turns quarantined
+        self.batches = 0
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def enqueue(self, turn: TurnCommit) -> None:
+        """Queue a turn. Only blocks when the queue is full (backpressure)."""
+        self.start()
+        await self._queue.put(turn)
+
+    async def flush(self) -> None:
+        """
+        Wait until every queued turn has been committed. Held turns get one
+        more attempt; CommitError if they still fail.
+        """
+        self.start()
+        await self._queue.join()
+        if self.held:
+            async with self._commit_lock:
+                if self.held:
+                    await self._commit([])
+        if self.held:
+            raise CommitError(f"{len(self.held)} turn(s) not committed: {self.last_error}")
+
+    async def close(self) -> None:
+        try:
+            await self.flush()
+        except CommitError as e:
+            # Last chance to recover them by hand
+            logger.error(f"Closing with uncommitted turns [Session: {self.session_id}]: {e}; "
+                         f"{[asdict(t) for t in self.held]}")
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + len(self.held)
+
+    async def _run(self):
+        while True:
+            turn = await self._queue.get()
+            batch = [turn]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                async with self._commit_lock:
+                    await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit(self, batch: List[TurnCommit]):
+        """Commit the held turns, then batch; whatever fails transiently is held."""
+        turns = self.held + batch
+        if await self._commit_with_retry(turns):
+            self.held = []
+            self.last_error = None
+        elif isinstance(self.last_error, ValueError):
+            self.held = await self._commit_singly(turns)
+        else:
+            self.held = turns
+
+    async def _commit_singly(self, turns: List[TurnCommit]) -> List[TurnCommit]:
+        """
+        Commit turns one at a time, quarantining the ones the writer rejects.
+        Stops at the first transient error and returns the turns left to hold.
+        """
+        for i, turn in enumerate(turns):
+            try:
+                await self.writer.append_batch(self.session_id, [turn])
+                self.committed += 1
+                self.batches += 1
+            except ValueError as e:
+                self.failed += 1
+                self.quarantined.append(turn)
+                logger.error(f"Quarantined turn {turn.event_id} [Session: {self.session_id}]: {e}; {asdict(turn)}")
+            except Exception as e:
+                self.last_error = e
+                logger.error(f"Commit failed ({e}), holding events {[t.event_id for t in turns[i:]]} for the next attempt")
+                return turns[i:]
+        self.last_error = None
+        return []
+
+    async def _commit_with_retry(self, batch: List[TurnCommit]) -> bool:
+        delay = self.retry_base_delay
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.writer.append_batch(self.session_id, batch)
+                self.committed += len(batch)
+                self.batches += 1
+                logger.info(f"Committed {len(batch)} turn(s) [Session: {self.session_id}, pending: {self._queue.qsize()}]")
+                return True
+            except Exception as e:
+                self.last_error = e
+                if isinstance(e, ValueError) or attempt == self.max_retries:
+                    # ValueError (e.g. branch missing) won't fix itself within this attempt
+                    break
+                self.retries += 1
+                logger.warning(f"Commit attempt {attempt} failed: {e}. Retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+
+        if not isinstance(self.last_error, ValueError):
+            logger.error(f"Commit failed ({self.last_error}), holding events {[t.event_id for t in batch]} for the next attempt")
+        return False
@@ -13,17 +13,24 @@ import asyncio
 import json
 import logging
 import time
+import uuid
 from livekit import rtc
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 
-from app.domain.services.conductor_writer import ConductorWriter
+from app.domain.services.conductor_writer import ConductorWriter, TurnCommit
 from app.metrics.engine import MetricsEngine
 from app.domain.services.transcript_resolver import TranscriptResolver
-from app.livekit.protocol import AgentPacket, MsgType, SpeakCmdPayload
-from app.livekit.protocol import AgentPacket, MsgType, SpeakCmdPayload, PlayAssetCmdPayload
+from app.livekit.protocol import (
+    AgentPacket, MsgType, SpeakCmdPayload, PlayAssetCmdPayload, SpeakChunkPayload, PrepareCmdPayload, PrepareDropPayload,
+    SPEAKER_POOL_IDENTITY, AI_SPEAKERS, BOT_IDENTITIES
+)
+from app.core.config import settings
+from app.core.timing import PhaseTimer
 from app.domain.services.llm_service import LLMService
-from app.livekit.speculative import SpecPlanner, SpecPlan
+from app.domain.services.llm_gateway import llm_gateway
+from app.livekit.speculative import SpecPlanner
+from app.livekit.commit_queue import CommitError, CommitQueue
 
 import io
 import wave
@@ -31,6 +38,14 @@ import wave
 
 logger = logging.getLogger(__name__)
 
+# Pause between one turn's PLAYBACK_DONE and the next turn's audio, live
+# and in seed/replay playback; counted from PLAYBACK_DONE, so time spent
+# committing and planning is part of it rather than added to it
+TURN_GAP_S = 0.2
+REPLAY_TURN_GAP_S = 0.5
+# How long a chosen silence lasts unless the facilitator steps in
+SILENCE_WAIT_S = 4.0
+
 class ConductorState(str, Enum):
     INIT = "INIT"
     PLAYING_SEED = "PLAYING_SEED"
@@ -70,8 +85,15 @@ class Conductor:
         
         # Speculative Planning (Ticket 3/4)
         self.spec_planner: Optional[SpecPlanner] = None
-        self.spec_plan: Optional[SpecPlan] = None
-        self.spec_plan_task: Optional[asyncio.Task] = None
+        # turn_id -> (speaker_id, after_turn_id, plan_version) of audio asked for with PREPARE_CMD
+        self._prepared_turns: Dict[str, Tuple[str, str, int]] = {}
+        self.personas: Dict[str, str] = {}
+        self.active_speakers: List[str] = []
+        # Case study background for LLM prompts (set by the spawner)
+        self.case_study_context: Optional[str] = None
+        
+        # Write-behind turn commits (created on connect)
+        self.commit_queue: Optional[CommitQueue] = None
         
         # Synchronization
         self.live_loop_signal = asyncio.Event()
@@ -81,10 +103,25 @@ class Conductor:
         # Telemetry
         self.live_loop_signal: Optional[asyncio.Event] = None
         self.t_playback_done: float = 0.0
+        # turn_id -> (planning started, SPEAK_CMD sent), for time-to-first-audio
+        self._first_audio_marks: Dict[str, tuple] = {}
+        
+        # Per-phase turn timing (plan, pace, playback, commit, gap, ...)
+        self.phases = PhaseTimer()
+        self._gap_open = False # A PLAYBACK_DONE with no intervention since
+        self._t_dispatch: float = 0.0
+        self._t_intervention_done: Optional[float] = None
+        
+        # Loop wakeups: set while no intervention is in progress, and on
+        # anything that should cut a wait short (intervention, state change)
+        self._intervention_clear = asyncio.Event()
+        self._intervention_clear.set()
+        self._wake = asyncio.Event()
+        # Set once the session reaches ENDING (FINISH or disconnect)
+        self.ended = asyncio.Event()
         
         # PTT / STT State
         self.is_recording_facilitator = False
-        self.is_processing_intervention = False
         self.intervention_stats = {}
         # Audio handling removed (Worker)
         
@@ -95,9 +132,25 @@ class Conductor:
         self.room.on("participant_disconnected", self.on_participant_disconnected)
         self.room.on("track_subscribed", self.on_track_subscribed)
 
-    async def connect(self, url: str, token: str, session_id: str, branch_id: str):
+    @property
+    def is_processing_intervention(self) -> bool:
+        return not self._intervention_clear.is_set()
+
+    @is_processing_intervention.setter
+    def is_processing_intervention(self, value: bool) -> None:
+        if value:
+            self._intervention_clear.clear()
+            self._gap_open = False
+            self._wake.set()
+        elif not self._intervention_clear.is_set():
+            self._intervention_clear.set()
+            self._t_intervention_done = time.time()
+
+    async def connect(self, url: str, token: str, session_id: str, branch_id: str, resume: bool = False):
         self.session_id = session_id
         self.branch_id = branch_id
+        self.commit_queue = CommitQueue(self.writer, session_id)
+        self.commit_queue.start()
         await self.room.connect(url, token)
         logger.info(f"Conductor connected to room {self.room.name}")
         
@@ -107,16 +160,19 @@ class Conductor:
         # Broadcast initial clock sync to frontend
         await self.broadcast_clock_sync()
         
-        # Initial transition
-        await self.transition_to(ConductorState.PLAYING_SEED)
+        # Initial transition (a resumed session already played its seed)
+        await self.transition_to(ConductorState.LIVE if resume else ConductorState.PLAYING_SEED)
 
     async def disconnect(self):
         await self.transition_to(ConductorState.ENDING)
+        if self.commit_queue:
+            await self.commit_queue.close()
         await self.room.disconnect()
 
     async def transition_to(self, new_state: ConductorState):
         logger.info(f"State transition: {self.state} -> {new_state} [Session: {self.session_id}]")
         self.state = new_state
+        self._wake.set()
         
         if new_state == ConductorState.PLAYING_SEED:
             self.seed_task = asyncio.create_task(self._run_seed_playback())
@@ -124,19 +180,25 @@ class Conductor:
             self.seed_task = asyncio.create_task(self._run_live_loop())
         elif new_state == ConductorState.PAUSED:
             if self.seed_task: self.seed_task.cancel()
-            if self.spec_plan_task: self.spec_plan_task.cancel()
+            self._discard_speculation()
             # Stop audio?
             if self.current_speaker:
                 asyncio.create_task(self.send_stop_cmd(self.current_speaker))
+            # Persist queued turns while paused (rewind reads them next)
+            try:
+                await self._flush_commits()
+            except CommitError as e:
+                # Rewind flushes again and refuses to plan until this clears
+                logger.error(f"Turns not persisted on pause: {e}")
                 
         elif new_state == ConductorState.REPLAYING:
             self.seed_task = asyncio.create_task(self._run_replay_loop())
             
         elif new_state == ConductorState.ENDING:
+            self.ended.set()
             if self.seed_task:
                 self.seed_task.cancel()
-            if self.spec_plan_task:
-                self.spec_plan_task.cancel()
+            self._discard_speculation()
             # Cleanup STT (Removed)
 
     # -------------------------------------------------------------------------
@@ -193,10 +255,8 @@ class Conductor:
             
             asyncio.create_task(self._process_intervention(sender_id))
             
-            # Cancel Speculation (Ticket 5)
-            if self.spec_plan_task:
-                self.spec_plan_task.cancel()
-            self.spec_plan = None
+            # Cancel Speculation (Ticket 5); the reply is planned once the transcript lands
+            self._discard_speculation()
             self.state_version += 1
             
             # Send ACK (Reliability Task 3.1)
@@ -229,6 +289,7 @@ class Conductor:
             self.playback_done_event.set()
             # Telemetry: Log gap start
             self.t_playback_done = time.time()
+            self._gap_open = True
             
             # Record t_end_ms (Ticket 2)
             t_end_ms = int(self.clock.now_ms())
@@ -247,12 +308,14 @@ class Conductor:
                 
                 logger.info(f"Turn {packet.turn_id} timing: {timing_data['t_start_ms']}ms - {t_end_ms}ms")
             
+            self._log_first_audio(packet.turn_id, packet.payload.get("first_audio_ms"))
+            
             # Store playback metadata for commit
             self.last_playback_duration = packet.payload.get("duration_ms", 0)
             self.last_playback_audio_url = packet.payload.get("audio_url")
             
-            # Relay to frontend for UI update
-            asyncio.create_task(self.broadcast_playback_done(sender_id))
+            # Relay to frontend for UI update (a speaker pool sends for all its voices)
+            asyncio.create_task(self.broadcast_playback_done(packet.payload.get("speaker_id") or sender_id))
             if self.live_loop_signal:
                 self.live_loop_signal.set()
         elif packet.type == MsgType.FINISH:
@@ -333,6 +396,9 @@ class Conductor:
 
             logger.info(f"Planning rewind to {target_utterance_id}...")
             
+            # Rewind plans against the DB transcript; make sure it is complete (CommitError if not)
+            await self._flush_commits()
+            
             # Call Rewind Service
             plan = await self.rewind_service.create_rewind_plan(
                 self.session_id, 
@@ -394,6 +460,11 @@ class Conductor:
                         await self.replay_event_repo.update_status(replay_event_id, "canceled", canceled_at_turn_id=u.utterance_id)
                     break
                 
+                self._wake.clear()
+                await self._pace_turn(REPLAY_TURN_GAP_S)
+                if self.state != ConductorState.REPLAYING or self.is_processing_intervention:
+                    continue
+                
                 self.current_speaker = u.speaker_id
                 logger.info(f"Replaying: {u.text} (Speaker: {u.speaker_id})")
                 
@@ -424,8 +495,6 @@ class Conductor:
                 
                 # Speculative planning will start naturally when transitioning to LIVE
                 
-                await asyncio.sleep(0.5)
-                
             # Loop finished or interrupted
             if self.state == ConductorState.REPLAYING:
                 if replay_event_id:
@@ -460,6 +529,8 @@ class Conductor:
             for seed in seeds:
                 if self.state != ConductorState.PLAYING_SEED: break
                 
+                self._wake.clear()
+                await self._pace_turn(REPLAY_TURN_GAP_S)
                 self.current_speaker = seed.speaker_id
                 logger.info(f"Playing seed: {seed.text} (Speaker: {seed.speaker_id})")
                 
@@ -481,8 +552,6 @@ class Conductor:
                 except asyncio.TimeoutError:
                     logger.warning(f"Timeout waiting for playback_done from {seed.speaker_id}")
                 
-                await asyncio.sleep(0.5) # Inter-turn pause
-                
             logger.info("Seed playback complete.")
             await self.transition_to(ConductorState.LIVE)
             
@@ -499,13 +568,23 @@ class Conductor:
         logger.info("Starting LIVE loop...")
         
         # Init LLM
-        # Init LLM
-        llm = LLMService()
-        self.spec_planner = SpecPlanner(llm)
+        llm = LLMService(case_study=self.case_study_context, session_id=self.session_id)
+        self.spec_planner = SpecPlanner(
+            llm, on_ready=self.send_prepare_cmd if settings.SPEC_PREPARE_AUDIO else None,
+            capacity=lambda: llm_gateway.spare(self.session_id)
+        )
         
         # Initialize History Cache (Ticket 2)
+        held = []
+        try:
+            await self._flush_commits()
+        except CommitError as e:
+            # Carry on; the held turns are committed ahead of the next ones
+            logger.error(f"Starting LIVE with uncommitted turns: {e}")
+            held = [t for t in self.commit_queue.held if t.branch_id == self.branch_id]
         view = await self.resolver.get_transcript_view(self.session_id, self.branch_id)
         self.history_cache = [f"{u.speaker_id}: {u.text}" for u in view.utterances]
+        self.history_cache += [f"{t.speaker_id}: {t.text}" for t in held]
         logger.info(f"Initialized history_cache with {len(self.history_cache)} items")
         
         # Personas (Hardcoded for MVP)
@@ -515,12 +594,19 @@ class Conductor:
             "charlie": "You are Charlie, a detail-oriented analyst. You love data but can get bogged down."
         }
         active_speakers = list(personas.keys())
+        self.personas = personas
+        self.active_speakers = active_speakers
         
         while self.state == ConductorState.LIVE:
             try:
-                # Wait if processing intervention
-                while self.is_processing_intervention:
-                    await asyncio.sleep(0.1)
+                self._wake.clear()
+                self._log_turn_phases()
+                
+                # Resume the moment the facilitator's turn has landed
+                if self.is_processing_intervention:
+                    t_wait = time.time()
+                    await self._intervention_clear.wait()
+                    self.phases.observe("intervention_wait", (time.time() - t_wait) * 1000)
 
                 # 1. Fetch Context (Ticket 2: Use Cache)
                 # view = await self.resolver.get_transcript_view(self.session_id, self.branch_id)
@@ -529,26 +615,26 @@ class Conductor:
                 
                 # 2. Plan Next Turn (Ticket 4: Speculative vs Sync)
                 plan_data = None
+                turn_id = f"turn-{int(time.time()*1000)}"
+                t_plan_start = time.time()
                 
-                # Check if we have a valid speculative plan
-                if (self.spec_plan and 
-                    self.spec_plan.after_turn_id == self.current_turn_id and # Wait, current_turn_id is the *previous* turn? No, it's the one that just finished.
-                    # Actually, when PLAYBACK_DONE arrives, current_turn_id is the turn that just finished.
-                    # The spec plan was created *during* that turn, so its after_turn_id should match.
-                    # But wait, current_turn_id is set when we send SPEAK_CMD.
-                    # So when we loop around, current_turn_id is the one that just finished.
-                    # Yes.
-                    self.spec_plan.plan_version == self.state_version and
-                    not self.is_processing_intervention):
-                    
-                    logger.info("Using speculative plan!")
+                # Use the speculation tree if it was built for this exact state
+                # (same state_version and history), after a turn or an intervention
+                spec = await self.spec_planner.take(self.state_version, len(history))
+                if spec and not self.is_processing_intervention:
+                    logger.info(f"Using speculative plan ({spec.kind})!")
+                    # Speaker may already hold audio prepared under this id
+                    turn_id = spec.turn_id
                     # Telemetry: spec_used = True
                     plan_data = {
-                        "speaker_id": self.spec_plan.speaker_id,
-                        "text": self.spec_plan.text
+                        "speaker_id": spec.speaker_id,
+                        "text": spec.text,
+                        "reason": spec.reason
                     }
-                    # Clear it so we don't reuse
-                    self.spec_plan = None
+                elif settings.LLM_STREAM_PLANNING:
+                    logger.info("Streaming planning.")
+                    # Speaks as soon as the speaker and first sentence are parsed
+                    plan_data = await self._stream_plan_and_speak(llm, history, personas, active_speakers, turn_id, t_plan_start)
                 else:
                     logger.info("Fallback to synchronous planning.")
                     # Telemetry: spec_used = False
@@ -557,12 +643,16 @@ class Conductor:
                 speaker_id = plan_data.get("speaker_id")
                 text = plan_data.get("text")
                 reason = plan_data.get("reason", "Speculative" if not plan_data.get("reason") else plan_data.get("reason"))
+                dispatched = plan_data.get("dispatched", False)
                 
                 logger.info(f"Turn Plan: {speaker_id} ({reason})")
                 
                 # RACE CONDITION CHECK 1
                 if self.is_processing_intervention:
                     logger.info("Intervention detected after planning. Discarding plan.")
+                    if dispatched:
+                        self.current_speaker = None
+                        self.live_loop_signal = None
                     continue
                 
                 if speaker_id == "silence":
@@ -571,12 +661,12 @@ class Conductor:
                     await self.broadcast_silence()
                     
                     # Wait for a while or until intervention
-                    await asyncio.sleep(4.0) 
+                    await self._wait_for(self._wake, SILENCE_WAIT_S)
                     continue
 
                 if speaker_id not in active_speakers:
                      logger.warning(f"LLM chose invalid speaker {speaker_id}. Skipping.")
-                     await asyncio.sleep(1.0)
+                     await self._wait_for(self._wake, 1.0)
                      continue
                 
                 # Text is already generated in plan
@@ -584,17 +674,11 @@ class Conductor:
                     text = "..." # Fallback?
                 
                 # 4. Speak
-                self.current_speaker = speaker_id
-                self.live_loop_signal = asyncio.Event()
-                
-                # Generate turn_id
-                turn_id = f"turn-{int(time.time()*1000)}"
-                self.current_turn_id = turn_id
-                
-                # Telemetry: Gap Duration
-                if self.t_playback_done > 0:
-                    gap_ms = (time.time() - self.t_playback_done) * 1000
-                    logger.info(f"Gap Duration: {gap_ms:.2f}ms")
+                if not dispatched:
+                    await self._pace_turn(TURN_GAP_S)
+                    if self.is_processing_intervention or self.state != ConductorState.LIVE:
+                        continue
+                    self._begin_turn(speaker_id, turn_id)
                 
                 # Spawn Speculative Planner (Ticket 4)
                 # We want to plan what happens *after* this turn.
@@ -602,21 +686,16 @@ class Conductor:
                 # But we can't append to history_cache yet (that happens on commit).
                 # So we construct a temporary history.
                 spec_history = history + [f"{speaker_id}: {text}"]
+                self.spec_planner.expand(spec_history, personas, active_speakers, self.state_version, turn_id)
                 
-                if self.spec_plan_task:
-                    self.spec_plan_task.cancel()
-                
-                self.spec_plan_task = asyncio.create_task(self._run_spec_planner(
-                    spec_history, personas, active_speakers, self.state_version, turn_id
-                ))
-                
-                await self.send_speak_cmd(speaker_id, text, audio_url=None, turn_id=turn_id)
+                if not dispatched:
+                    self._mark_dispatch(turn_id, t_plan_start)
+                    await self.send_speak_cmd(speaker_id, text, audio_url=None, turn_id=turn_id)
                 
                 # 5. Wait for Done (with timeout)
-                try:
-                    await asyncio.wait_for(self.live_loop_signal.wait(), timeout=15.0)
-                except asyncio.TimeoutError:
+                if not await self._wait_for(self.live_loop_signal, 15.0):
                     logger.warning("Turn timed out.")
+                self.phases.observe("playback", (time.time() - self._t_dispatch) * 1000)
                 
                 self.current_speaker = None
                 self.live_loop_signal = None
@@ -630,7 +709,9 @@ class Conductor:
                 audio_url = getattr(self, "last_playback_audio_url", None)
                 duration_ms = getattr(self, "last_playback_duration", 0)
                 
-                await self._commit_ai_turn(speaker_id, text, audio_url, duration_ms)
+                t_commit = time.time()
+                await self._commit_ai_turn(speaker_id, text, audio_url, duration_ms, turn_id=turn_id)
+                self.phases.observe("commit", (time.time() - t_commit) * 1000)
                 
                 # Reset for next turn
                 self.last_playback_audio_url = None
@@ -640,21 +721,136 @@ class Conductor:
                 if await self._check_objectives(history + [f"{speaker_id}: {text}"]):
                     logger.info("Objectives met! Ending session.")
                     break
-
-                # Reduced Inter-turn delay (Ticket 4)
-                await asyncio.sleep(0.2) # 200ms natural gap
                 
             except asyncio.CancelledError:
                 logger.info("Live loop cancelled")
                 break
             except Exception as e:
                 logger.error(f"Live loop error: {e}")
-                await asyncio.sleep(2.0)
+                await self._wait_for(self._wake, 2.0)
 
-    async def _commit_ai_turn(self, identity: str, text: str, audio_url: Optional[str] = None, duration_ms: int = 0):
+    def _begin_turn(self, speaker_id: str, turn_id: str):
+        self.current_speaker = speaker_id
+        self.live_loop_signal = asyncio.Event()
+        self.current_turn_id = turn_id
+
+    async def _stream_plan_and_speak(self, llm: LLMService, history: List[str], personas: Dict[str, str],
+                                     active_speakers: List[str], turn_id: str, t_plan_start: float) -> Dict[str, Any]:
+        """
+        Plan the next turn from the streamed completion and start speaking
+        early: SPEAK_CMD goes out with the first sentence as soon as the
+        speaker is known, later sentences follow as SPEAK_CHUNKs. Returns the
+        plan, with "dispatched" set if the turn has already been sent.
+        """
+        version = self.state_version
+        speaker_id = None
+        sentences: List[str] = []
+        plan = None
+        dispatched = False
+        interrupted = False
+        
+        events = llm.stream_plan_next_turn(history, personas, active_speakers)
+        try:
+            async for event in events:
+                if self.is_processing_intervention or self.state_version != version:
+                    interrupted = True
+                    break
+                if event["type"] == "speaker":
+                    speaker_id = event["speaker_id"]
+                    if speaker_id not in active_speakers:
+                        # Silence or an invalid choice: nothing to speak
+                        break
+                elif event["type"] == "sentence":
+                    sentences.append(event["text"])
+                    if not dispatched:
+                        await self._pace_turn(TURN_GAP_S)
+                        if self.is_processing_intervention or self.state_version != version:
+                            interrupted = True
+                            break
+                        self._begin_turn(speaker_id, turn_id)
+                        self._mark_dispatch(turn_id, t_plan_start)
+                        await self.send_speak_cmd(speaker_id, event["text"], turn_id=turn_id, streaming=True)
+                        dispatched = True
+                    else:
+                        await self.send_speak_chunk(speaker_id, event["text"], turn_id)
+                elif event["type"] == "done":
+                    plan = event["plan"]
+        finally:
+            await events.aclose()
+            if dispatched:
+                if interrupted:
+                    await self.send_stop_cmd(speaker_id)
+                else:
+                    await self.send_speak_chunk(speaker_id, "", turn_id, final=True)
+        
+        plan = dict(plan or {"speaker_id": speaker_id or "silence", "reason": "Stream ended early"})
+        if dispatched:
+            # What was actually spoken is what gets committed
+            plan["speaker_id"] = speaker_id
+            plan["text"] = " ".join(sentences)
+        plan["dispatched"] = dispatched
+        return plan
+
+    async def _wait_for(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait for event for at most timeout seconds; True if it was set."""
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _pace_turn(self, gap_s: float) -> None:
+        """Hold the next turn until gap_s after the last PLAYBACK_DONE (or a wakeup)."""
+        delay = self.t_playback_done + gap_s - time.time()
+        if self.t_playback_done and delay > 0:
+            t0 = time.time()
+            await self._wait_for(self._wake, delay)
+            self.phases.observe("pace", (time.time() - t0) * 1000)
+
+    def _mark_dispatch(self, turn_id: str, t_plan_start: float):
+        """The turn is about to go out: record planning time and the gap it closes."""
+        now = self._t_dispatch = time.time()
+        self._first_audio_marks[turn_id] = (t_plan_start, now)
+        self.phases.observe("plan", (now - t_plan_start) * 1000)
+        if self._gap_open:
+            # Silence between the previous turn and this one
+            self.phases.observe("gap", (now - self.t_playback_done) * 1000)
+            self._gap_open = False
+        elif self._t_intervention_done:
+            # Facilitator's transcript landed -> reply dispatched
+            self.phases.observe("reply", (now - self._t_intervention_done) * 1000)
+        self._t_intervention_done = None
+
+    def _log_turn_phases(self):
+        phases = self.phases.reset_current()
+        if phases:
+            logger.info("Turn phases: " + ", ".join(f"{k}={v:.0f}ms" for k, v in phases.items()))
+
+    def _log_first_audio(self, turn_id: Optional[str], first_audio_ms: Optional[int]):
+        marks = self._first_audio_marks.pop(turn_id, None) if turn_id else None
+        if not marks or first_audio_ms is None:
+            return
+        t_plan_start, t_dispatch = marks
+        plan_ms = (t_dispatch - t_plan_start) * 1000
+        self.phases.observe("first_audio", plan_ms + first_audio_ms)
+        logger.info(
+            f"Time to first audio [{turn_id}]: {plan_ms + first_audio_ms:.0f}ms "
+            f"(plan->dispatch {plan_ms:.0f}ms, dispatch->audio {first_audio_ms}ms)"
+        )
+
+    def _turn_timing(self, recorded: Optional[Dict[str, Any]], duration_ms: int = 0) -> Dict[str, Any]:
+        """Session-clock timing for a turn; without a recorded span it ends now."""
+        if recorded and "t_end_ms" in recorded:
+            return {k: v for k, v in recorded.items() if k in ("t_start_ms", "t_end_ms", "wall_start_ts", "wall_end_ts")}
+        t_end_ms = int(self.clock.now_ms())
+        return {"t_start_ms": max(t_end_ms - duration_ms, 0), "t_end_ms": t_end_ms}
+
+    async def _commit_ai_turn(self, identity: str, text: str, audio_url: Optional[str] = None, duration_ms: int = 0, turn_id: Optional[str] = None):
         if not self.writer: return
-        event_id = f"urn-ai-{int(time.time()*1000)}"
-        timing = {"t_start_ms": 0, "t_end_ms": duration_ms or 1000} 
+        event_id = f"urn-ai-{uuid.uuid4()}"
+        # Recorded between SPEAK_CMD and PLAYBACK_DONE
+        recorded = getattr(self, "_completed_turn_timing", {}).pop(turn_id, None) if turn_id else None
+        timing = self._turn_timing(recorded, duration_ms)
         
         audio_ref = {}
         if audio_url:
@@ -663,29 +859,36 @@ class Conductor:
                 "duration_ms": duration_ms
             }
         
+        await self._commit_turn(TurnCommit(
+            self.branch_id, "ai", identity, text, timing, {}, event_id, audio_ref
+        ))
+
+    async def _commit_turn(self, turn: TurnCommit):
+        """Hand a turn to the write-behind queue (or write inline before connect)."""
+        if self.commit_queue:
+            await self.commit_queue.enqueue(turn)
+            return
         await self.writer.append_utterance_and_checkpoint(
             self.session_id, 
-            self.branch_id, 
-            "ai", 
-            identity, 
-            text, 
-            timing, 
-            {}, 
-            event_id,
-            audio_ref=audio_ref
+            turn.branch_id, 
+            turn.kind, 
+            turn.speaker_id, 
+            turn.text, 
+            turn.timing, 
+            turn.state_snapshot, 
+            turn.event_id,
+            audio_ref=turn.audio_ref
         )
 
-    async def _run_spec_planner(self, history, personas, active_speakers, version, after_turn_id):
-        try:
-            logger.info(f"Starting speculative plan for after {after_turn_id} (v{version})")
-            plan = await self.spec_planner.plan_next(history, personas, active_speakers, version, after_turn_id)
-            if plan:
-                self.spec_plan = plan
-                logger.info(f"Speculative plan ready: {plan.speaker_id}")
-        except asyncio.CancelledError:
-            logger.info("Speculative planning cancelled")
-        except Exception as e:
-            logger.error(f"Speculative planning error: {e}")
+    async def _flush_commits(self):
+        if self.commit_queue:
+            await self.commit_queue.flush()
+
+    def _discard_speculation(self):
+        if self.spec_planner:
+            self.spec_planner.discard()
+            if settings.SPEC_PREPARE_AUDIO:
+                asyncio.create_task(self.send_prepare_drop(self.state_version))
 
     async def _check_objectives(self, history: List[str]) -> bool:
         """
@@ -697,10 +900,47 @@ class Conductor:
             return True
         return False
 
+    # -------------------------------------------------------------------------
+    # Addressing
+    # -------------------------------------------------------------------------
+    async def _publish(self, packet: AgentPacket, to: List[str]):
+        """
+        Send a packet to the given participants only (to everyone with
+        CONDUCTOR_BROADCAST_MIRROR, for observers that want the full stream).
+        Nobody to send to means no send: LiveKit reads [] as everyone.
+        """
+        if settings.CONDUCTOR_BROADCAST_MIRROR:
+            to = []
+        elif not to:
+            return
+        await self.room.local_participant.publish_data(
+            packet.model_dump_json().encode("utf-8"),
+            reliable=True,
+            destination_identities=to
+        )
+
+    def _remote_identities(self) -> List[str]:
+        return list(getattr(self.room, "remote_participants", None) or {})
+
+    def _ui_participants(self) -> List[str]:
+        """Facilitator clients: everyone in the room who isn't a bot or AI speaker."""
+        return [i for i in self._remote_identities() if i not in BOT_IDENTITIES]
+
+    def _speaker_participant(self, speaker_id: str) -> str:
+        """LiveKit identity that receives a speaker's commands."""
+        return SPEAKER_POOL_IDENTITY if settings.SPEAKER_POOL else speaker_id
+
+    def _speaker_participants(self) -> List[str]:
+        return [i for i in self._remote_identities() if i in AI_SPEAKERS or i == SPEAKER_POOL_IDENTITY]
+
+    def _speaker_audience(self, speaker_id: str) -> List[str]:
+        """A turn command goes to its speaker and to the frontend, which shows who is talking."""
+        return [self._speaker_participant(speaker_id)] + self._ui_participants()
+
     # -------------------------------------------------------------------------
     # Commands
     # -------------------------------------------------------------------------
-    async def send_speak_cmd(self, participant_id: str, text: str, audio_url: Optional[str] = None, turn_id: Optional[str] = None):
+    async def send_speak_cmd(self, participant_id: str, text: str, audio_url: Optional[str] = None, turn_id: Optional[str] = None, streaming: bool = False):
         # Record timing (Ticket 2)
         t_start_ms = int(self.clock.now_ms())
         wall_start_ts = time.time()
@@ -721,29 +961,79 @@ class Conductor:
             payload=SpeakCmdPayload(
                 text=text, 
                 speaker_id=participant_id,
-                audio_url=audio_url
+                audio_url=audio_url,
+                streaming=streaming
             ).model_dump()
         )
-        msg_str = cmd.model_dump_json()
-        
-        # Broadcast to all so frontend sees it too
-        logger.info(f"Broadcasting SPEAK_CMD for {participant_id} at t={t_start_ms}ms")
-        await self.room.local_participant.publish_data(
-            msg_str.encode("utf-8"), 
-            reliable=True, 
-            destination_identities=[] # Broadcast
+        # The frontend shows who is speaking
+        logger.info(f"Sending SPEAK_CMD for {participant_id} at t={t_start_ms}ms")
+        await self._publish(cmd, self._speaker_audience(participant_id))
+        if turn_id:
+            await self._drop_unusable_prepared(turn_id)
+
+    async def send_speak_chunk(self, participant_id: str, text: str, turn_id: str, final: bool = False):
+        cmd = AgentPacket(
+            type=MsgType.SPEAK_CHUNK,
+            session_id=self.session_id,
+            turn_id=turn_id,
+            payload=SpeakChunkPayload(text=text, speaker_id=participant_id, final=final).model_dump()
+        )
+        await self._publish(cmd, [self._speaker_participant(participant_id)])
+
+    async def send_prepare_cmd(self, plan):
+        """Ask the planned speaker to pre-synthesize a speculated turn."""
+        if plan.speaker_id not in self.active_speakers or not plan.text:
+            return
+        cmd = AgentPacket(
+            type=MsgType.PREPARE_CMD,
+            session_id=self.session_id,
+            turn_id=plan.turn_id,
+            payload=PrepareCmdPayload(
+                text=plan.text, speaker_id=plan.speaker_id, state_version=plan.plan_version
+            ).model_dump()
         )
+        await self._publish(cmd, [self._speaker_participant(plan.speaker_id)])
+        self._prepared_turns[plan.turn_id] = (plan.speaker_id, plan.after_turn_id, plan.plan_version)
+
+    async def send_prepare_drop(self, state_version: int):
+        cmd = AgentPacket(
+            type=MsgType.PREPARE_DROP,
+            session_id=self.session_id,
+            payload=PrepareDropPayload(state_version=state_version).model_dump()
+        )
+        await self._publish(cmd, self._speaker_participants())
+        self._prepared_turns = {
+            t: p for t, p in self._prepared_turns.items() if p[2] > state_version
+        }
+
+    async def _drop_unusable_prepared(self, turn_id: str):
+        """
+        turn_id just started: audio prepared for other turns that don't
+        follow it can't be used any more. Speakers only see their own
+        SPEAK_CMDs, so tell the ones holding it to stop synthesizing.
+        """
+        self._prepared_turns.pop(turn_id, None)
+        moot: Dict[str, List[str]] = {}
+        for t, (speaker_id, after_turn_id, _) in list(self._prepared_turns.items()):
+            if after_turn_id != turn_id:
+                del self._prepared_turns[t]
+                moot.setdefault(self._speaker_participant(speaker_id), []).append(t)
+        for participant, turn_ids in moot.items():
+            cmd = AgentPacket(
+                type=MsgType.PREPARE_DROP,
+                session_id=self.session_id,
+                payload=PrepareDropPayload(turn_ids=turn_ids).model_dump()
+            )
+            await self._publish(cmd, [participant])
 
     async def send_stop_cmd(self, participant_id: str):
+        # Only the speaker who has the floor has anything to stop
         cmd = AgentPacket(
             type=MsgType.STOP_CMD,
-            session_id=self.session_id
-        )
-        await self.room.local_participant.publish_data(
-            cmd.model_dump_json().encode("utf-8"),
-            reliable=True,
-            destination_identities=[] # Broadcast
+            session_id=self.session_id,
+            payload={"speaker_id": participant_id}
         )
+        await self._publish(cmd, [self._speaker_participant(participant_id)])
 
     async def broadcast_playback_done(self, speaker_id: str):
         logger.info(f"Broadcasting PLAYBACK_DONE for {speaker_id}")
@@ -753,11 +1043,7 @@ class Conductor:
             session_id=self.session_id,
             payload={"speaker_id": speaker_id}
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True,
-            destination_identities=[]
-        )
+        await self._publish(msg, self._ui_participants())
 
     async def send_play_asset_cmd(self, participant_id: str, audio_url: str, text: Optional[str] = None, turn_id: Optional[str] = None):
         # Record timing (Ticket 2)
@@ -783,24 +1069,15 @@ class Conductor:
                 turn_id=turn_id
             ).model_dump()
         )
-        msg_str = cmd.model_dump_json()
-        
-        logger.info(f"Broadcasting PLAY_ASSET_CMD for {participant_id} at t={t_start_ms}ms")
-        await self.room.local_participant.publish_data(
-            msg_str.encode("utf-8"), 
-            reliable=True, 
-            destination_identities=[] # Broadcast
-        )
+        logger.info(f"Sending PLAY_ASSET_CMD for {participant_id} at t={t_start_ms}ms")
+        await self._publish(cmd, self._speaker_audience(participant_id))
 
     async def broadcast_silence(self):
         msg = AgentPacket(
             type="silence_start", # Custom type for frontend
             session_id=self.session_id
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
 
     async def broadcast_replay_progress(self, replay_event_id: str, turn_id: str, index: int, total: int):
         msg = AgentPacket(
@@ -813,72 +1090,54 @@ class Conductor:
                 "total": total
             }
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
 
     async def broadcast_clock_sync(self):
-        """Broadcast current clock state to all clients."""
+        """Send the current clock state to the facilitator clients."""
         msg = AgentPacket(
             type=MsgType.CLOCK_SYNC,
             session_id=self.session_id,
             payload=self.clock.to_sync_payload()
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
         logger.info(f"Broadcast CLOCK_SYNC: {self.clock.to_sync_payload()}")
 
     async def broadcast_clock_pause(self, session_time_ms: float):
-        """Broadcast clock pause to all clients."""
+        """Send a clock pause to the facilitator clients."""
         msg = AgentPacket(
             type=MsgType.CLOCK_PAUSE,
             session_id=self.session_id,
             payload={"session_time_ms": session_time_ms}
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
 
     async def broadcast_clock_resume(self, session_time_ms: float):
-        """Broadcast clock resume to all clients."""
+        """Send a clock resume to the facilitator clients."""
         msg = AgentPacket(
             type=MsgType.CLOCK_RESUME,
             session_id=self.session_id,
             payload={"session_time_ms": session_time_ms}
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
 
     async def broadcast_clock_rewind(self, target_ms: float):
-        """Broadcast clock rewind to all clients."""
+        """Send a clock rewind to the facilitator clients."""
         msg = AgentPacket(
             type=MsgType.CLOCK_REWIND,
             session_id=self.session_id,
             payload={"session_time_ms": target_ms}
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
 
     async def broadcast_branch_switch(self, new_branch_id: str):
-        """Broadcast branch switch to all clients (after rewind/fork)."""
+        """Send a branch switch to the facilitator clients (after rewind/fork)."""
         logger.info(f"Broadcasting BRANCH_SWITCH to branch {new_branch_id}")
         msg = AgentPacket(
             type=MsgType.BRANCH_SWITCH,
             session_id=self.session_id,
             payload={"branch_id": new_branch_id}
         )
-        await self.room.local_participant.publish_data(
-            msg.model_dump_json().encode("utf-8"),
-            reliable=True
-        )
+        await self._publish(msg, self._ui_participants())
 
     # -------------------------------------------------------------------------
     # Connection handling
@@ -890,7 +1149,7 @@ class Conductor:
         logger.info(f"DEBUG: Track subscribed: {participant.identity} kind={track.kind}")
         if track.kind == rtc.TrackKind.KIND_AUDIO:
              # Heuristic: if it's not a bot, it's a human (facilitator)
-             if participant.identity not in ["alice", "bob", "charlie", "conductor-bot"]:
+             if participant.identity not in BOT_IDENTITIES:
                 logger.info(f"Subscribed to audio track for {participant.identity}")
                 
                 # Task 1.4: Send Server Confirmation (Mic Seen)
@@ -933,13 +1192,20 @@ class Conductor:
             self.is_processing_intervention = False
             return
 
-        # 1. Commit to DB (Wait for it!)
-        # Crucial: We must wait for this to complete so the next fetch sees it.
+        # 1. Commit to DB
+        # Queued behind any pending AI turns so branch order is preserved;
+        # readers of the DB transcript (rewind, live loop start) flush first.
         
         # Update Cache (Ticket 2)
         self.history_cache.append(f"{speaker_id}: {text}")
         self.state_version += 1 # Invalidate any stale plans
         
+        # Start planning the reply now, in parallel with the commit
+        if self.spec_planner and self.state == ConductorState.LIVE:
+            self.spec_planner.plan_intervention(
+                list(self.history_cache), self.personas, self.active_speakers, self.state_version
+            )
+        
         await self._commit_user_turn(speaker_id, text)
         
         # 2. Notify Live Loop to proceed
@@ -949,21 +1215,16 @@ class Conductor:
     async def _commit_user_turn(self, identity: str, text: str):
         if not self.writer: return
         
-        timing = {"t_start_ms": 0, "t_end_ms": 1000} # Stub timing
-        event_id = f"urn-{int(time.time()*1000)}"
+        # Recorded between FAC_START and FAC_END
+        timing = self._turn_timing(getattr(self, "_pending_facilitator_timing", None))
+        self._pending_facilitator_timing = None
+        event_id = f"urn-{uuid.uuid4()}"
         
         try:
             logger.info(f"Committing facilitator turn: {text}")
-            await self.writer.append_utterance_and_checkpoint(
-                self.session_id, 
-                self.branch_id, 
-                "user_intervention", 
-                identity, 
-                text, 
-                timing, 
-                {}, 
-                event_id
-            )
+            await self._commit_turn(TurnCommit(
+                self.branch_id, "user_intervention", identity, text, timing, {}, event_id
+            ))
         except Exception as e:
             logger.error(f"Failed to commit user turn: {e}")
             
@@ -0,0 +1,427 @@
+import asyncio
+import contextvars
+import logging
+import os
+import socket
+import time
+from collections.abc import Coroutine
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.container import get_container
+from app.core.timing import LatencyHistogram
+from app.domain.services.session_registry import SessionRegistry
+from app.livekit.conductor import Conductor
+from app.livekit.protocol import AI_SPEAKERS, SPEAKER_POOL_IDENTITY
+from app.livekit.speaker_worker import SpeakerPool, SpeakerWorker
+from app.livekit.tokens import create_token, VideoGrants
+from app.transcription.worker import TranscriptionWorker
+
+logger = logging.getLogger(__name__)
+
+# Session whose work the running code is doing; tasks inherit it, so every
+# task a session's conductor, speakers or room callbacks start is charged to it
+current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_session", default=None)
+
+SPEAKERS = list(AI_SPEAKERS)
+VOICE_MAP = {
+    "alice": {"voice": "nova"},
+    "bob": {"voice": "onyx"},
+    "charlie": {"voice": "echo"}
+}
+
+# How often the loop-lag probe wakes up
+LAG_PROBE_INTERVAL_S = 0.25
+
+
+class HostFullError(Exception):
+    """The host already runs CONDUCTOR_MAX_SESSIONS sessions."""
+
+
+class SessionLoad:
+    """Event-loop time spent running one session's tasks."""
+    def __init__(self):
+        self.t_start = time.monotonic()
+        self.cpu_s = 0.0
+        self.steps = 0
+        self.slow_steps = 0
+        self.max_step_ms = 0.0
+
+    def add(self, cpu_s: float, wall_ms: float, slow_ms: float) -> None:
+        self.cpu_s += cpu_s
+        self.steps += 1
+        if wall_ms > self.max_step_ms:
+            self.max_step_ms = wall_ms
+        if wall_ms > slow_ms:
+            self.slow_steps += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.t_start, 1e-6)
+        return {
+            "cpu_ms": round(self.cpu_s * 1000, 1),
+            "cpu_pct": round(100 * self.cpu_s / elapsed, 2),
+            "steps": self.steps,
+            # A step holds the loop: this is the lag it caused everyone else
+            "max_step_ms": round(self.max_step_ms, 1),
+            "slow_steps": self.slow_steps
+        }
+
+
+class _Metered(Coroutine):
+    """Wraps a task's coroutine to charge each step (send/throw) to a session."""
+    __slots__ = ("_coro", "_load", "_session_id", "_slow_ms")
+
+    def __init__(self, coro, load: SessionLoad, session_id: str, slow_ms: float):
+        self._coro = coro
+        self._load = load
+        self._session_id = session_id
+        self._slow_ms = slow_ms
+
+    def send(self, value):
+        return self._step(self._coro.send, value)
+
+    def throw(self, *args):
+        return self._step(self._coro.throw, *args)
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    def __getattr__(self, name):
+        # cr_frame, cr_code, ... for task repr and stack dumps
+        return getattr(self._coro, name)
+
+    def _step(self, fn, *args):
+        t_cpu = time.thread_time()
+        t_wall = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            wall_ms = (time.perf_counter() - t_wall) * 1000
+            self._load.add(time.thread_time() - t_cpu, wall_ms, self._slow_ms)
+            if wall_ms > self._slow_ms:
+                logger.warning(f"Session {self._session_id} blocked the loop for {wall_ms:.0f}ms "
+                               f"in {getattr(self._coro, '__qualname__', self._coro)}")
+
+
+class SessionRuntime:
+    """One simulated session running on the host."""
+    def __init__(self, session_id: str, branch_id: str, room_name: str, resume: bool = False):
+        self.session_id = session_id
+        self.branch_id = branch_id
+        self.room_name = room_name
+        self.resume = resume # Reclaimed from a dead host: pick up where it left off
+        self.load = SessionLoad()
+        self.task: Optional[asyncio.Task] = None
+        self.conductor: Optional[Conductor] = None
+        # On the way out: hand the lease to another host / it was taken already
+        self.handoff = False
+        self.lost = False
+
+
+class ConductorHost:
+    """
+    Runs many sessions' conductors, transcription workers and speakers on
+    one event loop:
+
+    - Shared clients: one STT service, one TTS plugin per voice, the
+      process-wide LLM gateway, and the container's repos (one Mongo pool).
+    - Admission: at most `max_sessions` at once; more raise HostFullError.
+    - Telemetry: event-loop lag, and CPU time and longest loop step per
+      session (every task a session starts is charged to it).
+    - Ownership: each session is leased in the SessionRegistry. The host
+      renews its leases, stops sessions it lost or was asked to stop, and
+      with free capacity reclaims sessions of hosts that died. On shutdown
+      its sessions are handed off rather than ended.
+
+    The API process uses the module singleton `conductor_host` unless
+    CONDUCTOR_HOST_URL points to a dedicated host process (app.host_main).
+    """
+    def __init__(self, max_sessions: Optional[int] = None, slow_step_ms: Optional[float] = None,
+                 registry: Optional[SessionRegistry] = None, host_id: Optional[str] = None,
+                 owner_url: Optional[str] = None):
+        self.max_sessions = max_sessions or settings.CONDUCTOR_MAX_SESSIONS
+        self.slow_step_ms = slow_step_ms or settings.CONDUCTOR_SLOW_STEP_MS
+        self.sessions: Dict[str, SessionRuntime] = {}
+        # Slots reserved while a lease is being claimed (before _launch)
+        self._admitting: Set[str] = set()
+        self._reclaiming = 0
+
+        self._registry = registry
+        self.host_id = host_id or settings.CONDUCTOR_HOST_ID or f"{socket.gethostname()}-{os.getpid()}"
+        self.owner_url = owner_url or settings.CONDUCTOR_ADVERTISE_URL
+        self._lease_task: Optional[asyncio.Task] = None
+
+        self._stt = None
+        self._tts: Dict[tuple, Any] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._prev_task_factory = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+        self.stats: Dict[str, int] = {
+            "started": 0, "finished": 0, "rejected": 0, "failed": 0, "reclaimed": 0, "lost": 0
+        }
+        self.loop_lag = LatencyHistogram()
+
+    @property
+    def free(self) -> int:
+        return self.max_sessions - len(self.sessions) - len(self._admitting) - self._reclaiming
+
+    @property
+    def full(self) -> bool:
+        return self.free <= 0
+
+    @property
+    def registry(self) -> SessionRegistry:
+        return self._registry or get_container().session_registry
+
+    # Shared clients -----------------------------------------------------
+
+    @property
+    def stt(self):
+        if self._stt is None:
+            from app.domain.services.stt_service import get_stt_service
+            self._stt = get_stt_service() # STT_BACKEND
+        return self._stt
+
+    def tts_for(self, voice_settings: dict):
+        """One TTS plugin per voice for the whole host (None if it can't load)."""
+        key = tuple(sorted(voice_settings.items()))
+        if key not in self._tts:
+            try:
+                from app.livekit.tts import get_tts_plugin
+                self._tts[key] = get_tts_plugin(settings.TTS_BACKEND, **voice_settings)
+            except Exception as e:
+                logger.error(f"Failed to load TTS plugin: {e}")
+                return None
+        return self._tts[key]
+
+    # Sessions -----------------------------------------------------------
+
+    async def start_session(self, session_id: str, branch_id: str, room_name: str) -> None:
+        """Admit a session, lease it and start it in the background."""
+        if session_id in self.sessions or session_id in self._admitting:
+            return
+        if self.full:
+            self.stats["rejected"] += 1
+            raise HostFullError(f"Conductor host is full ({self.max_sessions} sessions)")
+        # Hold the slot across the claim so concurrent starts can't overshoot
+        self._admitting.add(session_id)
+        try:
+            self.start()
+            if not await self.registry.claim(session_id, branch_id, room_name, self.host_id, self.owner_url):
+                raise ValueError(f"Session {session_id} is already running on another host")
+            self._launch(SessionRuntime(session_id, branch_id, room_name))
+        finally:
+            self._admitting.discard(session_id)
+
+    def _launch(self, runtime: SessionRuntime) -> None:
+        self.sessions[runtime.session_id] = runtime
+        self.stats["started"] += 1
+        token = current_session.set(runtime.session_id)
+        try:
+            runtime.task = asyncio.create_task(self._run_leased(runtime))
+        finally:
+            current_session.reset(token)
+        runtime.task.add_done_callback(lambda t, r=runtime: self._on_done(r, t))
+
+    async def stop_session(self, session_id: str) -> bool:
+        runtime = self.sessions.get(session_id)
+        if runtime is None or runtime.task is None:
+            # It might have already finished or never started
+            return False
+        runtime.task.cancel()
+        try:
+            await runtime.task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def shutdown(self) -> None:
+        """Stop every session and hand its lease to another host."""
+        for task in (self._lag_task, self._lease_task):
+            if task:
+                task.cancel()
+        self._lag_task = self._lease_task = None
+        for runtime in self.sessions.values():
+            runtime.handoff = True
+        await asyncio.gather(*(self.stop_session(s) for s in list(self.sessions)))
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.set_task_factory(self._prev_task_factory)
+        self._loop = None
+
+    def _on_done(self, runtime: SessionRuntime, task: asyncio.Task) -> None:
+        if self.sessions.get(runtime.session_id) is runtime:
+            del self.sessions[runtime.session_id]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["failed"] += 1
+            logger.error(f"Session {runtime.session_id} failed: {task.exception()}")
+        else:
+            self.stats["finished"] += 1
+
+    async def _run_leased(self, runtime: SessionRuntime) -> None:
+        try:
+            await self._run(runtime)
+        finally:
+            try:
+                if runtime.handoff:
+                    await self.registry.expire(runtime.session_id, self.host_id)
+                elif not runtime.lost:
+                    await self.registry.release(runtime.session_id, self.host_id)
+            except Exception as e:
+                # The lease runs out on its own
+                logger.error(f"Failed to give up the lease on session {runtime.session_id}: {e}")
+
+    async def _run(self, runtime: SessionRuntime) -> None:
+        session_id, room_name = runtime.session_id, runtime.room_name
+        logger.info(f"Starting session {session_id} on the conductor host")
+
+        c = get_container()
+        if runtime.resume:
+            # The session may have moved to another branch (rewind) since it was leased
+            session = await c.session_repo.get(session_id)
+            if session and session.get("active_branch_id"):
+                runtime.branch_id = session["active_branch_id"]
+        conductor = runtime.conductor = Conductor(c.writer, c.metrics_engine, c.resolver, c.rewind_service, c.replay_event_repo)
+        conductor.case_study_context = await _case_study_context(c, session_id)
+        transcription_worker = TranscriptionWorker(self.stt)
+        agents: List[Any] = []
+        try:
+            await transcription_worker.connect(settings.LIVEKIT_URL, _token(room_name, "transcription-worker"))
+            # Conductor will auto-transition to PLAYING_SEED on connect
+            await conductor.connect(
+                settings.LIVEKIT_URL, _token(room_name, "conductor-bot", room_admin=True),
+                session_id, runtime.branch_id, resume=runtime.resume
+            )
+            if settings.SPEAKER_POOL:
+                pool = SpeakerPool({name: VOICE_MAP.get(name, {}) for name in SPEAKERS}, tts_for=self.tts_for)
+                agents.append(pool)
+                await pool.connect(settings.LIVEKIT_URL, _token(room_name, SPEAKER_POOL_IDENTITY))
+            else:
+                for name in SPEAKERS:
+                    voice = VOICE_MAP.get(name, {})
+                    agent = SpeakerWorker(name, voice, tts=self.tts_for(voice))
+                    agents.append(agent)
+                    await agent.connect(settings.LIVEKIT_URL, _token(room_name, name))
+
+            await conductor.ended.wait()
+            logger.info(f"Session {session_id} ended")
+        except asyncio.CancelledError:
+            logger.info(f"Session {session_id} stopped")
+            raise
+        finally:
+            await conductor.disconnect()
+            await transcription_worker.disconnect()
+            for a in agents:
+                await a.disconnect()
+
+    # Leases -------------------------------------------------------------
+
+    async def _keep_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.registry.ttl_s / 3)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"Session lease heartbeat failed: {e}")
+
+    async def heartbeat(self) -> None:
+        """Renew leases, stop sessions lost or asked to stop, reclaim orphans."""
+        session_ids = list(self.sessions)
+        held = await self.registry.heartbeat(self.host_id, session_ids)
+        to_stop = []
+        for session_id in session_ids:
+            runtime = self.sessions.get(session_id)
+            if runtime is None:
+                continue
+            lease = held.get(session_id)
+            if lease is None:
+                # Another host took it over (we missed a TTL): don't run it twice
+                logger.warning(f"Lost the lease on session {session_id}; stopping it here")
+                runtime.lost = True
+                self.stats["lost"] += 1
+                to_stop.append(session_id)
+            elif lease.stop_requested:
+                to_stop.append(session_id)
+        await asyncio.gather(*(self.stop_session(s) for s in to_stop))
+
+        free = self.free
+        if free <= 0:
+            return
+        # Reserve the slots while reclaiming (starts may arrive meanwhile)
+        self._reclaiming += free
+        try:
+            for lease in await self.registry.reclaim_orphans(self.host_id, self.owner_url, free):
+                logger.info(f"Reclaiming orphaned session {lease.session_id}")
+                self.stats["reclaimed"] += 1
+                self._launch(SessionRuntime(lease.session_id, lease.branch_id, lease.room_name, resume=True))
+        finally:
+            self._reclaiming -= free
+
+    # Loop instrumentation -----------------------------------------------
+
+    def start(self) -> None:
+        """Instrument the running loop and start keeping leases (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._prev_task_factory = loop.get_task_factory()
+        loop.set_task_factory(self._task_factory)
+        self._lag_task = loop.create_task(self._probe_loop_lag())
+        self._lease_task = loop.create_task(self._keep_leases())
+
+    def _task_factory(self, loop, coro, **kwargs):
+        context = kwargs.get("context")
+        session_id = context.get(current_session) if context is not None else current_session.get()
+        runtime = self.sessions.get(session_id) if session_id else None
+        if runtime is not None:
+            coro = _Metered(coro, runtime.load, session_id, self.slow_step_ms)
+        if self._prev_task_factory is not None:
+            return self._prev_task_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def _probe_loop_lag(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_INTERVAL_S)
+            self.loop_lag.observe(max(0.0, time.perf_counter() - t0 - LAG_PROBE_INTERVAL_S) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        per_session = {}
+        for session_id, runtime in self.sessions.items():
+            conductor = runtime.conductor
+            per_session[session_id] = {
+                "state": conductor.state.value if conductor else None,
+                **runtime.load.snapshot()
+            }
+        return {
+            **self.stats,
+            "host_id": self.host_id,
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "loop_lag": self.loop_lag.snapshot(),
+            "per_session": per_session
+        }
+
+
+async def _case_study_context(c, session_id: str):
+    """Case study title/description for the LLM's stable prompt prefix."""
+    session = await c.session_repo.get(session_id)
+    cs = await c.case_study_repo.get(session["case_study_id"]) if session and session.get("case_study_id") else None
+    if not cs:
+        return None
+    return "\n".join(part for part in (cs.title, cs.description) if part) or None
+
+
+def _token(room_name: str, identity: str, room_admin: bool = False) -> str:
+    grants = VideoGrants(room_join=True, room_admin=True, room=room_name) if room_admin \
+        else VideoGrants(room_join=True, room=room_name)
+    return create_token(settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET, room_name, identity, grants)
+
+
+# Sessions run in this process unless CONDUCTOR_HOST_URL is set
+conductor_host = ConductorHost()
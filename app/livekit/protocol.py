@@ -1,11 +1,21 @@
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
+# Participant identity of a SpeakerPool (all AI speakers on one connection)
+SPEAKER_POOL_IDENTITY = "speaker-pool"
+# AI personas, each its own participant unless pooled
+AI_SPEAKERS = ("alice", "bob", "charlie")
+# Server-side participants; everyone else in a room is a facilitator client
+BOT_IDENTITIES = ("conductor-bot", "transcription-worker", SPEAKER_POOL_IDENTITY) + AI_SPEAKERS
+
 class MsgType(str, Enum):
     # Conductor -> Participant
     INIT = "init"
     SPEAK_CMD = "speak_cmd"
+    SPEAK_CHUNK = "speak_chunk" # Follow-up sentence of a streaming SPEAK_CMD
+    PREPARE_CMD = "prepare_cmd" # Pre-synthesize a speculated turn
+    PREPARE_DROP = "prepare_drop" # Discard pre-synthesized audio gone stale
     PLAY_ASSET_CMD = "play_asset_cmd"
     STOP_CMD = "stop_cmd"
     
@@ -63,6 +73,22 @@ class SpeakCmdPayload(BaseModel):
     text: str
     speaker_id: str # The identity who should speak (useful if broadcast)
     audio_url: Optional[str] = None
+    streaming: bool = False # More text follows as SPEAK_CHUNKs
+
+class SpeakChunkPayload(BaseModel):
+    text: str
+    speaker_id: str
+    final: bool = False # Last chunk of the turn (text may be empty)
+
+class PrepareCmdPayload(BaseModel):
+    # The packet's turn_id is the id the SPEAK_CMD will carry if the plan is used
+    text: str
+    speaker_id: str
+    state_version: int
+
+class PrepareDropPayload(BaseModel):
+    state_version: Optional[int] = None # Drop audio prepared at this state_version or earlier
+    turn_ids: Optional[List[str]] = None # Or: drop the audio prepared for these turns
 
 class PlayAssetCmdPayload(BaseModel):
     audio_url: str
@@ -75,6 +101,7 @@ class PlaybackDonePayload(BaseModel):
     duration_ms: int
     interrupted: bool = False
     audio_url: Optional[str] = None
+    first_audio_ms: Optional[int] = None # SPEAK_CMD receipt -> first audio frame
 
 class FacAudioPayload(BaseModel):
     # For metadata about the facilitator's speech if handled largely by backend STT
@@ -15,85 +15,168 @@ import os
 import logging
 import time
 import traceback
+import wave
 from livekit import rtc
-from typing import Optional
+from typing import Dict, List, Optional
 
-from app.livekit.protocol import AgentPacket, MsgType, SpeakCmdPayload, PlayAssetCmdPayload, PlaybackDonePayload
+from app.core.config import settings
+from app.livekit.protocol import (
+    AgentPacket, MsgType, SpeakCmdPayload, SpeakChunkPayload, PrepareCmdPayload, PrepareDropPayload,
+    PlayAssetCmdPayload, PlaybackDonePayload
+)
 
 logger = logging.getLogger(__name__)
 
+# Give up on a streaming turn if no SPEAK_CHUNK arrives for this long
+STREAM_IDLE_TIMEOUT_S = 10.0
+# Pre-synthesized turns kept at once (oldest dropped first)
+MAX_PREPARED = 4
+
+class PreparedAudio:
+    """Audio for a speculated turn, synthesized ahead of its SPEAK_CMD."""
+    def __init__(self, text: str, state_version: int):
+        self.text = text
+        self.state_version = state_version
+        self.frames = []
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Event()
+
+    def add(self, frame):
+        self.frames.append(frame)
+        self._updated.set()
+
+    def finish(self):
+        self.done = True
+        self._updated.set()
+
+    async def iter_frames(self):
+        """Buffered frames, then the rest as synthesis produces them."""
+        i = 0
+        while True:
+            if i < len(self.frames):
+                yield self.frames[i]
+                i += 1
+            elif self.done:
+                return
+            else:
+                self._updated.clear()
+                await self._updated.wait()
+
+    def cancel(self):
+        if self.task:
+            self.task.cancel()
+
+def decode_packet(data: bytes) -> Optional[AgentPacket]:
+    try:
+        return AgentPacket(**json.loads(data.decode("utf-8")))
+    except Exception:
+        # Might be legacy message or noise
+        return None
+
+def route_packet(packet: AgentPacket, speakers: Dict[str, "SpeakerWorker"]):
+    """Hand a conductor packet to the speaker(s) it concerns."""
+    if packet.type == MsgType.SPEAK_CMD:
+        cmd = SpeakCmdPayload(**packet.payload)
+        for identity, speaker in speakers.items():
+            if identity == cmd.speaker_id:
+                speaker.session_id = packet.session_id
+                speaker.current_turn_id = packet.turn_id
+                speaker._handle_speak_cmd(cmd)
+            else:
+                # Someone else's turn started; speculation for it is moot
+                speaker._drop_prepared()
+
+    elif packet.type == MsgType.PREPARE_CMD:
+        cmd = PrepareCmdPayload(**packet.payload)
+        speaker = speakers.get(cmd.speaker_id)
+        if speaker and packet.turn_id:
+            speaker._handle_prepare_cmd(packet.turn_id, cmd)
+
+    elif packet.type == MsgType.PREPARE_DROP:
+        drop = PrepareDropPayload(**packet.payload)
+        for speaker in speakers.values():
+            speaker._drop_prepared(drop.state_version, drop.turn_ids)
+
+    elif packet.type == MsgType.SPEAK_CHUNK:
+        cmd = SpeakChunkPayload(**packet.payload)
+        speaker = speakers.get(cmd.speaker_id)
+        if speaker and packet.turn_id == speaker.current_turn_id:
+            speaker._handle_speak_chunk(cmd)
+
+    elif packet.type == MsgType.PLAY_ASSET_CMD:
+        # Play pre-recorded asset (for replay)
+        cmd = PlayAssetCmdPayload(**packet.payload)
+        speaker = speakers.get(cmd.speaker_id)
+        if speaker:
+            speaker.session_id = packet.session_id
+            speaker.current_turn_id = packet.turn_id or cmd.turn_id
+            logger.info(f"Speaker {speaker.identity} received PLAY_ASSET_CMD: {cmd.audio_url}")
+            speaker._handle_play_asset_cmd(cmd)
+
+    elif packet.type == MsgType.STOP_CMD:
+        # Addressed to one speaker, or (older conductors) to whoever is talking
+        speaker_id = packet.payload.get("speaker_id")
+        for identity, speaker in speakers.items():
+            if speaker_id is None or identity == speaker_id:
+                speaker._handle_stop_cmd()
+
 class SpeakerWorker:
     """
     Dumb speaker client. 
     Connects to LiveKit, listens for SPEAK_CMD, plays TTS, sends PLAYBACK_DONE.
+    Given a `room`, it is one voice of a SpeakerPool: it publishes its track
+    (named after its identity) on the pool's connection and gets its
+    commands from the pool.
     """
-    def __init__(self, identity: str, voice_settings: dict = None):
+    def __init__(self, identity: str, voice_settings: dict = None, tts=None, room: Optional[rtc.Room] = None):
         self.identity = identity
         self.voice_settings = voice_settings or {}
-        self.room = rtc.Room()
-        self.room.on("data_received", self.on_data_received)
+        self.pooled = room is not None
+        if self.pooled:
+            self.room = room
+        else:
+            self.room = rtc.Room()
+            self.room.on("data_received", self.on_data_received)
         
         self.audio_source = rtc.AudioSource(24000, 1)
-        self.track = rtc.LocalAudioTrack.create_audio_track("speaker-mic", self.audio_source)
+        self.track = rtc.LocalAudioTrack.create_audio_track(identity if self.pooled else "speaker-mic", self.audio_source)
         
-        # TTS Plugin
-        try:
-            from app.livekit.tts import get_tts_plugin
-            self.tts = get_tts_plugin("openai", **self.voice_settings) # Pass voice config
-        except Exception as e:
-            logger.error(f"Failed to load TTS plugin: {e}")
-            self.tts = None
+        # TTS Plugin (a host running many sessions passes a shared one)
+        self.tts = tts
+        if self.tts is None:
+            try:
+                from app.livekit.tts import get_tts_plugin
+                self.tts = get_tts_plugin(settings.TTS_BACKEND, **self.voice_settings) # Pass voice config
+            except Exception as e:
+                logger.error(f"Failed to load TTS plugin: {e}")
+                self.tts = None
 
         self.speak_task: Optional[asyncio.Task] = None
         self.session_id: Optional[str] = None
         self.current_turn_id: Optional[str] = None
+        # Sentences of the current streaming turn (None marks the end)
+        self.chunk_queue: Optional[asyncio.Queue] = None
+        # turn_id -> audio pre-synthesized from PREPARE_CMD
+        self.prepared: Dict[str, PreparedAudio] = {}
 
     async def connect(self, url: str, token: str):
         await self.room.connect(url, token)
+        await self.publish()
+
+    async def publish(self):
         await self.room.local_participant.publish_track(self.track)
         logger.info(f"Speaker {self.identity} connected and published track")
 
     async def disconnect(self):
-        await self.room.disconnect()
+        if not self.pooled:
+            await self.room.disconnect()
 
     def on_data_received(self, event):
         try:
-            # Extract fields from event object
-            data = event.data
-            participant = event.participant
-            
-            payload_str = data.decode("utf-8")
-            raw_msg = json.loads(payload_str)
-            
-            # Basic validation
-            try:
-                packet = AgentPacket(**raw_msg)
-            except Exception:
-                # Might be legacy message or noise
-                return
-
-            if packet.type == MsgType.SPEAK_CMD:
-                # Check destination or speaker_id
-                # (LiveKit usually filters destination for us if sent privately, 
-                # but good to check if it matches our identity if payload specifies it)
-                cmd = SpeakCmdPayload(**packet.payload)
-                if cmd.speaker_id == self.identity:
-                    self.session_id = packet.session_id
-                    self.current_turn_id = packet.turn_id
-                    self._handle_speak_cmd(cmd)
-            
-            elif packet.type == MsgType.PLAY_ASSET_CMD:
-                # Play pre-recorded asset (for replay)
-                cmd = PlayAssetCmdPayload(**packet.payload)
-                if cmd.speaker_id == self.identity:
-                    self.session_id = packet.session_id
-                    self.current_turn_id = packet.turn_id or cmd.turn_id
-                    logger.info(f"Speaker {self.identity} received PLAY_ASSET_CMD: {cmd.audio_url}")
-                    self._handle_play_asset_cmd(cmd)
-            
-            elif packet.type == MsgType.STOP_CMD:
-                self._handle_stop_cmd()
-
+            packet = decode_packet(event.data)
+            if packet:
+                route_packet(packet, {self.identity: self})
         except Exception as e:
             logger.error(f"Error handling data in {self.identity}: {e}")
             traceback.print_exc()
@@ -102,7 +185,55 @@ class SpeakerWorker:
         if self.speak_task:
             self.speak_task.cancel()
         
-        self.speak_task = asyncio.create_task(self._speak_routine(cmd))
+        prepared = self.prepared.pop(self.current_turn_id, None)
+        if prepared and prepared.text != cmd.text:
+            prepared.cancel()
+            prepared = None
+        self._drop_prepared()
+        
+        self.chunk_queue = asyncio.Queue() if cmd.streaming else None
+        self.speak_task = asyncio.create_task(self._speak_routine(cmd, time.time(), prepared))
+
+    def _handle_prepare_cmd(self, turn_id: str, cmd: PrepareCmdPayload):
+        if not self.tts or turn_id in self.prepared:
+            return
+        while len(self.prepared) >= MAX_PREPARED:
+            oldest = next(iter(self.prepared))
+            self.prepared.pop(oldest).cancel()
+        
+        prepared = PreparedAudio(cmd.text, cmd.state_version)
+        prepared.task = asyncio.create_task(self._prepare_routine(prepared))
+        self.prepared[turn_id] = prepared
+        logger.info(f"Speaker {self.identity} preparing {turn_id}: {cmd.text[:30]}...")
+
+    async def _prepare_routine(self, prepared: PreparedAudio):
+        try:
+            async for frame in self._tts_frames(prepared.text):
+                prepared.add(frame)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Speaker {self.identity} pre-synthesis error: {e}")
+        finally:
+            prepared.finish()
+
+    def _drop_prepared(self, state_version: Optional[int] = None, turn_ids: Optional[List[str]] = None):
+        """Drop prepared audio: all of it, that prepared at <= state_version, or that for turn_ids."""
+        for turn_id in list(self.prepared):
+            if turn_ids is not None:
+                stale = turn_id in turn_ids
+            else:
+                stale = state_version is None or self.prepared[turn_id].state_version <= state_version
+            if stale:
+                self.prepared.pop(turn_id).cancel()
+
+    def _handle_speak_chunk(self, cmd: SpeakChunkPayload):
+        if self.chunk_queue is None:
+            return
+        if cmd.text:
+            self.chunk_queue.put_nowait(cmd.text)
+        if cmd.final:
+            self.chunk_queue.put_nowait(None)
 
     def _handle_stop_cmd(self):
         logger.info(f"Speaker {self.identity} received STOP_CMD")
@@ -185,14 +316,17 @@ class SpeakerWorker:
             duration_ms = int((time.time() - start_time) * 1000)
             await self._send_done(duration_ms, audio_url)
 
-    async def _speak_routine(self, cmd: SpeakCmdPayload):
+    async def _speak_routine(self, cmd: SpeakCmdPayload, received_at: Optional[float] = None,
+                             prepared: Optional[PreparedAudio] = None):
         start_time = time.time()
+        received_at = received_at or start_time
         logger.info(f"Speaker {self.identity} starting: {cmd.text[:30]}...")
         
         # Audio collection for caching
         collected_frames = []
         sample_rate = 24000
         channels = 1
+        first_audio_ms = None
         
         try:
             # 1. Check for audio file (Pre-recorded)
@@ -203,23 +337,22 @@ class SpeakerWorker:
             
             # 2. Fallback to TTS (On-the-fly)
             elif self.tts:
-                async for audio_chunk in self.tts.synthesize(cmd.text):
-                    frame = None
-                    if hasattr(audio_chunk, 'frame'):
-                        frame = audio_chunk.frame
-                    elif hasattr(audio_chunk, 'data'):
-                         # Assuming data is raw bytes, we might need to wrap it or just store it
-                         # For simplicity in this MVP, let's assume we get frames or can construct them
-                         # If it's raw bytes, we can't easily use capture_frame without wrapping
-                         pass 
-                    else:
-                        frame = audio_chunk
-
-                    if frame:
-                        await self.audio_source.capture_frame(frame)
-                        # Collect for cache (assuming frame.data is the raw PCM bytes)
-                        # LiveKit AudioFrame.data is memoryview or bytes
-                        collected_frames.append(bytes(frame.data))
+                text = cmd.text
+                if prepared:
+                    # Pre-synthesized from PREPARE_CMD: play from the buffer
+                    t_first = await self._play_frames(prepared.iter_frames(), collected_frames)
+                    if t_first:
+                        first_audio_ms = int((t_first - received_at) * 1000)
+                        logger.info(f"Speaker {self.identity} played prepared audio after {first_audio_ms}ms")
+                        text = None
+                # Streaming turns synthesize sentence by sentence as chunks arrive
+                while text is not None:
+                    if text:
+                        t_first = await self._play_frames(self._tts_frames(text), collected_frames)
+                        if first_audio_ms is None and t_first:
+                            first_audio_ms = int((t_first - received_at) * 1000)
+                            logger.info(f"Speaker {self.identity} first audio after {first_audio_ms}ms")
+                    text = await self._next_chunk() if cmd.streaming else None
 
             else:
                  logger.warning("No TTS plugin available and no audio file")
@@ -249,13 +382,49 @@ class SpeakerWorker:
                 except Exception as e:
                     logger.error(f"Failed to cache audio: {e}")
 
-            await self._send_done(duration_ms, audio_url)
+            await self._send_done(duration_ms, audio_url, first_audio_ms)
             
         except asyncio.CancelledError:
             logger.info(f"Speaker {self.identity} audio cancelled")
         except Exception as e:
             logger.error(f"Speaker {self.identity} error: {e}")
 
+    async def _tts_frames(self, text: str):
+        async for audio_chunk in self.tts.synthesize(text):
+            frame = None
+            if hasattr(audio_chunk, 'frame'):
+                frame = audio_chunk.frame
+            elif hasattr(audio_chunk, 'data'):
+                 # Assuming data is raw bytes, we might need to wrap it or just store it
+                 # For simplicity in this MVP, let's assume we get frames or can construct them
+                 # If it's raw bytes, we can't easily use capture_frame without wrapping
+                 pass 
+            else:
+                frame = audio_chunk
+
+            if frame:
+                yield frame
+
+    async def _play_frames(self, frames, collected_frames: list) -> Optional[float]:
+        """Publish frames; returns when the first one went out (None if none did)."""
+        t_first = None
+        async for frame in frames:
+            await self.audio_source.capture_frame(frame)
+            if t_first is None:
+                t_first = time.time()
+            # Collect for cache (assuming frame.data is the raw PCM bytes)
+            # LiveKit AudioFrame.data is memoryview or bytes
+            collected_frames.append(bytes(frame.data))
+        return t_first
+
+    async def _next_chunk(self) -> Optional[str]:
+        """Next sentence of a streaming turn, or None once it has ended."""
+        try:
+            return await asyncio.wait_for(self.chunk_queue.get(), timeout=STREAM_IDLE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            logger.warning(f"Speaker {self.identity} gave up waiting for SPEAK_CHUNK")
+            return None
+
     async def _play_audio_file(self, filepath: str):
         # Requires ffmpeg installed
         try:
@@ -283,14 +452,15 @@ class SpeakerWorker:
         except Exception as e:
              logger.error(f"File playback error: {e}")
 
-    async def _send_done(self, duration_ms: int, audio_url: Optional[str] = None):
+    async def _send_done(self, duration_ms: int, audio_url: Optional[str] = None, first_audio_ms: Optional[int] = None):
         if not self.session_id: return
         
         payload = PlaybackDonePayload(
             speaker_id=self.identity,
             duration_ms=duration_ms,
             interrupted=False,
-            audio_url=audio_url
+            audio_url=audio_url,
+            first_audio_ms=first_audio_ms
         )
         msg = AgentPacket(
             type=MsgType.PLAYBACK_DONE,
@@ -303,3 +473,35 @@ class SpeakerWorker:
             msg.model_dump_json().encode("utf-8"),
             reliable=True
         )
+
+
+class SpeakerPool:
+    """
+    All the AI speakers of a session on one LiveKit connection: one audio
+    track per persona, every packet decoded once and routed to the speaker
+    it names (SPEAKER_POOL mode).
+    """
+    def __init__(self, voices: Dict[str, dict], tts_for=None):
+        self.room = rtc.Room()
+        self.room.on("data_received", self.on_data_received)
+        self.speakers: Dict[str, SpeakerWorker] = {
+            identity: SpeakerWorker(identity, voice, tts=tts_for(voice) if tts_for else None, room=self.room)
+            for identity, voice in voices.items()
+        }
+
+    async def connect(self, url: str, token: str):
+        await self.room.connect(url, token)
+        for speaker in self.speakers.values():
+            await speaker.publish()
+
+    async def disconnect(self):
+        await self.room.disconnect()
+
+    def on_data_received(self, event):
+        try:
+            packet = decode_packet(event.data)
+            if packet:
+                route_packet(packet, self.speakers)
+        except Exception as e:
+            logger.error(f"Error handling data in speaker pool: {e}")
+            traceback.print_exc()
@@ -1,13 +1,20 @@
 import asyncio
 import time
-from dataclasses import dataclass
-from typing import Optional, List, Dict
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, List, Dict
 import logging
 
+from app.core.config import settings
 from app.domain.services.llm_service import LLMService
 
 logger = logging.getLogger(__name__)
 
+# Node names in a SpecTree
+CONTINUE = "continue" # No intervention: the director's own pick
+INTERVENTION = "intervention" # Reply to the facilitator's line
+SPEAKER_PREFIX = "speaker:" # No intervention, a given likely speaker
+
 @dataclass
 class SpecPlan:
     plan_version: int
@@ -15,22 +22,114 @@ class SpecPlan:
     speaker_id: Optional[str]
     text: Optional[str]
     task: asyncio.Task
-    
+    kind: str = CONTINUE
+    reason: Optional[str] = None
+    # Turn id the plan is spoken under, known up front so audio can be prepared
+    turn_id: str = field(default_factory=lambda: f"turn-{uuid.uuid4().hex}")
+
     # Telemetry
     created_at: float = 0.0
     ready_at: float = 0.0
 
+    @property
+    def usable(self) -> bool:
+        return bool(self.speaker_id) and self.reason != "Error fallback"
+
+
+def likely_next_speakers(history: List[str], active_speakers: List[str], k: int) -> List[str]:
+    """
+    Top-k guesses for the next speaker: whoever has waited longest since
+    their last line, never the speaker of the latest line.
+    """
+    last_seen: Dict[str, int] = {}
+    for i, line in enumerate(history):
+        last_seen[line.split(":", 1)[0].strip()] = i
+    latest = history[-1].split(":", 1)[0].strip() if history else None
+    ranked = sorted(
+        (s for s in active_speakers if s != latest),
+        key=lambda s: last_seen.get(s, -1)
+    )
+    return ranked[:k]
+
+
+@dataclass
+class SpecTree:
+    """
+    Speculative continuations of one conversation state, identified by
+    (state_version, history_len). The primary node is the director's plan;
+    the rest are lines for likely speakers, used only when the director
+    picks that speaker.
+    """
+    version: int
+    history_len: int
+    after_turn_id: Optional[str]
+    primary: str
+    nodes: Dict[str, asyncio.Task] = field(default_factory=dict)
+
+    def matches(self, version: int, history_len: int) -> bool:
+        return (self.version, self.history_len) == (version, history_len)
+
+    def cancel(self) -> None:
+        for task in self.nodes.values():
+            task.cancel()
+
+    def _ready(self, name: str) -> Optional[SpecPlan]:
+        task = self.nodes.get(name)
+        if task is None or not task.done() or task.cancelled() or task.exception():
+            return None
+        plan = task.result()
+        return plan if plan and plan.usable else None
+
+    async def pick(self, timeout_s: float) -> Optional[SpecPlan]:
+        """
+        The director's plan, or the alternate for the speaker it picked if
+        that was ready first (its audio has been preparing longer). None if
+        the director's plan fails or misses the timeout.
+        """
+        await asyncio.wait([self.nodes[self.primary]], timeout=timeout_s)
+        plan = self._ready(self.primary)
+        if plan is None:
+            return None
+        alternate = self._ready(SPEAKER_PREFIX + plan.speaker_id)
+        if alternate and alternate.ready_at <= plan.ready_at:
+            return alternate
+        return plan
+
+
 class SpecPlanner:
-    def __init__(self, llm_service: LLMService):
+    """
+    Precomputes a small tree of next-turn plans while the current turn
+    plays: the director's pick plus the top-k likely speakers, and after a
+    facilitator intervention the reply to it, started as soon as the
+    transcript lands. LLM calls share a concurrency budget. on_ready, if
+    given, is called with each usable plan as it lands (to pre-synthesize).
+    capacity, if given, returns the LLM call slots free right now; likely
+    speakers are only speculated on while the director's call leaves some.
+    """
+    def __init__(self, llm_service: LLMService, max_concurrent: Optional[int] = None, top_k: Optional[int] = None,
+                 on_ready: Optional[Callable[[SpecPlan], Awaitable[None]]] = None,
+                 capacity: Optional[Callable[[], int]] = None):
         self.llm = llm_service
+        self.on_ready = on_ready
+        self.capacity = capacity
+        self.top_k = settings.SPEC_TOP_K_SPEAKERS if top_k is None else top_k
+        self._slots = asyncio.Semaphore(max_concurrent or settings.SPEC_MAX_CONCURRENT_CALLS)
+        self.tree: Optional[SpecTree] = None
+
+        # Telemetry
+        self.stats: Dict[str, int] = {
+            "trees": 0, "plans": 0, "hits": 0, "misses": 0, "discarded": 0
+        }
+        self.hits_by_kind: Dict[str, int] = {}
 
     async def plan_next(
-        self, 
-        history: List[str], 
-        personas: Dict[str, str], 
+        self,
+        history: List[str],
+        personas: Dict[str, str],
         active_speakers: List[str],
         version: int,
-        after_turn_id: str
+        after_turn_id: str,
+        kind: str = CONTINUE
     ) -> SpecPlan:
         """
         Orchestrates the planning of the next turn.
@@ -43,24 +142,131 @@ class SpecPlanner:
             speaker_id=None,
             text=None,
             task=None, # Assigned by caller usually, but we are inside the task?
+            kind=kind,
             created_at=time.time()
         )
-        
+
         try:
-            # 1. Decide Speaker & Generate Text (Consolidated Call - Ticket 6)
-            # We assume Ticket 6 is implemented or we use the existing separate calls for now.
-            # The plan says Ticket 6 is a dependency for Ticket 4, but we are in Ticket 3.
-            # I will implement the logic using the new API `plan_next_turn` which I will add in Ticket 6.
-            # For now, I'll assume it exists or implement it in LLMService next.
-            
-            decision = await self.llm.plan_next_turn(history, personas, active_speakers)
-            
+            async with self._slots:
+                decision = await self.llm.plan_next_turn(history, personas, active_speakers)
+
             plan.speaker_id = decision.get("speaker_id")
             plan.text = decision.get("text")
+            plan.reason = decision.get("reason")
             plan.ready_at = time.time()
-            
+            self.stats["plans"] += 1
+
             return plan
-            
+
         except Exception as e:
             logger.error(f"Speculative planning failed: {e}")
             return None
+
+    async def plan_for_speaker(
+        self,
+        history: List[str],
+        personas: Dict[str, str],
+        speaker_id: str,
+        version: int,
+        after_turn_id: Optional[str]
+    ) -> Optional[SpecPlan]:
+        """A line for a fixed speaker (cheaper than a full director call)."""
+        created_at = time.time()
+        try:
+            async with self._slots:
+                text = await self.llm.generate_turn_text(speaker_id, personas.get(speaker_id, ""), history)
+            self.stats["plans"] += 1
+            return SpecPlan(
+                plan_version=version, after_turn_id=after_turn_id, speaker_id=speaker_id, text=text,
+                task=None, kind=SPEAKER_PREFIX + speaker_id, created_at=created_at, ready_at=time.time()
+            )
+        except Exception as e:
+            logger.error(f"Speculative planning for {speaker_id} failed: {e}")
+            return None
+
+    def expand(self, history: List[str], personas: Dict[str, str], active_speakers: List[str],
+               version: int, after_turn_id: str) -> SpecTree:
+        """
+        Replace the tree with continuations of `history` assuming no
+        intervention: the director's pick, then the top-k likely speakers
+        (fewer when the LLM has no spare capacity for them).
+        """
+        k = self.top_k
+        if self.capacity:
+            # One of the free slots goes to the director's call
+            k = min(k, max(self.capacity() - 1, 0))
+        tree = self._new_tree(version, len(history), after_turn_id, CONTINUE)
+        self._spawn(tree, CONTINUE, self.plan_next(history, personas, active_speakers, version, after_turn_id))
+        for speaker_id in likely_next_speakers(history, active_speakers, k):
+            self._spawn(tree, SPEAKER_PREFIX + speaker_id,
+                        self.plan_for_speaker(history, personas, speaker_id, version, after_turn_id))
+        return tree
+
+    def plan_intervention(self, history: List[str], personas: Dict[str, str], active_speakers: List[str],
+                          version: int) -> SpecTree:
+        """
+        The facilitator's line is in `history`: start planning the reply now,
+        while the turn is still being committed and the loop resumes.
+        """
+        tree = self._new_tree(version, len(history), None, INTERVENTION)
+        self._spawn(tree, INTERVENTION, self.plan_next(history, personas, active_speakers, version, None, kind=INTERVENTION))
+        return tree
+
+    async def take(self, version: int, history_len: int, timeout_s: float = 15.0) -> Optional[SpecPlan]:
+        """
+        Consume the tree for the current state. Returns the plan to speak, or
+        None (a miss) if nothing was speculated for this state.
+        """
+        tree, self.tree = self.tree, None
+        if tree is None or not tree.matches(version, history_len):
+            if tree:
+                tree.cancel()
+                self.stats["discarded"] += 1
+            self._record(None)
+            return None
+
+        try:
+            plan = await tree.pick(timeout_s)
+        finally:
+            tree.cancel()
+        self._record(plan)
+        return plan
+
+    def discard(self) -> None:
+        """Drop all speculation (state changed, e.g. facilitator PTT)."""
+        if self.tree:
+            self.tree.cancel()
+            self.tree = None
+            self.stats["discarded"] += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _spawn(self, tree: SpecTree, name: str, coro) -> None:
+        task = asyncio.create_task(coro)
+        if self.on_ready:
+            task.add_done_callback(self._notify_ready)
+        tree.nodes[name] = task
+
+    def _notify_ready(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception():
+            return
+        plan = task.result()
+        if plan and plan.usable:
+            asyncio.create_task(self.on_ready(plan))
+
+    def _new_tree(self, version: int, history_len: int, after_turn_id: Optional[str], primary: str) -> SpecTree:
+        self.discard()
+        self.tree = SpecTree(version, history_len, after_turn_id, primary)
+        self.stats["trees"] += 1
+        return self.tree
+
+    def _record(self, plan: Optional[SpecPlan]) -> None:
+        if plan:
+            self.stats["hits"] += 1
+            kind = SPEAKER_PREFIX if plan.kind.startswith(SPEAKER_PREFIX) else plan.kind
+            self.hits_by_kind[kind] = self.hits_by_kind.get(kind, 0) + 1
+        else:
+            self.stats["misses"] += 1
+        logger.info(f"Speculation {'hit (' + plan.kind + ')' if plan else 'miss'}; hit rate {self.hit_rate():.0%} {self.hits_by_kind}")
@@ -20,10 +20,13 @@ def get_tts_plugin(provider: str = "openai", **kwargs) -> tts.TTS:
     """
     Returns the configured TTS plugin.
     Args:
-        provider: "openai" or "elevenlabs"
+        provider: "openai", "elevenlabs" or "fake" (silent, in-process)
         **kwargs: API-specific options (e.g. voice="alloy")
     """
     try:
+        if provider == "fake":
+            from app.domain.services.fake_backends import FakeTTS
+            return FakeTTS.from_settings()
         if provider == "elevenlabs":
             return elevenlabs.TTS(**kwargs)
         else:
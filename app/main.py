@@ -9,16 +9,36 @@ if sys.version_info < (3, 10):
     except ImportError:
         pass
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.db import mongo
+from app.core.container import init_container, reset_container
+from app.domain.services.llm_gateway import llm_gateway
+from app.livekit.host import conductor_host
 from app.api import case_studies, sessions, branches, transcripts, checkpoints, metrics, livekit, utterances, intervene, rewind
 
 from fastapi.middleware.cors import CORSMiddleware
 
 setup_logging()
 
-app = FastAPI(title="Facilitator Gym Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mongo.connect()
+    if settings.MONGO_CREATE_INDEXES:
+        await mongo.ensure_indexes()
+    # Repos, services and caches shared by every request and simulation
+    init_container()
+    if not settings.CONDUCTOR_HOST_URL:
+        # Sessions run here: keep their leases and reclaim orphans
+        conductor_host.start()
+    yield
+    await conductor_host.shutdown()
+    reset_container()
+    mongo.close()
+
+app = FastAPI(title="Facilitator Gym Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -42,3 +62,15 @@ app.include_router(rewind.router)
 @app.get("/")
 async def root():
     return {"message": "Hello World", "config_loaded": bool(settings.MONGO_URI)}
+
+@app.get("/internal/db/pool-stats")
+async def get_db_pool_stats():
+    return mongo.pool_stats.snapshot()
+
+@app.get("/internal/llm/stats")
+async def get_llm_stats():
+    return llm_gateway.snapshot()
+
+@app.get("/internal/host/stats")
+async def get_host_stats():
+    return conductor_host.snapshot()
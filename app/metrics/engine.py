@@ -1,10 +1,21 @@
 import time
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 from app.db.repos.metrics import MetricsRepo
 from app.db.repos.checkpoint import CheckpointRepo
 from app.domain.services.transcript_resolver import TranscriptResolver
-from app.domain.schemas import MetricsOut
+from app.domain.schemas import MetricsOut, UtteranceView
+from app.domain.rows import UtteranceRow
+from app.metrics.running import fold_turns, summarize
+
+
+def compute_turn_metrics(utterances: List[Union[UtteranceRow, UtteranceView]]) -> Dict[str, Any]:
+    """
+    Per-speaker speaking time, turn counts and interruptions, plus gaps and
+    overlap between consecutive turns, in a single pass over the timings.
+    """
+    return summarize(fold_turns(utterances))
+
 
 class MetricsEngine:
     def __init__(self, metrics_repo: MetricsRepo, transcript_resolver: TranscriptResolver, checkpoint_repo: CheckpointRepo):
@@ -13,63 +24,65 @@ class MetricsEngine:
         self.checkpoint_repo = checkpoint_repo
 
     async def compute_for_checkpoint(self, session_id: str, branch_id: str, checkpoint_id: str) -> Dict[str, Any]:
+        doc = await self.get_or_compute(session_id, branch_id, checkpoint_id)
+        return doc["metrics"]
+
+    async def get_or_compute(self, session_id: str, branch_id: str, checkpoint_id: str) -> Dict[str, Any]:
+        """
+        Metrics document for a checkpoint. Read from the running aggregates in
+        the checkpoint state when present; otherwise computed from the
+        transcript once and stored (a checkpoint's prefix never changes).
+        """
         # 1. Get checkpoint to know at_utterance_id
-        # Note: CheckpointRepo.get_by_utterance is available, but we need get by id.
-        # BaseRepo has get by id (if we implemented it? BaseRepo only has __init__).
-        # I implemented get() in specific repos. CheckpointRepo doesn't have get() by id yet.
-        # I'll use find_one directly or assume get() exists.
-        # I'll use self.checkpoint_repo.col.find_one
         ckpt = await self.checkpoint_repo.col.find_one({"_id": checkpoint_id})
         if not ckpt:
             raise ValueError("Checkpoint not found")
         
         at_utterance_id = ckpt["at_utterance_id"]
 
-        # 2. Get transcript view
-        view = await self.transcript_resolver.get_transcript_view(session_id, branch_id)
+        running = ckpt.get("state", {}).get("metrics")
+        if running:
+            # Maintained by ConductorWriter at commit time
+            metrics_data = summarize(running)
+            metrics_data["sentiment"] = {"alice": 0.1, "bob": -0.2} # Stub
+            return {
+                "_id": ckpt["_id"],
+                "session_id": session_id,
+                "branch_id": branch_id,
+                "checkpoint_id": checkpoint_id,
+                "at_utterance_id": at_utterance_id,
+                "computed_at": ckpt.get("created_at", ""),
+                "metrics": metrics_data
+            }
+
+        stored = await self.metrics_repo.get_by_checkpoint(session_id, branch_id, checkpoint_id)
+        if stored:
+            return stored
+
+        # 2. Get transcript (lean rows; no view models needed here)
+        rows = await self.transcript_resolver.get_transcript_rows(session_id, branch_id)
         
         # 3. Filter utterances up to at_utterance_id
-        # We need to find the index of at_utterance_id
-        relevant_utts = []
-        found = False
-        for u in view.utterances:
-            relevant_utts.append(u)
-            if u.utterance_id == at_utterance_id:
-                found = True
-                break
-        
-        if not found:
-            # Maybe checkpoint is from a different branch path?
-            # Or transcript resolver logic is different.
-            # For now, use all if not found (fallback) or empty.
-            pass
+        end = next((i + 1 for i, u in enumerate(rows) if u.utterance_id == at_utterance_id), None)
+        # Checkpoint not on this branch's path: fall back to the whole transcript
+        relevant_utts = rows[:end] if end else rows
 
         # 4. Compute metrics
-        speaking_time = {}
-        for utt in relevant_utts:
-            if not utt.speaker_id:
-                continue
-            duration = utt.timing.t_end_ms - utt.timing.t_start_ms
-            if duration < 0: duration = 0
-            speaking_time[utt.speaker_id] = speaking_time.get(utt.speaker_id, 0) + duration
-
-        metrics_data = {
-            "speaking_time_ms": speaking_time,
-            "sentiment": {"alice": 0.1, "bob": -0.2}, # Stub
-            "overlap_ratio": 0.0
-        }
+        metrics_data = compute_turn_metrics(relevant_utts)
+        metrics_data["sentiment"] = {"alice": 0.1, "bob": -0.2} # Stub
         
-        # 5. Store
-        now_iso = str(int(time.time() * 1000))
         doc = {
             "_id": str(uuid.uuid4()),
             "session_id": session_id,
             "branch_id": branch_id,
             "checkpoint_id": checkpoint_id,
             "at_utterance_id": at_utterance_id,
-            "computed_at": now_iso,
+            "computed_at": str(int(time.time() * 1000)),
             "metrics": metrics_data
         }
-        await self.metrics_repo.create(doc)
-        
-        return metrics_data
+        if not end:
+            # Fallback result depends on the current tail; don't pin it
+            return doc
+
+        # 5. Store (first writer wins if requests race)
+        return await self.metrics_repo.create_if_absent(doc)
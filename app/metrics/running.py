@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, Optional
+
+# Running aggregates are plain dicts so they can live in a checkpoint's
+# state snapshot. They are additive apart from last_end_ms, which carries
+# the previous turn's end time forward for gap/interruption detection.
+
+
+def empty_running() -> Dict[str, Any]:
+    return {
+        "speaking_time_ms": {},
+        "turn_counts": {},
+        "interruptions": {}, # Turns that started before the previous one ended, by speaker
+        "gap_total_ms": 0,
+        "gap_max_ms": 0,
+        "gap_count": 0,
+        "overlap_ms": 0,
+        "last_end_ms": None
+    }
+
+
+def fold_turn(running: Dict[str, Any], speaker_id: Optional[str], timing: Dict[str, Any]) -> Dict[str, Any]:
+    """Aggregates after one more turn. Returns a new dict; `running` is not modified."""
+    start = timing.get("t_start_ms", 0) or 0
+    end = timing.get("t_end_ms", 0) or 0
+    duration = max(end - start, 0)
+
+    out = dict(running)
+    if speaker_id:
+        out["speaking_time_ms"] = {**running["speaking_time_ms"]}
+        out["speaking_time_ms"][speaker_id] = out["speaking_time_ms"].get(speaker_id, 0) + duration
+        out["turn_counts"] = {**running["turn_counts"]}
+        out["turn_counts"][speaker_id] = out["turn_counts"].get(speaker_id, 0) + 1
+
+    prev_end = running["last_end_ms"]
+    if prev_end is not None:
+        gap = start - prev_end
+        if gap >= 0:
+            out["gap_total_ms"] += gap
+            out["gap_max_ms"] = max(out["gap_max_ms"], gap)
+            out["gap_count"] += 1
+        else:
+            out["overlap_ms"] += min(-gap, duration)
+            if speaker_id:
+                out["interruptions"] = {**running["interruptions"]}
+                out["interruptions"][speaker_id] = out["interruptions"].get(speaker_id, 0) + 1
+    out["last_end_ms"] = end
+    return out
+
+
+def fold_turns(turns: Iterable[Any], running: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Fold objects with speaker_id and timing (dict or Timing model)."""
+    running = running or empty_running()
+    for t in turns:
+        timing = t.timing if isinstance(t.timing, dict) else t.timing.model_dump()
+        running = fold_turn(running, t.speaker_id, timing)
+    return running
+
+
+def summarize(running: Dict[str, Any]) -> Dict[str, Any]:
+    """Public metrics from running aggregates."""
+    total_speaking = sum(running["speaking_time_ms"].values())
+    gap_count = running["gap_count"]
+    return {
+        "speaking_time_ms": dict(running["speaking_time_ms"]),
+        "turn_counts": dict(running["turn_counts"]),
+        "interruptions": dict(running["interruptions"]),
+        "gaps_ms": {
+            "total": running["gap_total_ms"],
+            "max": running["gap_max_ms"],
+            "mean": running["gap_total_ms"] / gap_count if gap_count else 0.0
+        },
+        "overlap_ratio": running["overlap_ms"] / total_speaking if total_speaking else 0.0
+    }
@@ -3,7 +3,7 @@ import os
 import logging
 from dotenv import load_dotenv
 from app.transcription.worker import TranscriptionWorker
-from app.domain.services.stt_service import STTService
+from app.domain.services.stt_service import get_stt_service
 
 load_dotenv()
 
@@ -32,7 +32,7 @@ async def main():
     
     token = token_verifier.to_jwt()
     
-    stt = STTService()
+    stt = get_stt_service()
     worker = TranscriptionWorker(stt)
     
     try:
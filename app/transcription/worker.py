@@ -5,7 +5,7 @@ import wave
 import io
 import time
 from livekit import rtc
-from app.livekit.protocol import MsgType, AgentPacket
+from app.livekit.protocol import MsgType, AgentPacket, SPEAKER_POOL_IDENTITY
 from app.domain.services.stt_service import STTService
 
 logger = logging.getLogger(__name__)
@@ -55,7 +55,7 @@ class TranscriptionWorker:
              # We listen to everyone (or filter known bots). 
              # For PTT, we only buffer when `is_recording` is True for that user.
              # Ideally we have map<UserId, Task>. For MVP single user:
-             if participant.identity not in ["conductor-bot"]:
+             if participant.identity not in ["conductor-bot", SPEAKER_POOL_IDENTITY]:
                  logger.info(f"Subscribed to audio track from {participant.identity}. Starting stream handler.")
                  self.audio_stream_task = asyncio.create_task(self._handle_audio_stream(track, participant.identity))
 
@@ -7,6 +7,18 @@ export interface ParticipantState {
     audioTrack?: RemoteTrack;
 }
 
+// All AI speakers on one connection: one audio track per persona, named after it
+const SPEAKER_POOL_IDENTITY = "speaker-pool";
+
+function toStates(p: RemoteParticipant): ParticipantState[] {
+    if (p.identity !== SPEAKER_POOL_IDENTITY) {
+        return [{ identity: p.identity, isSpeaking: p.isSpeaking }];
+    }
+    return Array.from(p.trackPublications.values())
+        .filter(pub => pub.kind === Track.Kind.Audio)
+        .map(pub => ({ identity: pub.trackName, isSpeaking: false }));
+}
+
 export function useLiveKit(url: string, token: string | null) {
     const [room, setRoom] = useState<Room | null>(null);
     const [participants, setParticipants] = useState<ParticipantState[]>([]);
@@ -26,11 +38,21 @@ export function useLiveKit(url: string, token: string | null) {
                 r.on(RoomEvent.Disconnected, () => setIsConnected(false));
                 
                 r.on(RoomEvent.ParticipantConnected, (p) => {
-                    setParticipants(prev => [...prev, { identity: p.identity, isSpeaking: p.isSpeaking }]);
+                    setParticipants(prev => [...prev, ...toStates(p)]);
                 });
                 
                 r.on(RoomEvent.ParticipantDisconnected, (p) => {
-                    setParticipants(prev => prev.filter(x => x.identity !== p.identity));
+                    const gone = new Set(toStates(p).map(s => s.identity));
+                    setParticipants(prev => prev.filter(x => x.identity !== p.identity && !gone.has(x.identity)));
+                });
+
+                // A speaker pool's personas appear as it publishes their tracks
+                r.on(RoomEvent.TrackPublished, (pub, p) => {
+                    if (p.identity === SPEAKER_POOL_IDENTITY && pub.kind === Track.Kind.Audio) {
+                        setParticipants(prev => prev.some(x => x.identity === pub.trackName)
+                            ? prev
+                            : [...prev, { identity: pub.trackName, isSpeaking: false }]);
+                    }
                 });
 
                 r.on(RoomEvent.ActiveSpeakersChanged, (speakers) => {
@@ -51,10 +73,7 @@ export function useLiveKit(url: string, token: string | null) {
                 setRoom(r);
                 
                 // Init participants
-                const initialParticipants = Array.from(r.remoteParticipants.values()).map(p => ({
-                    identity: p.identity,
-                    isSpeaking: p.isSpeaking
-                }));
+                const initialParticipants = Array.from(r.remoteParticipants.values()).flatMap(toStates);
                 setParticipants(initialParticipants);
 
             } catch (e) {
@@ -0,0 +1,69 @@
+"""
+Decode cost per 1k utterance documents.
+
+Compares building validated UtteranceView models (the previous resolver
+path), Pydantic's model_construct, and the lean UtteranceRow decode used
+by the transcript resolver and metrics.
+
+    python scripts/bench_decode.py [--repeat 50]
+"""
+import argparse
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.domain.schemas import UtteranceView, Timing, AudioRef
+from app.domain.rows import UtteranceRow
+
+
+def make_docs(n):
+    return [{
+        "_id": f"utt-{i}",
+        "branch_id": "branch-1",
+        "seq_in_branch": i,
+        "kind": "ai",
+        "speaker_id": "alice" if i % 2 else "bob",
+        "text": "Well, I think we should reconsider the budget before the next sprint. " * 2,
+        "timing": {"t_start_ms": i * 3000, "t_end_ms": i * 3000 + 2500},
+        "audio": {"url": f"/audio/utt-{i}.wav", "duration_ms": 2500}
+    } for i in range(n)]
+
+
+def validated(u):
+    return UtteranceView(
+        utterance_id=u["_id"], speaker_id=u.get("speaker_id"), kind=u.get("kind"), text=u.get("text", ""),
+        timing=Timing(**u.get("timing", {})), audio=AudioRef(**u.get("audio", {})), display_id="1"
+    )
+
+
+def constructed(u):
+    return UtteranceView.model_construct(
+        utterance_id=u["_id"], speaker_id=u.get("speaker_id"), kind=u.get("kind"), text=u.get("text", ""),
+        timing=Timing.model_construct(**u.get("timing", {})), audio=AudioRef.model_construct(**u.get("audio", {})),
+        display_id="1"
+    )
+
+
+def lean(u):
+    return UtteranceRow.from_doc(u, "1")
+
+
+def main(repeat: int):
+    docs = make_docs(1000)
+    print(f"{'decoder':>15} {'ms / 1k':>9}")
+    for name, fn in [("pydantic", validated), ("model_construct", constructed), ("UtteranceRow", lean)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for d in docs:
+                fn(d)
+        print(f"{name:>15} {(time.perf_counter() - start) * 1000 / repeat:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.repeat)
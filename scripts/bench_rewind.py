@@ -0,0 +1,95 @@
+"""
+Rewind planning latency vs. transcript length.
+
+Runs RewindService.create_rewind_plan against in-memory repos that charge a
+fixed delay per Mongo round trip, rewinding to the last turn of transcripts
+of increasing length with a single checkpoint near the start (the worst case
+for a backwards scan). Latency should stay flat as the transcript grows.
+
+    python scripts/bench_rewind.py [--rtt-ms 2] [--repeat 5]
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.domain.services.rewind_service import RewindService
+from app.domain.schemas import TranscriptViewOut, UtteranceView
+
+
+class Resolver:
+    def __init__(self, n):
+        self.view = TranscriptViewOut(session_id="s1", branch_id="b1", utterances=[
+            UtteranceView(utterance_id=f"u{i}", speaker_id="a", kind="ai", text="x", display_id=str(i))
+            for i in range(n)
+        ])
+
+    async def get_transcript_view(self, session_id, branch_id):
+        return self.view
+
+
+class CheckpointRepo:
+    def __init__(self, rtt, n):
+        self.rtt = rtt
+        self.calls = 0
+        self.docs = {f"u{i}": {"_id": f"cp{i}", "branch_id": "b1", "at_utterance_id": f"u{i}", "created_at": str(i)}
+                     for i in range(min(n, 2))}
+
+    async def _round_trip(self):
+        self.calls += 1
+        await asyncio.sleep(self.rtt)
+
+    async def list_by_utterances(self, session_id, utterance_ids):
+        await self._round_trip()
+        return [self.docs[u] for u in utterance_ids if u in self.docs]
+
+
+class VC:
+    def __init__(self, rtt):
+        self.rtt = rtt
+
+    async def fork_branch(self, *args):
+        await asyncio.sleep(self.rtt)
+        class Res:
+            branch_id = "b2"
+        return Res()
+
+    async def set_active_branch(self, *args):
+        await asyncio.sleep(self.rtt)
+
+
+class ReplayEventRepo:
+    def __init__(self, rtt):
+        self.rtt = rtt
+
+    async def create(self, doc):
+        await asyncio.sleep(self.rtt)
+        return doc
+
+
+async def main(rtt_ms: float, repeat: int):
+    rtt = rtt_ms / 1000
+    print(f"{'turns':>8} {'ckpt queries':>13} {'p50 ms':>8}")
+    for n in [10, 100, 1000, 5000]:
+        cp_repo = CheckpointRepo(rtt, n)
+        svc = RewindService(VC(rtt), cp_repo, None, None, ReplayEventRepo(rtt), resolver=Resolver(n))
+        samples = []
+        for _ in range(repeat):
+            cp_repo.calls = 0
+            start = time.perf_counter()
+            await svc.create_rewind_plan("s1", "b1", f"u{n - 1}", "bench")
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        print(f"{n:>8} {cp_repo.calls:>13} {samples[len(samples) // 2]:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rtt_ms, args.repeat))
@@ -5,14 +5,15 @@ import os
 # Add project root to path
 sys.path.append(os.getcwd())
 
-from app.db.mongo import db, _client
+from app.db import mongo
 from app.domain.schemas import CaseStudyOut
 
 async def check_db():
     print("Checking DB connection...")
+    db = mongo.connect()
     try:
         # Ping
-        await _client.admin.command('ping')
+        await db.client.admin.command('ping')
         print("Ping successful!")
         
         # Check collections
@@ -40,6 +41,8 @@ async def check_db():
     except Exception as e:
         print(f"DB Error: {e}")
         sys.exit(1)
+    finally:
+        mongo.close()
 
 if __name__ == "__main__":
     asyncio.run(check_db())
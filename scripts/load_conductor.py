@@ -0,0 +1,182 @@
+"""
+Conductor load test on fake AI backends.
+
+Runs many live sessions in one process with LLM/STT/TTS replaced by the
+in-process fakes (LLM_BACKEND/TTS_BACKEND=fake) and LiveKit replaced by a
+loopback room whose speakers "play" each turn for as long as the fake TTS
+audio lasts. Nothing touches the network or Mongo, so what is measured is
+the conductor itself: turns per second and the gap between one turn's
+PLAYBACK_DONE and the next SPEAK_CMD.
+
+    python scripts/load_conductor.py [--sessions 200] [--duration 60] [--llm-ms 400]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("TTS_BACKEND", "fake")
+os.environ.setdefault("STT_BACKEND", "fake")
+
+from app.core.config import settings
+from app.core.timing import PhaseTimer
+from app.domain.services.fake_backends import FakeTTS, Latency
+from app.domain.services.llm_gateway import llm_gateway
+from app.livekit.conductor import Conductor, ConductorState
+from app.livekit.protocol import AgentPacket, MsgType, PlaybackDonePayload
+
+
+class Resolver:
+    async def get_transcript_view(self, session_id, branch_id):
+        return SimpleNamespace(utterances=[])
+
+
+class LoopbackRoom:
+    """Stands in for rtc.Room: delivers conductor commands to simulated speakers."""
+    def __init__(self, session):
+        self.session = session
+        self.local_participant = SimpleNamespace(publish_data=self.publish_data)
+
+    async def publish_data(self, data, reliable=True, destination_identities=None, **kwargs):
+        self.session.on_command(json.loads(data))
+
+
+class Session:
+    def __init__(self, idx, stats):
+        self.stats = stats
+        self.tts = FakeTTS.from_settings()
+        # Prepared (PREPARE_CMD) audio plays without the synthesis delay
+        self.prepared_tts = FakeTTS(Latency(0), settings.FAKE_TTS_MS_PER_WORD)
+        self.conductor = Conductor(None, None, Resolver(), None, None)
+        self.conductor.room = LoopbackRoom(self)
+        self.conductor.session_id = f"load-{idx}"
+        self.conductor.branch_id = "main"
+        self.playing = None
+        self.chunks = None
+        self.prepared = set()
+        self.t_done = None
+
+    async def start(self):
+        self.conductor.clock.start()
+        await self.conductor.transition_to(ConductorState.LIVE)
+
+    async def stop(self):
+        await self.conductor.transition_to(ConductorState.ENDING)
+        if self.playing:
+            self.playing.cancel()
+
+    def on_command(self, msg):
+        kind, payload, turn_id = msg["type"], msg.get("payload", {}), msg.get("turn_id")
+        if kind == MsgType.SPEAK_CMD:
+            if self.t_done is not None:
+                self.stats["gaps"].append((time.time() - self.t_done) * 1000)
+            self.chunks = asyncio.Queue()
+            self.playing = asyncio.create_task(self.play(turn_id, payload))
+        elif kind == MsgType.SPEAK_CHUNK and self.chunks:
+            self.chunks.put_nowait(payload)
+        elif kind == MsgType.PREPARE_CMD:
+            self.prepared.add(turn_id)
+        elif kind == MsgType.STOP_CMD and self.playing:
+            self.playing.cancel()
+
+    async def play(self, turn_id, payload):
+        t_cmd = time.time()
+        first_audio_ms = None
+        audio_ms = 0
+        text = payload["text"]
+        tts = self.prepared_tts if turn_id in self.prepared else self.tts
+        while text is not None:
+            frames = 0
+            async for _ in tts.synthesize(text):
+                frames += 1
+            if first_audio_ms is None:
+                first_audio_ms = int((time.time() - t_cmd) * 1000)
+            tts = self.tts
+            await asyncio.sleep(frames * FakeTTS.FRAME_MS / 1000) # Real-time playback
+            audio_ms += frames * FakeTTS.FRAME_MS
+            text = None
+            if payload.get("streaming"):
+                chunk = await self.chunks.get()
+                text = None if chunk.get("final") else chunk["text"]
+
+        self.t_done = time.time()
+        self.stats["turns"] += 1
+        self.stats["first_audio"].append(first_audio_ms)
+        self.conductor._handle_packet(AgentPacket(
+            type=MsgType.PLAYBACK_DONE, session_id=self.conductor.session_id, turn_id=turn_id,
+            payload=PlaybackDonePayload(
+                speaker_id=payload["speaker_id"], duration_ms=audio_ms, first_audio_ms=first_audio_ms
+            ).model_dump()
+        ), payload["speaker_id"])
+
+
+async def measure_loop_lag(lags, interval=0.05):
+    while True:
+        t = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - t - interval) * 1000)
+
+
+def pct(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--llm-ms", type=int, default=None, help="Mean fake LLM time-to-first-token")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if args.llm_ms is not None:
+        settings.FAKE_LLM_LATENCY_MS = args.llm_ms
+
+    stats = {"turns": 0, "gaps": [], "first_audio": []}
+    lags = []
+    lag_task = asyncio.create_task(measure_loop_lag(lags))
+    sessions = [Session(i, stats) for i in range(args.sessions)]
+
+    t0 = time.time()
+    for s in sessions:
+        await s.start()
+    await asyncio.sleep(args.duration)
+    elapsed = time.time() - t0
+    for s in sessions:
+        await s.stop()
+    lag_task.cancel()
+
+    hits = sum(s.conductor.spec_planner.stats["hits"] for s in sessions if s.conductor.spec_planner)
+    misses = sum(s.conductor.spec_planner.stats["misses"] for s in sessions if s.conductor.spec_planner)
+    gaps = stats["gaps"]
+    print(f"{args.sessions} sessions, {elapsed:.0f}s, backends: llm={settings.LLM_BACKEND} tts={settings.TTS_BACKEND}")
+    print(f"Turns: {stats['turns']} ({stats['turns'] / elapsed:.1f}/s)")
+    print(f"Gap ms: p50={pct(gaps, 0.5):.0f} p95={pct(gaps, 0.95):.0f} p99={pct(gaps, 0.99):.0f} mean={statistics.mean(gaps) if gaps else 0:.0f}")
+    print(f"First audio ms (after SPEAK_CMD): p50={pct(stats['first_audio'], 0.5):.0f} p95={pct(stats['first_audio'], 0.95):.0f}")
+    print(f"Speculation hit rate: {hits / (hits + misses) if hits + misses else 0:.0%}")
+    print("Conductor phases (ms):")
+    for phase, h in sorted(PhaseTimer.combined(s.conductor.phases for s in sessions).items()):
+        print(f"  {phase:18} n={h.count:<6} mean={h.total_ms / h.count:7.0f} p50<={h.percentile(0.5):<6.0f} p95<={h.percentile(0.95):.0f}")
+    gw = llm_gateway.snapshot()
+    queue_wait = gw["histograms"]["queue_wait"]
+    print(f"LLM gateway: {gw['calls']} calls, {gw['streams']} streams, {gw['coalesced']} coalesced, "
+          f"{gw['retries']} retries ({gw['retries_denied']} denied), {gw['errors']} errors; "
+          f"queue wait p95={queue_wait['p95_ms']:.0f}ms")
+    print(f"Event loop lag ms: p50={pct(lags, 0.5):.1f} p99={pct(lags, 0.99):.1f} max={max(lags, default=0):.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
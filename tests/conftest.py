@@ -8,6 +8,8 @@ os.environ["MONGO_URI"] = "mongodb://localhost:27017"
 os.environ["LIVEKIT_URL"] = "ws://localhost:7880"
 os.environ["LIVEKIT_API_KEY"] = "devkey"
 os.environ["LIVEKIT_API_SECRET"] = "secret"
+# Tests use mongomock; don't reach for a real server on app startup
+os.environ["MONGO_CREATE_INDEXES"] = "false"
 
 class AsyncCursor:
     def __init__(self, cursor):
@@ -45,20 +47,38 @@ class AsyncCollection:
     
     async def update_one(self, *args, **kwargs):
         return self._col.update_one(*args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        return self._col.update_many(*args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return self._col.find_one_and_update(*args, **kwargs)
         
     async def delete_one(self, *args, **kwargs):
         return self._col.delete_one(*args, **kwargs)
 
+    async def delete_many(self, *args, **kwargs):
+        return self._col.delete_many(*args, **kwargs)
+
     def find(self, *args, **kwargs):
         cursor = self._col.find(*args, **kwargs)
         return AsyncCursor(cursor)
     
+    def aggregate(self, *args, **kwargs):
+        return AsyncCursor(self._col.aggregate(*args, **kwargs))
+
     async def count_documents(self, *args, **kwargs):
         return self._col.count_documents(*args, **kwargs)
         
     async def create_index(self, *args, **kwargs):
         return self._col.create_index(*args, **kwargs)
 
+    async def index_information(self):
+        return self._col.index_information()
+
+    async def drop_index(self, *args, **kwargs):
+        return self._col.drop_index(*args, **kwargs)
+
 class AsyncDatabase:
     def __init__(self, sync_db):
         self._db = sync_db
@@ -73,4 +93,6 @@ def mock_db(monkeypatch):
     async_db = AsyncDatabase(db)
     
     monkeypatch.setattr("app.db.mongo.db", async_db)
+    # Repos bind their collection on construction; rebuild against the mock
+    monkeypatch.setattr("app.core.container._container", None)
     return async_db
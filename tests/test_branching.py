@@ -17,14 +17,19 @@ class MockRepo:
                 self.store[id].update(update["$set"])
             else:
                 self.store[id].update(update)
-    async def list_by_session(self, session_id):
+    async def list_by_session(self, session_id, projection=None):
         return [d for d in self.store.values() if d["session_id"] == session_id]
 
 class MockBranchRepo(MockRepo):
     pass
 
 class MockSessionRepo(MockRepo):
-    pass
+    branches_version = 0
+    async def bump_branches_version(self, session_id):
+        self.branches_version += 1
+        return self.branches_version
+    async def get_branches_version(self, session_id):
+        return self.branches_version
 
 @pytest.mark.asyncio
 async def test_fork_branch():
@@ -42,10 +47,20 @@ async def test_fork_branch():
     assert res.parent_branch_id == "main"
     assert res.fork_from_utterance_id == "utt_1"
     assert res.branch_id in br_repo.store
+    assert br_repo.store[res.branch_id]["ancestry"] == [
+        {"branch_id": "main", "fork_from_utterance_id": None},
+        {"branch_id": res.branch_id, "fork_from_utterance_id": "utt_1"},
+    ]
+    
+    # Nested fork extends the parent's path
+    res2 = await vc.fork_branch("s1", res.branch_id, "utt_2", None, "user_1")
+    ancestry = br_repo.store[res2.branch_id]["ancestry"]
+    assert [a["branch_id"] for a in ancestry] == ["main", res.branch_id, res2.branch_id]
+    assert ancestry[-1]["fork_from_utterance_id"] == "utt_2"
     
     # Verify list
     branches = await vc.list_branches("s1")
-    assert len(branches) == 2
+    assert len(branches) == 3
 
     # Set active
     await vc.set_active_branch("s1", res.branch_id)
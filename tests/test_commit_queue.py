@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from app.domain.services.conductor_writer import TurnCommit
+from app.livekit.commit_queue import CommitError, CommitQueue
+
+class FakeWriter:
+    def __init__(self, fail_first=0, delay=0.0, rejected=()):
+        self.fail_first = fail_first
+        self.delay = delay
+        self.rejected = set(rejected)
+        self.calls = 0
+        self.committed = []
+
+    async def append_batch(self, session_id, turns):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.calls <= self.fail_first:
+            raise ConnectionError("mongo down")
+        bad = [t.event_id for t in turns if t.event_id in self.rejected]
+        if bad:
+            raise ValueError(f"Branch not found for {bad}")
+        self.committed.extend(t.event_id for t in turns)
+        return [{"utterance_id": t.event_id} for t in turns]
+
+def turn(i):
+    return TurnCommit("b1", "ai", "alice", f"t{i}", {"t_start_ms": 0, "t_end_ms": 1}, {}, f"evt-{i}")
+
+@pytest.mark.asyncio
+async def test_commit_queue_batches_in_order():
+    writer = FakeWriter(delay=0.01)
+    q = CommitQueue(writer, "s1", max_batch=16)
+
+    for i in range(5):
+        await q.enqueue(turn(i))
+    await q.flush()
+
+    assert writer.committed == [f"evt-{i}" for i in range(5)]
+    # First turn commits alone; the rest accumulate behind it
+    assert writer.calls < 5
+    assert q.committed == 5
+    await q.close()
+
+@pytest.mark.asyncio
+async def test_commit_queue_enqueue_does_not_wait_for_writer():
+    writer = FakeWriter(delay=0.5)
+    q = CommitQueue(writer, "s1")
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await q.enqueue(turn(0))
+    await q.enqueue(turn(1))
+    assert loop.time() - start < 0.1
+
+    await q.close()
+    assert writer.committed == ["evt-0", "evt-1"]
+
+@pytest.mark.asyncio
+async def test_commit_queue_retries_failed_batch():
+    writer = FakeWriter(fail_first=2)
+    q = CommitQueue(writer, "s1", retry_base_delay=0.01)
+
+    await q.enqueue(turn(0))
+    await q.flush()
+
+    assert writer.committed == ["evt-0"]
+    assert q.retries == 2
+    assert q.failed == 0
+    await q.close()
+
+@pytest.mark.asyncio
+async def test_commit_queue_holds_turns_it_cannot_commit():
+    writer = FakeWriter(fail_first=4)
+    q = CommitQueue(writer, "s1", max_retries=2, retry_base_delay=0.01)
+
+    await q.enqueue(turn(0))
+    # Still failing after the retries and the extra attempt flush makes
+    with pytest.raises(CommitError):
+        await q.flush()
+    assert [t.event_id for t in q.held] == ["evt-0"]
+    assert writer.committed == []
+
+    # The held turn goes ahead of the next one
+    await q.enqueue(turn(1))
+    await q.flush()
+    assert writer.committed == ["evt-0", "evt-1"]
+    assert not q.held
+    await q.close()
+
+@pytest.mark.asyncio
+async def test_commit_queue_quarantines_rejected_turns():
+    writer = FakeWriter(rejected={"evt-1"})
+    q = CommitQueue(writer, "s1", retry_base_delay=0.01)
+
+    for i in range(3):
+        await q.enqueue(turn(i))
+    await q.flush()
+
+    # The rest of the batch still commits, and the bad turn does not come back
+    assert writer.committed == ["evt-0", "evt-2"]
+    assert [t.event_id for t in q.quarantined] == ["evt-1"]
+    assert q.failed == 1
+    assert not q.held
+
+    await q.enqueue(turn(3))
+    await q.flush()
+    assert writer.committed == ["evt-0", "evt-2", "evt-3"]
+    await q.close()
@@ -0,0 +1,83 @@
+import pytest
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.livekit.conductor import Conductor
+from app.livekit.protocol import MsgType
+
+def make_conductor():
+    c = Conductor(MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+    c.session_id = "s1"
+    c.room = MagicMock()
+    c.room.remote_participants = {
+        "alice": MagicMock(), "bob": MagicMock(), "transcription-worker": MagicMock(), "fac-1": MagicMock()
+    }
+    c.room.local_participant.publish_data = AsyncMock()
+    return c
+
+def sent(conductor):
+    """(type, destinations) of each packet published."""
+    out = []
+    for call in conductor.room.local_participant.publish_data.call_args_list:
+        out.append((json.loads(call.args[0])["type"], call.kwargs["destination_identities"]))
+    return out
+
+@pytest.mark.asyncio
+async def test_packets_go_only_to_who_uses_them():
+    conductor = make_conductor()
+    await conductor.send_speak_cmd("alice", "Hi.", turn_id="t1")
+    await conductor.send_speak_chunk("alice", "More.", "t1")
+    await conductor.send_stop_cmd("alice")
+    await conductor.send_prepare_drop(3)
+    await conductor.broadcast_clock_sync()
+
+    assert sent(conductor) == [
+        (MsgType.SPEAK_CMD, ["alice", "fac-1"]),
+        (MsgType.SPEAK_CHUNK, ["alice"]),
+        (MsgType.STOP_CMD, ["alice"]),
+        (MsgType.PREPARE_DROP, ["alice", "bob"]),
+        (MsgType.CLOCK_SYNC, ["fac-1"]),
+    ]
+
+@pytest.mark.asyncio
+async def test_turn_start_drops_prepared_audio_it_made_moot():
+    from types import SimpleNamespace
+    conductor = make_conductor()
+    conductor.active_speakers = ["alice", "bob"]
+    def plan(turn_id, speaker_id, after_turn_id):
+        return SimpleNamespace(turn_id=turn_id, speaker_id=speaker_id, after_turn_id=after_turn_id,
+                               text="...", plan_version=1)
+    # Alternatives for the turn after t0, and one for the turn after t1
+    await conductor.send_prepare_cmd(plan("t1", "alice", "t0"))
+    await conductor.send_prepare_cmd(plan("t1b", "bob", "t0"))
+    await conductor.send_prepare_cmd(plan("t2", "bob", "t1"))
+    conductor.room.local_participant.publish_data.reset_mock()
+
+    await conductor.send_speak_cmd("alice", "Hi.", turn_id="t1")
+
+    # Only bob's alternative for t1 is dropped; t2 can still be used
+    calls = conductor.room.local_participant.publish_data.call_args_list
+    drop = json.loads(calls[-1].args[0])
+    assert sent(conductor)[-1] == (MsgType.PREPARE_DROP, ["bob"])
+    assert drop["payload"]["turn_ids"] == ["t1b"]
+    assert list(conductor._prepared_turns) == ["t2"]
+
+@pytest.mark.asyncio
+async def test_ui_updates_are_skipped_without_a_frontend():
+    conductor = make_conductor()
+    del conductor.room.remote_participants["fac-1"]
+    await conductor.broadcast_clock_pause(1000)
+    # An empty destination list would reach everyone
+    conductor.room.local_participant.publish_data.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_pool_and_broadcast_mirror():
+    conductor = make_conductor()
+    with patch("app.livekit.conductor.settings.SPEAKER_POOL", True):
+        await conductor.send_play_asset_cmd("bob", "/tmp/a.wav", turn_id="t1")
+    with patch("app.livekit.conductor.settings.CONDUCTOR_BROADCAST_MIRROR", True):
+        await conductor.send_stop_cmd("bob")
+
+    assert sent(conductor) == [
+        (MsgType.PLAY_ASSET_CMD, ["speaker-pool", "fac-1"]),
+        (MsgType.STOP_CMD, []),
+    ]
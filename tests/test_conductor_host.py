@@ -0,0 +1,156 @@
+import pytest
+import asyncio
+import time
+from app.livekit.host import ConductorHost, HostFullError
+from app.domain.services.session_registry import InMemorySessionRegistry
+
+def burn(ms):
+    end = time.thread_time() + ms / 1000
+    while time.thread_time() < end:
+        pass
+
+@pytest.mark.asyncio
+async def test_admission_limit():
+    host = ConductorHost(max_sessions=1, registry=InMemorySessionRegistry())
+    async def idle(runtime):
+        await asyncio.Event().wait()
+    host._run = idle
+
+    await host.start_session("s1", "b1", "room-1")
+    with pytest.raises(HostFullError):
+        await host.start_session("s2", "b2", "room-2")
+    assert host.stats["rejected"] == 1
+
+    # A slot frees up when a session stops
+    assert await host.stop_session("s1")
+    await host.start_session("s2", "b2", "room-2")
+    assert list(host.sessions) == ["s2"]
+    await host.shutdown()
+    assert not host.sessions
+
+class SlowClaimRegistry(InMemorySessionRegistry):
+    async def claim(self, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        return await super().claim(*args, **kwargs)
+
+@pytest.mark.asyncio
+async def test_concurrent_starts_respect_the_limit():
+    host = ConductorHost(max_sessions=1, registry=SlowClaimRegistry())
+    async def idle(runtime):
+        await asyncio.Event().wait()
+    host._run = idle
+
+    # The slot is held while the first claim is in flight
+    results = await asyncio.gather(
+        host.start_session("s1", "b1", "room-1"),
+        host.start_session("s2", "b2", "room-2"),
+        return_exceptions=True
+    )
+    assert isinstance(results[1], HostFullError)
+    assert list(host.sessions) == ["s1"]
+    await host.shutdown()
+
+    # Two starts of the same session launch it once
+    host = ConductorHost(max_sessions=4, registry=SlowClaimRegistry())
+    host._run = idle
+    await asyncio.gather(host.start_session("s1", "b1", "room-1"), host.start_session("s1", "b1", "room-1"))
+    assert list(host.sessions) == ["s1"] and host.stats["started"] == 1
+    await host.shutdown()
+
+@pytest.mark.asyncio
+async def test_cpu_is_charged_to_the_session_that_spent_it():
+    host = ConductorHost(max_sessions=4, slow_step_ms=10, registry=InMemorySessionRegistry())
+    release = asyncio.Event()
+    burned = asyncio.Event()
+    async def busy(runtime):
+        burn(30)
+        # Tasks started by the session count too
+        await asyncio.create_task(_burn_later(30))
+        burned.set()
+        await release.wait()
+    async def run(runtime):
+        if runtime.session_id == "busy":
+            await busy(runtime)
+        await release.wait()
+
+    host._run = run
+    await host.start_session("busy", "b", "r1")
+    await host.start_session("idle", "b", "r2")
+    await asyncio.wait_for(burned.wait(), timeout=1)
+
+    stats = host.snapshot()["per_session"]
+    assert stats["busy"]["cpu_ms"] >= 55
+    assert stats["busy"]["max_step_ms"] >= 25
+    assert stats["busy"]["slow_steps"] >= 2
+    assert stats["idle"]["cpu_ms"] < 10
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert not host.sessions and host.stats["finished"] == 2
+    await host.shutdown()
+
+async def _burn_later(ms):
+    await asyncio.sleep(0)
+    burn(ms)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def make_host(host_id, registry, runs):
+    host = ConductorHost(max_sessions=4, registry=registry, host_id=host_id)
+    async def run(runtime):
+        runs.append((host_id, runtime.session_id, runtime.resume))
+        await asyncio.Event().wait()
+    host._run = run
+    return host
+
+@pytest.mark.asyncio
+async def test_orphaned_session_is_reclaimed_and_old_owner_stands_down():
+    clock = Clock()
+    registry = InMemorySessionRegistry(ttl_s=15, clock=clock)
+    runs = []
+    a, b = make_host("a", registry, runs), make_host("b", registry, runs)
+
+    await a.start_session("s1", "b1", "room-1")
+    await b.heartbeat()
+    assert not b.sessions # A's lease is live
+
+    # A stalls past its TTL: B takes the session over and resumes it
+    clock.now += 16
+    await b.heartbeat()
+    await asyncio.sleep(0)
+    assert list(b.sessions) == ["s1"] and runs[-1] == ("b", "s1", True)
+
+    # A finds out on its next heartbeat and stops its copy, leaving B's lease
+    await a.heartbeat()
+    assert not a.sessions and a.stats["lost"] == 1
+    assert (await registry.get("s1")).owner == "b"
+    await b.shutdown()
+
+@pytest.mark.asyncio
+async def test_stop_requested_through_registry_reaches_owner():
+    registry = InMemorySessionRegistry(ttl_s=15)
+    host = make_host("a", registry, [])
+    await host.start_session("s1", "b1", "room-1")
+
+    await registry.request_stop("s1")
+    await host.heartbeat()
+
+    assert not host.sessions
+    assert await registry.get("s1") is None
+
+@pytest.mark.asyncio
+async def test_shutdown_hands_sessions_to_another_host():
+    registry = InMemorySessionRegistry(ttl_s=15)
+    runs = []
+    a, b = make_host("a", registry, runs), make_host("b", registry, runs)
+    await a.start_session("s1", "b1", "room-1")
+
+    await a.shutdown()
+    await b.heartbeat()
+
+    assert list(b.sessions) == ["s1"]
+    await b.shutdown()
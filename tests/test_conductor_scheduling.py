@@ -0,0 +1,65 @@
+import pytest
+import asyncio
+import time
+from unittest.mock import MagicMock
+from app.livekit.conductor import Conductor
+
+def make_conductor():
+    return Conductor(MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+@pytest.mark.asyncio
+async def test_turn_gap_counts_from_playback_done():
+    conductor = make_conductor()
+
+    # Planning already took longer than the gap: no extra wait
+    conductor.t_playback_done = time.time() - 1.0
+    t0 = time.time()
+    await conductor._pace_turn(0.2)
+    assert time.time() - t0 < 0.05
+
+    conductor.t_playback_done = time.time()
+    await conductor._pace_turn(0.2)
+    assert time.time() - conductor.t_playback_done == pytest.approx(0.2, abs=0.05)
+
+@pytest.mark.asyncio
+async def test_intervention_cuts_waits_short():
+    conductor = make_conductor()
+    conductor.t_playback_done = time.time()
+    pacing = asyncio.create_task(conductor._pace_turn(5.0))
+    silence = asyncio.create_task(conductor._wait_for(conductor._wake, 5.0))
+    await asyncio.sleep(0.01)
+
+    conductor.is_processing_intervention = True
+
+    await asyncio.wait_for(asyncio.gather(pacing, silence), timeout=0.5)
+
+@pytest.mark.asyncio
+async def test_loop_resumes_when_transcript_lands():
+    conductor = make_conductor()
+    conductor.is_processing_intervention = True
+    waiter = asyncio.create_task(conductor._intervention_clear.wait())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    conductor.is_processing_intervention = False
+    await asyncio.wait_for(waiter, timeout=0.1)
+    assert conductor._t_intervention_done is not None
+
+@pytest.mark.asyncio
+async def test_dispatch_records_gap_or_reply_latency():
+    conductor = make_conductor()
+    now = time.time()
+
+    conductor.t_playback_done = now - 0.3
+    conductor._gap_open = True
+    conductor._mark_dispatch("t1", now - 0.1)
+
+    # After an intervention the wait is the reply latency, not a gap
+    conductor.is_processing_intervention = True
+    conductor.is_processing_intervention = False
+    conductor._mark_dispatch("t2", now)
+
+    hist = conductor.phases.histograms
+    assert hist["gap"].count == 1 and hist["gap"].max_ms >= 300
+    assert hist["plan"].count == 2
+    assert hist["reply"].count == 1
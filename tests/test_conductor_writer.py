@@ -1,5 +1,6 @@
 import pytest
-from app.domain.services.conductor_writer import ConductorWriter
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.domain.services.conductor_writer import ConductorWriter, TurnCommit
 from app.domain.schemas import UtteranceView, Timing
 
 class MockRepo:
@@ -14,7 +15,7 @@ class MockRepo:
     async def find_one(self, query):
         if "event_id" in query:
             for d in self.store.values():
-                if d.get("event_id") == query["event_id"]:
+                if d.get("event_id") == query["event_id"] and d.get("session_id") == query.get("session_id"):
                     return d
         return None
     async def update_one(self, query, update):
@@ -30,13 +31,62 @@ class MockRepo:
         return None
 
 class MockSessionRepo(MockRepo):
-    pass
+    async def update_one(self, query, update):
+        doc = self.store[query["_id"]]
+        for k, v in update.get("$inc", {}).items():
+            doc[k] = doc.get(k, 0) + v
 class MockBranchRepo(MockRepo):
-    pass
+    async def update(self, id, update):
+        self.store[id].update(update)
+    async def allocate_seq(self, branch_id, utterance_id, count=1):
+        self.allocations = getattr(self, "allocations", 0) + 1
+        b = self.store.get(branch_id)
+        if not b or "seq_counter" not in b:
+            return None
+        before = dict(b)
+        b["seq_counter"] += count
+        b["last_utterance_id"] = utterance_id
+        return before
+    async def release_seq(self, branch_id, utterance_id, prev_utterance_id, count=1):
+        b = self.store[branch_id]
+        if b.get("last_utterance_id") != utterance_id:
+            return False
+        b["seq_counter"] -= count
+        b["last_utterance_id"] = prev_utterance_id
+        return True
+    async def init_seq_counter(self, branch_id, seq, last_utterance_id):
+        b = self.store[branch_id]
+        if "seq_counter" not in b:
+            b["seq_counter"] = seq
+            b["last_utterance_id"] = last_utterance_id
 class MockUtteranceRepo(MockRepo):
-    pass
+    async def create(self, doc):
+        # Unique (session_id, event_id) index
+        if doc.get("event_id") and await self.find_one({"session_id": doc["session_id"], "event_id": doc["event_id"]}):
+            raise DuplicateKeyError("event_id")
+        return await super().create(doc)
+    async def create_many(self, docs):
+        # Ordered insert against a unique (session_id, event_id) index
+        for d in docs:
+            if await self.find_one({"session_id": d["session_id"], "event_id": d["event_id"]}):
+                raise BulkWriteError({"writeErrors": [{"code": 11000}]})
+            await self.create(d)
+        return docs
+    async def delete_many(self, ids):
+        for id in ids:
+            self.store.pop(id, None)
+    async def get_by_event_ids(self, session_id, event_ids):
+        return [d for d in self.store.values() if d["session_id"] == session_id and d.get("event_id") in event_ids]
+    async def get_last_in_branch(self, session_id, branch_id):
+        utts = await self.get_by_branch(session_id, branch_id)
+        return max(utts, key=lambda d: d["seq_in_branch"]) if utts else None
 class MockCheckpointRepo(MockRepo):
-    pass
+    async def create_many(self, docs):
+        for d in docs:
+            await self.create(d)
+        return docs
+    async def list_by_utterances(self, session_id, utterance_ids, projection=None):
+        return [d for d in self.store.values() if d["at_utterance_id"] in utterance_ids]
 
 class MockResolver:
     async def get_transcript_view(self, session_id, branch_id):
@@ -71,3 +121,235 @@ async def test_conductor_writer_append():
         "s1", "b1", "ai", "alice", "hello", {}, {}, "evt1"
     )
     assert res2["utterance_id"] == res["utterance_id"]
+
+
+@pytest.mark.asyncio
+async def test_conductor_writer_seq_and_display_id():
+    sess_repo = MockSessionRepo()
+    br_repo = MockBranchRepo()
+    utt_repo = MockUtteranceRepo()
+    cp_repo = MockCheckpointRepo()
+    writer = ConductorWriter(sess_repo, br_repo, utt_repo, cp_repo, MockResolver())
+
+    await sess_repo.create({"_id": "s1", "write_version": 0})
+    # Root with two seeds; counter continues after them
+    await br_repo.create({"_id": "root", "session_id": "s1", "parent_branch_id": None,
+                          "seq_counter": 2, "last_utterance_id": "seed2", "fork_display_prefix": None})
+    await utt_repo.create({"_id": "seed2", "session_id": "s1", "branch_id": "root", "kind": "seed", "seed_idx": 2, "seq_in_branch": 2})
+
+    res = await writer.append_utterance_and_checkpoint("s1", "root", "ai", "alice", "a", {}, {}, "evt1")
+    assert res["display_id"] == "3"
+    assert utt_repo.store[res["utterance_id"]]["prev_utterance_id"] == "seed2"
+
+    # Fork from the AI turn; display ids nest under it
+    await br_repo.create({"_id": "br1", "session_id": "s1", "parent_branch_id": "root",
+                          "fork_from_utterance_id": res["utterance_id"], "seq_counter": 0, "last_utterance_id": None})
+    r1 = await writer.append_utterance_and_checkpoint("s1", "br1", "ai", "bob", "b", {}, {}, "evt2")
+    r2 = await writer.append_utterance_and_checkpoint("s1", "br1", "ai", "bob", "c", {}, {}, "evt3")
+    assert (r1["display_id"], r2["display_id"]) == ("3.1", "3.2")
+    assert br_repo.store["br1"]["fork_display_prefix"] == "3"
+    assert utt_repo.store[r2["utterance_id"]]["prev_utterance_id"] == r1["utterance_id"]
+
+    # Legacy branch without a counter is seeded from its last utterance
+    await br_repo.create({"_id": "old", "session_id": "s1", "parent_branch_id": None})
+    await utt_repo.create({"_id": "o5", "session_id": "s1", "branch_id": "old", "kind": "ai", "seq_in_branch": 5})
+    r3 = await writer.append_utterance_and_checkpoint("s1", "old", "ai", "bob", "d", {}, {}, "evt4")
+    assert utt_repo.store[r3["utterance_id"]]["seq_in_branch"] == 6
+
+
+@pytest.mark.asyncio
+async def test_conductor_writer_append_batch():
+    sess_repo = MockSessionRepo()
+    br_repo = MockBranchRepo()
+    utt_repo = MockUtteranceRepo()
+    cp_repo = MockCheckpointRepo()
+    writer = ConductorWriter(sess_repo, br_repo, utt_repo, cp_repo, MockResolver())
+
+    await sess_repo.create({"_id": "s1", "write_version": 0})
+    await br_repo.create({"_id": "b1", "session_id": "s1", "parent_branch_id": None,
+                          "seq_counter": 0, "last_utterance_id": None, "fork_display_prefix": None})
+
+    first = await writer.append_utterance_and_checkpoint("s1", "b1", "ai", "alice", "a", {}, {}, "evt1")
+
+    turns = [
+        TurnCommit("b1", "ai", "alice", "a", {}, {}, "evt1"), # Already committed
+        TurnCommit("b1", "ai", "bob", "b", {}, {}, "evt2"),
+        TurnCommit("b1", "user_intervention", "facilitator", "c", {}, {"k": 1}, "evt3"),
+        TurnCommit("b1", "ai", "bob", "b", {}, {}, "evt2"), # Duplicate in batch
+    ]
+    br_repo.allocations = 0
+    results = await writer.append_batch("s1", turns)
+
+    assert results[0]["utterance_id"] == first["utterance_id"]
+    assert [r["display_id"] for r in results[1:3]] == ["2", "3"]
+    assert results[3] == results[1]
+    # One counter $inc for the whole branch
+    assert br_repo.allocations == 1
+
+    u2 = utt_repo.store[results[1]["utterance_id"]]
+    u3 = utt_repo.store[results[2]["utterance_id"]]
+    assert u2["prev_utterance_id"] == first["utterance_id"]
+    assert u3["prev_utterance_id"] == u2["_id"]
+    assert cp_repo.store[results[2]["checkpoint_id"]]["state"] == {"k": 1}
+    assert br_repo.store["b1"]["last_utterance_id"] == u3["_id"]
+    assert len(utt_repo.store) == 3
+
+
+@pytest.mark.asyncio
+async def test_conductor_writer_running_metrics():
+    from app.metrics.running import empty_running, fold_turn
+    sess_repo = MockSessionRepo()
+    br_repo = MockBranchRepo()
+    utt_repo = MockUtteranceRepo()
+    cp_repo = MockCheckpointRepo()
+    writer = ConductorWriter(sess_repo, br_repo, utt_repo, cp_repo, MockResolver())
+
+    await sess_repo.create({"_id": "s1", "write_version": 0})
+    base = fold_turn(empty_running(), "alice", {"t_start_ms": 0, "t_end_ms": 0})
+    await br_repo.create({"_id": "root", "session_id": "s1", "parent_branch_id": None,
+                          "seq_counter": 1, "last_utterance_id": "seed1", "last_seed_utterance_id": "seed1",
+                          "base_metrics": base})
+
+    r1 = await writer.append_utterance_and_checkpoint(
+        "s1", "root", "ai", "alice", "a", {"t_start_ms": 0, "t_end_ms": 1000}, {}, "evt1")
+    await writer.append_batch("s1", [
+        TurnCommit("root", "ai", "bob", "b", {"t_start_ms": 1500, "t_end_ms": 3000}, {}, "evt2"),
+        TurnCommit("root", "ai", "alice", "c", {"t_start_ms": 2500, "t_end_ms": 4000}, {}, "evt3"),
+    ])
+
+    tail_id = br_repo.store["root"]["last_utterance_id"]
+    tail = await cp_repo.get_by_utterance("s1", "root", tail_id)
+    m = tail["state"]["metrics"]
+    assert m["speaking_time_ms"] == {"alice": 2500, "bob": 1500}
+    assert m["turn_counts"] == {"alice": 3, "bob": 1}
+    assert m["interruptions"] == {"alice": 1}
+    assert m["gap_total_ms"] == 500
+
+    # A fork continues from the fork checkpoint's snapshot
+    await br_repo.create({"_id": "br1", "session_id": "s1", "parent_branch_id": "root",
+                          "fork_from_utterance_id": r1["utterance_id"], "seq_counter": 0, "last_utterance_id": None})
+    r4 = await writer.append_utterance_and_checkpoint(
+        "s1", "br1", "ai", "bob", "d", {"t_start_ms": 1000, "t_end_ms": 2000}, {}, "evt4")
+    m = cp_repo.store[r4["checkpoint_id"]]["state"]["metrics"]
+    assert m["speaking_time_ms"] == {"alice": 1000, "bob": 1000}
+    assert m["turn_counts"] == {"alice": 2, "bob": 1}
+
+    # A live tail without a checkpoint: don't restart from the seed aggregates
+    del cp_repo.store[tail["_id"]]
+    r5 = await writer.append_utterance_and_checkpoint(
+        "s1", "root", "ai", "bob", "e", {"t_start_ms": 4000, "t_end_ms": 5000}, {}, "evt5")
+    assert "metrics" not in cp_repo.store[r5["checkpoint_id"]]["state"]
+
+
+def make_writer():
+    repos = MockSessionRepo(), MockBranchRepo(), MockUtteranceRepo(), MockCheckpointRepo()
+    return ConductorWriter(*repos, MockResolver()), repos
+
+
+@pytest.mark.asyncio
+async def test_append_batch_retry_repairs_missing_checkpoints():
+    from app.metrics.running import empty_running
+    writer, (sess_repo, br_repo, utt_repo, cp_repo) = make_writer()
+    await sess_repo.create({"_id": "s1", "write_version": 0})
+    await br_repo.create({"_id": "root", "session_id": "s1", "parent_branch_id": None, "seq_counter": 1,
+                          "last_utterance_id": "seed1", "last_seed_utterance_id": "seed1",
+                          "base_metrics": empty_running()})
+    turns = [
+        TurnCommit("root", "ai", "alice", "a", {"t_start_ms": 0, "t_end_ms": 1000}, {}, "evt1"),
+        TurnCommit("root", "ai", "bob", "b", {"t_start_ms": 1000, "t_end_ms": 2000}, {"k": 1}, "evt2"),
+    ]
+
+    # Utterances land, checkpoints don't
+    create_many = cp_repo.create_many
+    async def fail(docs):
+        raise RuntimeError("connection reset")
+    cp_repo.create_many = fail
+    with pytest.raises(RuntimeError):
+        await writer.append_batch("s1", turns)
+    assert len(utt_repo.store) == 2 and not cp_repo.store
+    assert sess_repo.store["s1"]["write_version"] == 0
+
+    cp_repo.create_many = create_many
+    results = await writer.append_batch("s1", turns)
+
+    # The retry writes the missing checkpoints, without reallocating seqs
+    assert br_repo.store["root"]["seq_counter"] == 3
+    assert len(utt_repo.store) == 2
+    ckpts = [cp_repo.store[r["checkpoint_id"]] for r in results]
+    assert ckpts[1]["state"]["k"] == 1
+    assert ckpts[1]["state"]["metrics"]["turn_counts"] == {"alice": 1, "bob": 1}
+    assert sess_repo.store["s1"]["write_version"] > 0
+
+
+@pytest.mark.asyncio
+async def test_append_batch_loses_event_id_race():
+    writer, (sess_repo, br_repo, utt_repo, cp_repo) = make_writer()
+    await sess_repo.create({"_id": "s1", "write_version": 0})
+    await br_repo.create({"_id": "b1", "session_id": "s1", "parent_branch_id": None,
+                          "seq_counter": 0, "last_utterance_id": None, "fork_display_prefix": None})
+
+    # Another writer commits evt2 between our idempotency lookup and insert
+    get_by_event_ids = utt_repo.get_by_event_ids
+    async def racing_lookup(session_id, event_ids):
+        utt_repo.get_by_event_ids = get_by_event_ids
+        await writer.append_utterance_and_checkpoint("s1", "b1", "ai", "bob", "b", {}, {}, "evt2")
+        return []
+    utt_repo.get_by_event_ids = racing_lookup
+
+    results = await writer.append_batch("s1", [
+        TurnCommit("b1", "ai", "alice", "a", {}, {}, "evt1"),
+        TurnCommit("b1", "ai", "bob", "b", {}, {}, "evt2"),
+    ])
+
+    other = next(d for d in utt_repo.store.values() if d["event_id"] == "evt2")
+    assert results[1]["utterance_id"] == other["_id"]
+    # The lost attempt was taken back: no gap, no dangling tail
+    mine = utt_repo.store[results[0]["utterance_id"]]
+    assert len(utt_repo.store) == 2
+    assert (other["seq_in_branch"], mine["seq_in_branch"]) == (1, 2)
+    assert mine["prev_utterance_id"] == other["_id"]
+    assert br_repo.store["b1"]["last_utterance_id"] == mine["_id"]
+
+
+@pytest.mark.asyncio
+async def test_append_loses_event_id_race():
+    writer, (sess_repo, br_repo, utt_repo, cp_repo) = make_writer()
+    await sess_repo.create({"_id": "s1", "write_version": 0})
+    await br_repo.create({"_id": "b1", "session_id": "s1", "parent_branch_id": None,
+                          "seq_counter": 0, "last_utterance_id": None, "fork_display_prefix": None})
+
+    # Another writer commits evt1 between our idempotency check and insert
+    find_one = utt_repo.find_one
+    async def racing_find_one(query):
+        utt_repo.find_one = find_one
+        await writer.append_utterance_and_checkpoint("s1", "b1", "ai", "alice", "a", {}, {}, "evt1")
+        return None
+    utt_repo.find_one = racing_find_one
+    res = await writer.append_utterance_and_checkpoint("s1", "b1", "ai", "alice", "a", {}, {}, "evt1")
+
+    theirs = next(d for d in utt_repo.store.values() if d["event_id"] == "evt1")
+    assert res["utterance_id"] == theirs["_id"]
+    # Our reservation was handed back: the next turn chains onto theirs
+    assert br_repo.store["b1"]["seq_counter"] == 1
+    assert br_repo.store["b1"]["last_utterance_id"] == theirs["_id"]
+    nxt = await writer.append_utterance_and_checkpoint("s1", "b1", "ai", "bob", "b", {}, {}, "evt2")
+    assert utt_repo.store[nxt["utterance_id"]]["prev_utterance_id"] == theirs["_id"]
+
+
+@pytest.mark.asyncio
+async def test_event_ids_are_scoped_to_the_session():
+    writer, (sess_repo, br_repo, utt_repo, cp_repo) = make_writer()
+    for s in ("s1", "s2"):
+        await sess_repo.create({"_id": s, "write_version": 0})
+        await br_repo.create({"_id": f"{s}-b", "session_id": s, "parent_branch_id": None,
+                              "seq_counter": 0, "last_utterance_id": None, "fork_display_prefix": None})
+
+    # The same event_id in another session is a different turn
+    r1 = await writer.append_utterance_and_checkpoint("s1", "s1-b", "ai", "alice", "a", {}, {}, "evt1")
+    r2 = await writer.append_utterance_and_checkpoint("s2", "s2-b", "ai", "bob", "b", {}, {}, "evt1")
+    [r3] = await writer.append_batch("s2", [TurnCommit("s2-b", "ai", "bob", "c", {}, {}, "evt2")])
+    [r4] = await writer.append_batch("s1", [TurnCommit("s1-b", "ai", "alice", "d", {}, {}, "evt2")])
+
+    assert len({r["utterance_id"] for r in (r1, r2, r3, r4)}) == 4
+    assert utt_repo.store[r2["utterance_id"]]["session_id"] == "s2"
+    assert utt_repo.store[r4["utterance_id"]]["text"] == "d"
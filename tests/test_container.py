@@ -0,0 +1,26 @@
+from app.core import container
+from app.api.transcripts import get_resolver
+from app.api.utterances import get_writer
+from app.api.metrics import get_metrics_engine
+from app.api.rewind import get_rewind_service
+from app.domain.services.transcript_cache import transcript_cache
+
+def test_dependencies_share_one_container(mock_db):
+    resolver = get_resolver()
+
+    # Same instances on every request
+    assert get_resolver() is resolver
+    assert get_writer() is get_writer()
+    # Every service resolves transcripts through the shared, cached resolver
+    assert resolver.cache is transcript_cache
+    assert get_writer().transcript_resolver is resolver
+    assert get_metrics_engine().transcript_resolver is resolver
+    assert get_rewind_service().resolver is resolver
+
+def test_container_rebinds_after_reset(mock_db):
+    first = container.get_container()
+    container.reset_container()
+    second = container.get_container()
+
+    assert second is not first
+    assert second.transcript_cache is first.transcript_cache
@@ -20,3 +20,51 @@ async def test_mock_db_crud(mock_db):
     cursor = repo.col.find({})
     docs = await cursor.to_list(None)
     assert len(docs) == 1
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_enforces_unique_event_id(mock_db):
+    import pymongo.errors
+    from app.db import mongo
+
+    # The old global index is replaced
+    await mock_db["utterances"].create_index("event_id", unique=True, partialFilterExpression={"event_id": {"$type": "string"}})
+    await mongo.ensure_indexes()
+    
+    col = mock_db["utterances"]
+    await col.insert_one({"_id": "u1", "session_id": "sess-1", "event_id": "evt-1"})
+    # Seeds carry no event_id and are not constrained
+    await col.insert_one({"_id": "s1", "session_id": "sess-1", "kind": "seed"})
+    await col.insert_one({"_id": "s2", "session_id": "sess-1", "kind": "seed"})
+    # event_ids are unique per session only
+    await col.insert_one({"_id": "u3", "session_id": "sess-2", "event_id": "evt-1"})
+    with pytest.raises(pymongo.errors.DuplicateKeyError):
+        await col.insert_one({"_id": "u2", "session_id": "sess-1", "event_id": "evt-1"})
+
+def test_pool_stats_tracks_checkouts():
+    from app.db.mongo import PoolStats
+    
+    stats = PoolStats()
+    stats.connection_created(None)
+    stats.connection_created(None)
+    stats.connection_checked_out(None)
+    stats.connection_checked_out(None)
+    stats.connection_checked_in(None)
+    stats.connection_check_out_failed(None)
+    
+    snap = stats.snapshot()
+    assert snap["open"] == 2
+    assert snap["checked_out"] == 1
+    assert snap["max_checked_out"] == 2
+    assert snap["checkouts"] == 2
+    assert snap["checkout_failures"] == 1
+
+def test_client_is_created_by_connect_and_dropped_by_close(monkeypatch):
+    from app.db import mongo
+    monkeypatch.setattr(mongo, "_client", None)
+    monkeypatch.setattr(mongo, "db", None)
+
+    db = mongo.connect()
+    assert mongo.get_db() is db
+    assert mongo.connect() is db # One client per process
+    mongo.close()
+    assert mongo._client is None and mongo.db is None
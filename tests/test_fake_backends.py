@@ -0,0 +1,80 @@
+import pytest
+import random
+import statistics
+from unittest.mock import patch
+from app.core.config import settings
+from app.domain.services.fake_backends import FakeLLMBackend, FakeSTTService, FakeTTS, Latency
+from app.domain.services.llm_backend import OpenAIBackend, get_llm_backend
+from app.domain.services.llm_service import LLMService
+
+PERSONAS = {"alice": "Careful.", "bob": "Blunt.", "charlie": "Analytical."}
+
+def make_llm(**kwargs):
+    return LLMService(backend=FakeLLMBackend(Latency(0), seed=1, **kwargs))
+
+@pytest.mark.parametrize("dist", ["fixed", "uniform", "normal", "lognormal"])
+def test_latency_distributions_have_the_configured_mean(dist):
+    latency = Latency(mean_ms=200, jitter_ms=60, dist=dist)
+    rng = random.Random(0)
+
+    draws = [latency.sample(rng) for _ in range(5000)]
+
+    assert min(draws) >= 0
+    assert statistics.mean(draws) == pytest.approx(0.2, rel=0.05)
+
+@pytest.mark.asyncio
+async def test_fake_plans_name_an_active_speaker_other_than_the_last():
+    llm = make_llm()
+
+    for _ in range(20):
+        plan = await llm.plan_next_turn(["alice: Hi", "bob: Hey"], PERSONAS, ["alice", "bob", "charlie"])
+        assert plan["speaker_id"] in ("alice", "charlie")
+        assert plan["text"]
+
+@pytest.mark.asyncio
+async def test_fake_streaming_feeds_the_plan_parser():
+    llm = make_llm(token_interval_s=0.001)
+
+    events = [e async for e in llm.stream_plan_next_turn(["alice: Hi"], PERSONAS, ["alice", "bob"])]
+
+    assert events[0] == {"type": "speaker", "speaker_id": "bob"}
+    assert [e["type"] for e in events[1:]] == ["sentence", "sentence", "done"]
+    # The usage chunk arrives last, as with include_usage
+    assert llm.usage["calls"] == 1 and llm.usage["completion_tokens"] > 0
+
+@pytest.mark.asyncio
+async def test_scripted_outputs_replay_in_order():
+    script = [{"speaker_id": "charlie", "text": "First.", "reason": "s"}, {"speaker_id": "silence", "text": "", "reason": "s"}]
+    llm = make_llm(script=script)
+
+    picks = [(await llm.plan_next_turn([], PERSONAS, ["alice"]))["speaker_id"] for _ in range(3)]
+
+    assert picks == ["charlie", "silence", "charlie"]
+
+@pytest.mark.asyncio
+async def test_repeated_system_prefix_is_reported_cached():
+    llm = make_llm()
+
+    await llm.plan_next_turn(["alice: Hi"], PERSONAS, ["alice", "bob"])
+    assert llm.usage["cached_tokens"] == 0
+    await llm.plan_next_turn(["alice: Hi", "bob: Hey"], PERSONAS, ["alice", "bob"])
+    assert 0 < llm.usage["cached_tokens"] < llm.usage["prompt_tokens"]
+
+@pytest.mark.asyncio
+async def test_fake_stt_and_tts():
+    stt = FakeSTTService(Latency(0), script=["Bob, your view?"])
+    assert await stt.transcribe(b"...") == "Bob, your view?"
+
+    tts = FakeTTS(Latency(0), ms_per_word=100)
+    frames = [chunk.frame async for chunk in tts.synthesize("one two three four")]
+    # 400ms of audio in 20ms frames
+    assert len(frames) == 20
+    assert not any(bytes(frames[0].data))
+
+def test_backend_selected_by_settings():
+    with patch.object(settings, "LLM_BACKEND", "fake"):
+        assert isinstance(get_llm_backend(), FakeLLMBackend)
+    with patch("app.domain.services.llm_backend.AsyncOpenAI"):
+        assert isinstance(get_llm_backend("openai"), OpenAIBackend)
+    with pytest.raises(ValueError):
+        get_llm_backend("nope")
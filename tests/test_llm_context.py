@@ -0,0 +1,64 @@
+import pytest
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.domain.services.llm_context import ContextBuilder
+from app.domain.services.llm_backend import OpenAIBackend
+from app.domain.services.llm_service import LLMService
+
+PERSONAS = {"bob": "Blunt.", "alice": "Careful."}
+
+def make_llm(case_study=None):
+    with patch("app.domain.services.llm_backend.AsyncOpenAI"):
+        return LLMService(case_study=case_study, backend=OpenAIBackend())
+
+def lines(n):
+    return [f"alice: line {i}" for i in range(n)]
+
+@pytest.mark.asyncio
+async def test_prefix_is_stable_and_history_goes_last():
+    llm = make_llm("Budget cuts")
+
+    first = llm._plan_messages(lines(3), dict(PERSONAS), ["alice", "bob"])
+    later = llm._plan_messages(lines(30), dict(PERSONAS), ["alice", "bob"])
+
+    assert first[0]["content"] == later[0]["content"]
+    assert "Budget cuts" in first[0]["content"]
+    assert "line 29" not in first[0]["content"]
+    assert later[1]["content"].rstrip().endswith("Plan the next turn.")
+
+@pytest.mark.asyncio
+async def test_rolling_summary_is_built_off_the_hot_path():
+    gate = asyncio.Event()
+    async def summarizer(summary, new_lines):
+        await gate.wait()
+        return f"{len(new_lines)} earlier lines"
+    ctx = ContextBuilder(PERSONAS, ["alice", "bob"], summarizer=summarizer, recent_turns=4, summary_batch=3)
+    history = lines(10)
+
+    # Nothing is dropped while the summary is being computed
+    block = ctx.history_block(history)
+    assert "line 0" in block and "Summary" not in block
+
+    gate.set()
+    await asyncio.sleep(0)
+    block = ctx.history_block(history)
+    assert "6 earlier lines" in block
+    assert "line 5" not in block and "line 6" in block
+
+    # A different history (rewind) invalidates the summary
+    block = ctx.history_block(["bob: other"] + history[1:])
+    assert "Summary" not in block and ctx.summarized_upto == 0
+
+@pytest.mark.asyncio
+async def test_prompt_token_counts_are_recorded():
+    llm = make_llm()
+    response = MagicMock()
+    response.choices[0].message.content = '{"speaker_id": "bob", "text": "Hi", "reason": "r"}'
+    response.usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=20,
+                                     prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+    llm.backend.client.chat.completions.create = AsyncMock(return_value=response)
+
+    await llm.plan_next_turn(lines(2), PERSONAS, ["alice", "bob"])
+
+    assert llm.usage == {"calls": 1, "prompt_tokens": 1200, "cached_tokens": 1024, "completion_tokens": 20}
@@ -0,0 +1,193 @@
+import pytest
+import asyncio
+from app.domain.services.llm_backend import LLMBackend, LLMChunk, Usage
+from app.core.timing import LatencyHistogram
+from app.domain.services.llm_gateway import LLMGateway, RetryBudget
+
+MSGS = [{"role": "user", "content": "hi"}]
+
+class Transient(Exception):
+    pass
+
+class GatedBackend(LLMBackend):
+    """Calls block until released; the first `failures` calls raise Transient."""
+    def __init__(self, failures=0, gated=True):
+        self.failures = failures
+        self.gated = gated
+        self.started = []
+        self.gates = {}
+        self.cancelled = 0
+
+    async def complete(self, model, messages, json_mode=False, temperature=0.7):
+        tag = messages[0]["content"]
+        self.started.append(tag)
+        if self.failures:
+            self.failures -= 1
+            raise Transient()
+        if self.gated:
+            gate = self.gates.setdefault(tag, asyncio.Event())
+            try:
+                await gate.wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return f"re: {tag}", Usage(prompt_tokens=10, completion_tokens=2)
+
+    async def stream(self, model, messages, json_mode=False, temperature=0.7):
+        self.started.append("stream")
+        if self.failures:
+            self.failures -= 1
+            raise Transient()
+        for part in ("a", "b"):
+            yield LLMChunk(part)
+        yield LLMChunk(usage=Usage(prompt_tokens=10, completion_tokens=2))
+
+    def is_retryable(self, exc):
+        return isinstance(exc, Transient)
+
+def msgs(tag):
+    return [{"role": "user", "content": tag}]
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_waiting_session_with_fewest_calls_goes_next():
+    backend = GatedBackend()
+    gw = LLMGateway(backend, max_concurrent=2, per_session=2)
+
+    busy = [asyncio.create_task(gw.complete("A", "m", msgs(f"a{i}"))) for i in range(4)]
+    await settle()
+    other = asyncio.create_task(gw.complete("B", "m", msgs("b0")))
+    await settle()
+    assert backend.started == ["a0", "a1"]
+
+    # The freed slot goes to B, not to A's third call that queued first
+    backend.gates["a0"].set()
+    await settle()
+    assert backend.started == ["a0", "a1", "b0"]
+
+    for tag in ("a1", "b0", "a2", "a3"):
+        backend.gates.setdefault(tag, asyncio.Event()).set()
+        await settle()
+    await asyncio.gather(*busy, other)
+    assert gw.snapshot()["active"] == 0
+
+@pytest.mark.asyncio
+async def test_per_session_cap_leaves_room_for_others():
+    backend = GatedBackend()
+    gw = LLMGateway(backend, max_concurrent=4, per_session=1)
+
+    tasks = [asyncio.create_task(gw.complete("A", "m", msgs(f"a{i}"))) for i in range(2)]
+    tasks.append(asyncio.create_task(gw.complete("B", "m", msgs("b0"))))
+    await settle()
+
+    assert backend.started == ["a0", "b0"]
+    # Two running, one queued; A is at its cap
+    assert gw.spare() == 1
+    assert gw.spare("A") == 0 and gw.spare("C") == 1
+    for gate in ("a0", "b0", "a1"):
+        backend.gates.setdefault(gate, asyncio.Event()).set()
+        await settle()
+    await asyncio.gather(*tasks)
+
+@pytest.mark.asyncio
+async def test_identical_in_flight_requests_share_one_call():
+    backend = GatedBackend()
+    gw = LLMGateway(backend, max_concurrent=4, per_session=4)
+
+    first = asyncio.create_task(gw.complete("A", "m", MSGS))
+    second = asyncio.create_task(gw.complete("A", "m", MSGS))
+    await settle()
+    backend.gates["hi"].set()
+
+    (t1, u1), (t2, u2) = await asyncio.gather(first, second)
+    assert backend.started == ["hi"] and t1 == t2
+    # Tokens are reported once
+    assert u1.prompt_tokens == 10 and u2 is None
+    assert gw.stats["coalesced"] == 1
+
+@pytest.mark.asyncio
+async def test_abandoned_call_is_cancelled_and_frees_its_slot():
+    backend = GatedBackend()
+    gw = LLMGateway(backend, max_concurrent=1, per_session=1)
+
+    task = asyncio.create_task(gw.complete("A", "m", MSGS))
+    await settle()
+    task.cancel()
+    await settle()
+
+    assert backend.cancelled == 1
+    backend.gated = False
+    assert (await gw.complete("A", "m", MSGS))[0] == "re: hi"
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_within_budget():
+    gw = LLMGateway(GatedBackend(failures=2, gated=False), max_attempts=3, backoff_base_s=0)
+    assert (await gw.complete("A", "m", MSGS))[0] == "re: hi"
+    assert gw.stats["retries"] == 2
+
+    # An empty budget turns the failure into an error right away
+    empty = RetryBudget(ratio=0, min_per_s=0, max_tokens=0)
+    gw = LLMGateway(GatedBackend(failures=1, gated=False), max_attempts=3, retry_budget=empty, backoff_base_s=0)
+    with pytest.raises(Transient):
+        await gw.complete("A", "m", MSGS)
+    assert gw.stats["retries_denied"] == 1
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_token():
+    gw = LLMGateway(GatedBackend(failures=1), backoff_base_s=0)
+
+    chunks = [c async for c in gw.stream("A", "m", MSGS)]
+
+    assert "".join(c.text for c in chunks) == "ab"
+    assert gw.stats["retries"] == 1
+    assert gw.histograms["stream_first_token"].count == 1
+
+@pytest.mark.asyncio
+async def test_stream_joins_in_flight_completion():
+    backend = GatedBackend()
+    gw = LLMGateway(backend)
+
+    pending = asyncio.create_task(gw.complete("A", "m", MSGS))
+    await settle()
+    stream = asyncio.create_task(_collect(gw.stream("A", "m", MSGS)))
+    await settle()
+    backend.gates["hi"].set()
+
+    await pending
+    assert [c.text for c in await stream] == ["re: hi"]
+    assert backend.started == ["hi"]
+
+@pytest.mark.asyncio
+async def test_stream_frees_its_slot_when_upstream_finishes():
+    backend = GatedBackend()
+    gw = LLMGateway(backend, max_concurrent=1, per_session=1)
+
+    stream = gw.stream("A", "m", MSGS)
+    first = await stream.__anext__()
+    await settle()
+    # The caller hasn't read the rest yet, but the provider is done with it
+    assert gw.snapshot()["active"] == 0
+    nxt = asyncio.create_task(gw.complete("A", "m", msgs("next")))
+    await settle()
+    assert backend.started == ["stream", "next"]
+
+    rest = await _collect(stream)
+    assert [c.text for c in [first] + rest][:2] == ["a", "b"]
+    backend.gates["next"].set()
+    await nxt
+
+async def _collect(gen):
+    return [c async for c in gen]
+
+def test_histogram_percentiles():
+    h = LatencyHistogram()
+    for ms in [10] * 90 + [300] * 9 + [20000]:
+        h.observe(ms)
+
+    assert h.percentile(0.5) == 25
+    assert h.percentile(0.95) == 400
+    assert h.percentile(1.0) == 20000
+    assert h.snapshot()["buckets"][">12800"] == 1
@@ -0,0 +1,96 @@
+import pytest
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.domain.services.plan_stream import PlanStreamParser
+from app.domain.services.llm_backend import OpenAIBackend
+from app.domain.services.llm_service import LLMService
+from app.livekit.conductor import Conductor
+from app.livekit.protocol import MsgType
+
+PLAN = {"speaker_id": "bob", "text": "We need to move. Now! Who's \"in\"?", "reason": "urgency"}
+
+def feed_all(parser, raw, step):
+    events = []
+    for i in range(0, len(raw), step):
+        events.extend(parser.feed(raw[i:i + step]))
+    return events + parser.finish()
+
+@pytest.mark.parametrize("step", [1, 3, 1000])
+def test_parser_emits_speaker_then_sentences(step):
+    events = feed_all(PlanStreamParser(), json.dumps(PLAN), step)
+
+    assert events[0] == {"type": "speaker", "speaker_id": "bob"}
+    assert [e["text"] for e in events if e["type"] == "sentence"] == ["We need to move.", "Now!", "Who's \"in\"?"]
+    assert events[-1] == {"type": "done", "plan": PLAN}
+
+def test_parser_sentence_available_before_completion_ends():
+    parser = PlanStreamParser()
+    events = parser.feed('{"speaker_id": "bob", "text": "First one. Sec')
+
+    # The first sentence is out while the rest is still being generated
+    assert [e["type"] for e in events] == ["speaker", "sentence"]
+    assert events[1]["text"] == "First one."
+
+def test_parser_holds_text_until_speaker_known():
+    parser = PlanStreamParser()
+    assert parser.feed('{"text": "Hi there. ') == []
+
+    events = parser.feed('", "speaker_id": "alice"}')
+    assert [e["type"] for e in events] == ["speaker", "sentence"]
+
+class FakeStream:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.closed = False
+    def __aiter__(self):
+        return self._gen()
+    async def _gen(self):
+        for d in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))])
+    async def close(self):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_llm_stream_plan_next_turn():
+    raw = json.dumps(PLAN)
+    stream = FakeStream([raw[i:i + 5] for i in range(0, len(raw), 5)])
+    with patch("app.domain.services.llm_backend.AsyncOpenAI"):
+        llm = LLMService(backend=OpenAIBackend())
+    llm.backend.client.chat.completions.create = AsyncMock(return_value=stream)
+
+    events = [e async for e in llm.stream_plan_next_turn(["alice: Hi"], {}, ["alice", "bob"])]
+
+    assert llm.backend.client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert events[0]["type"] == "speaker"
+    assert events[-1]["plan"] == PLAN
+    assert stream.closed
+
+@pytest.mark.asyncio
+async def test_conductor_speaks_on_first_sentence():
+    async def stream_plan(history, personas, active_speakers):
+        yield {"type": "speaker", "speaker_id": "bob"}
+        yield {"type": "sentence", "text": "One."}
+        # SPEAK_CMD is already out before the rest of the plan arrives
+        assert sent[0]["type"] == MsgType.SPEAK_CMD
+        yield {"type": "sentence", "text": "Two."}
+        yield {"type": "done", "plan": {"speaker_id": "bob", "text": "One. Two.", "reason": "r"}}
+
+    conductor = Conductor(MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+    conductor.session_id = "s1"
+    sent = []
+    async def publish_data(data, **kwargs):
+        sent.append(json.loads(data))
+    conductor.room = MagicMock()
+    conductor.room.local_participant.publish_data = publish_data
+    llm = MagicMock()
+    llm.stream_plan_next_turn = stream_plan
+
+    plan = await conductor._stream_plan_and_speak(llm, [], {}, ["alice", "bob"], "turn-1", 0.0)
+
+    assert plan["dispatched"] and plan["text"] == "One. Two."
+    assert conductor.current_turn_id == "turn-1" and conductor.current_speaker == "bob"
+    assert [m["type"] for m in sent] == [MsgType.SPEAK_CMD, MsgType.SPEAK_CHUNK, MsgType.SPEAK_CHUNK]
+    assert sent[0]["payload"]["streaming"] is True
+    assert sent[1]["payload"]["text"] == "Two."
+    assert sent[2]["payload"]["final"] is True
@@ -20,7 +20,8 @@ class MockRepo:
 class MockSessionRepo(MockRepo):
     pass
 class MockCheckpointRepo(MockRepo):
-    pass
+    async def list_by_utterances(self, session_id, utterance_ids, projection=None):
+        return [c for c in self.store.values() if c.get("at_utterance_id") in utterance_ids]
 
 class MockVC:
     async def fork_branch(self, session_id, parent_branch_id, from_utterance_id, from_checkpoint_id, created_by):
@@ -60,6 +61,10 @@ async def test_rewind_api():
 class MockBranchRepo(MockRepo):
     pass
 
+class MockReplayEventRepo:
+    async def create(self, doc):
+        return doc
+
 class MockUtteranceRepo(MockRepo):
     async def get_by_branch(self, session_id, branch_id):
         # Return list of utterances for this branch
@@ -72,6 +77,10 @@ class MockUtteranceRepo(MockRepo):
         # Sort by seq_in_branch
         res.sort(key=lambda x: x.get("seq_in_branch", 0))
         return res
+    async def get_by_branches(self, session_id, branch_ids):
+        res = [u for u in self.store.values() if u.get("branch_id") in branch_ids]
+        res.sort(key=lambda x: x.get("seq_in_branch", 0))
+        return res
 
 @pytest.mark.asyncio
 async def test_rewind_plan():
@@ -97,24 +106,25 @@ async def test_rewind_plan():
     })
     
     # Checkpoint for u1
-    await cp_repo.create({"_id": "cp1", "at_utterance_id": "u1"})
+    await cp_repo.create({"_id": "cp1", "branch_id": "b1", "at_utterance_id": "u1"})
     
     # Req
     from app.api.rewind import rewind_plan
     from app.domain.schemas import RewindToReq
+    from app.domain.services.rewind_service import RewindService
     
     req = RewindToReq(branch_id="b1", target_utterance_id="u1", created_by="user")
+    service = RewindService(vc, cp_repo, utt_repo, branch_repo, MockReplayEventRepo())
     
-    res = await rewind_plan("s1", req, vc, cp_repo, utt_repo, branch_repo)
+    res = await rewind_plan("s1", req, service)
     
     assert res.new_branch_id == "new_br"
     assert res.target_utterance_id == "u1"
     
-    # Replay utterances should contain u2 only
-    # u1 is target (exclusive start)
+    # Replay utterances should contain u1 and u2
+    # u1 is target (inclusive start)
     # u3 is facilitator (exclusive end)
-    assert len(res.replay_utterances) == 1
-    assert res.replay_utterances[0].utterance_id == "u2"
+    assert [u.utterance_id for u in res.replay_utterances] == ["u1", "u2"]
     
     assert res.handoff_reason == "HIT_FACILITATOR_TURN"
     assert res.handoff_at_utterance_id == "u3"
@@ -18,6 +18,8 @@ async def test_rewind_full_flow():
     conductor.room = MagicMock()
     conductor.room.connect = AsyncMock()
     conductor.room.local_participant.publish_data = AsyncMock()
+    # Progress updates are addressed to facilitator clients
+    conductor.room.remote_participants = {"fac-1": MagicMock()}
     
     # Mock Rewind Plan
     plan = RewindPlanRes(
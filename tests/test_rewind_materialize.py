@@ -17,8 +17,8 @@ async def test_materialize_timeline_with_replay():
     # Mock Branch (Forked)
     branch_repo.get.return_value = {
         "_id": "branch-2",
-        "parent_id": "branch-1",
-        "forked_at_utterance_id": "utt-4"
+        "parent_branch_id": "branch-1",
+        "fork_from_utterance_id": "utt-4"
     }
     
     # Mock Replay Event
@@ -44,15 +44,15 @@ async def test_materialize_timeline_with_replay():
     resolver.get_transcript_view.return_value = parent_view
     
     # Mock Replayed Utterances (5-7)
-    async def mock_find_one(query):
-        utt_id = query.get("_id")
-        return {
+    async def mock_get_many(utterance_ids, projection=None):
+        # Unordered, like a $in query
+        return [{
             "_id": utt_id,
             "speaker_id": "alice" if utt_id in ["utt-5", "utt-7"] else "bob",
             "text": f"Replayed {utt_id}",
             "audio": {}
-        }
-    utterance_repo.col.find_one = mock_find_one
+        } for utt_id in reversed(utterance_ids)]
+    utterance_repo.get_many = AsyncMock(side_effect=mock_get_many)
     
     # Mock New Turns (after divergence)
     utterance_repo.get_by_branch.return_value = [
@@ -77,6 +77,10 @@ async def test_materialize_timeline_with_replay():
     # Check replay_event_id
     assert result[4]["replay_event_id"] == "evt-1"
     assert result[7]["replay_event_id"] is None
+    
+    # Replayed turns fetched in one query, in replay order
+    assert [r["turn_id"] for r in result[4:7]] == ["utt-5", "utt-6", "utt-7"]
+    utterance_repo.get_many.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -92,8 +96,8 @@ async def test_materialize_timeline_no_fork():
     # Mock Non-Forked Branch
     branch_repo.get.return_value = {
         "_id": "branch-1",
-        "parent_id": None,
-        "forked_at_utterance_id": None
+        "parent_branch_id": None,
+        "fork_from_utterance_id": None
     }
     
     # Mock Utterances
@@ -107,3 +111,29 @@ async def test_materialize_timeline_no_fork():
     
     assert len(result) == 2
     assert all(item["source"] == "original" for item in result)
+
+
+def test_materialized_timeline_stream_ndjson():
+    """
+    Test: Streaming endpoint yields one JSON item per line.
+    """
+    import json
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.api.branches import get_materialize_service
+    
+    class MockService:
+        async def iter_materialized_timeline(self, session_id, branch_id):
+            for i in range(3):
+                yield {"turn_id": f"utt-{i}", "source": "original"}
+    
+    app.dependency_overrides[get_materialize_service] = lambda: MockService()
+    try:
+        resp = TestClient(app).get("/sessions/sess-1/branches/branch-1/materialized_timeline/stream")
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in resp.text.splitlines()]
+    assert [i["turn_id"] for i in items] == ["utt-0", "utt-1", "utt-2"]
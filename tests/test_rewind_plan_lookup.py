@@ -0,0 +1,79 @@
+import pytest
+from app.domain.services.rewind_service import RewindService
+from app.domain.schemas import TranscriptViewOut, UtteranceView
+
+class MockResolver:
+    def __init__(self, ids):
+        self.ids = ids
+    async def get_transcript_view(self, session_id, branch_id):
+        return TranscriptViewOut(session_id=session_id, branch_id=branch_id, utterances=[
+            UtteranceView(utterance_id=i, speaker_id="a", kind="ai", text=i, display_id=i) for i in self.ids
+        ])
+
+class MockCheckpointRepo:
+    def __init__(self, ckpts):
+        self.ckpts = ckpts
+        self.calls = 0
+    async def list_by_utterances(self, session_id, utterance_ids, projection=None):
+        self.calls += 1
+        return [c for c in self.ckpts if c["at_utterance_id"] in utterance_ids]
+
+class MockVC:
+    def __init__(self):
+        self.forks = []
+    async def fork_branch(self, session_id, parent_branch_id, from_utterance_id, from_checkpoint_id, created_by):
+        self.forks.append((from_utterance_id, from_checkpoint_id))
+        class Res:
+            branch_id = "new_br"
+        return Res()
+    async def set_active_branch(self, session_id, branch_id):
+        pass
+
+class MockReplayRepo:
+    async def create(self, doc):
+        return doc
+
+def make_service(ids, ckpts):
+    cp_repo = MockCheckpointRepo(ckpts)
+    vc = MockVC()
+    svc = RewindService(vc, cp_repo, None, None, MockReplayRepo(), resolver=MockResolver(ids))
+    return svc, cp_repo, vc
+
+@pytest.mark.asyncio
+async def test_rewind_plan_picks_nearest_prior_checkpoint_in_one_query():
+    ids = [f"u{i}" for i in range(10)]
+    ckpts = [
+        {"_id": "cp2", "branch_id": "b1", "at_utterance_id": "u2", "created_at": "2"},
+        {"_id": "cp5", "branch_id": "b1", "at_utterance_id": "u5", "created_at": "5"},
+        # Ancestor branch checkpoints are not fork points for b1
+        {"_id": "cp6", "branch_id": "root", "at_utterance_id": "u6", "created_at": "6"},
+        {"_id": "cp8", "branch_id": "b1", "at_utterance_id": "u8", "created_at": "8"},
+    ]
+    svc, cp_repo, vc = make_service(ids, ckpts)
+
+    res = await svc.create_rewind_plan("s1", "b1", "u7", "user")
+
+    assert res.fork_checkpoint_id == "cp5"
+    assert vc.forks == [("u5", "cp5")]
+    assert [u.utterance_id for u in res.replay_utterances] == ["u7", "u8", "u9"]
+    assert cp_repo.calls == 1
+
+@pytest.mark.asyncio
+async def test_rewind_plan_falls_back_to_first_checkpoint():
+    ids = ["u0", "u1", "u2"]
+    ckpts = [
+        {"_id": "cp2", "branch_id": "b1", "at_utterance_id": "u2", "created_at": "2"},
+        {"_id": "cp1", "branch_id": "b1", "at_utterance_id": "u1", "created_at": "1"},
+    ]
+    svc, _, vc = make_service(ids, ckpts)
+
+    res = await svc.create_rewind_plan("s1", "b1", "u0", "user")
+
+    assert res.fork_checkpoint_id == "cp1"
+    assert vc.forks == [(None, "cp1")]
+
+@pytest.mark.asyncio
+async def test_rewind_plan_without_checkpoints_raises():
+    svc, _, _ = make_service(["u0", "u1"], [])
+    with pytest.raises(ValueError):
+        await svc.create_rewind_plan("s1", "b1", "u1", "user")
@@ -0,0 +1,50 @@
+import pytest
+from app.db.repos.session_lease import SessionLeaseRepo
+from app.domain.services.session_registry import MongoSessionRegistry
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+@pytest.mark.asyncio
+async def test_mongo_leases(mock_db):
+    clock = Clock()
+    registry = MongoSessionRegistry(SessionLeaseRepo(), ttl_s=15, clock=clock)
+
+    assert await registry.claim("s1", "b1", "room-1", "a", "http://a")
+    assert not await registry.claim("s1", "b1", "room-1", "b")
+
+    clock.now += 10
+    assert list(await registry.heartbeat("a", ["s1"])) == ["s1"]
+    clock.now += 10
+    # Renewed, so not expired yet
+    assert await registry.reclaim_orphans("b", None, limit=5) == []
+
+    clock.now += 20
+    [lease] = await registry.reclaim_orphans("b", "http://b", limit=5)
+    assert lease.owner == "b" and lease.owner_url == "http://b" and lease.claims == 2
+    assert await registry.heartbeat("a", ["s1"]) == {}
+
+    # A's late release doesn't drop B's lease
+    await registry.release("s1", "a")
+    assert (await registry.get("s1")).owner == "b"
+    await registry.release("s1", "b")
+    assert await registry.get("s1") is None
+
+@pytest.mark.asyncio
+async def test_mongo_stop_requests(mock_db):
+    clock = Clock()
+    registry = MongoSessionRegistry(SessionLeaseRepo(), ttl_s=15, clock=clock)
+    await registry.claim("s1", "b1", "room-1", "a")
+    await registry.claim("s2", "b2", "room-2", "a")
+
+    assert (await registry.request_stop("s1")).stop_requested
+    assert (await registry.heartbeat("a", ["s1", "s2"]))["s1"].stop_requested
+
+    # The owner died: the stopped session is dropped, the other reclaimed
+    clock.now += 30
+    leases = await registry.reclaim_orphans("b", None, limit=5)
+    assert [l.session_id for l in leases] == ["s2"]
+    assert await registry.get("s1") is None
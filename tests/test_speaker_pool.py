@@ -0,0 +1,67 @@
+import pytest
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.livekit.speaker_worker import SpeakerPool
+from app.livekit.protocol import AgentPacket, MsgType
+
+class FakeTTS:
+    def __init__(self):
+        self.calls = []
+    def synthesize(self, text):
+        self.calls.append(text)
+        async def frames():
+            yield SimpleNamespace(frame=SimpleNamespace(data=b"\x00\x00"))
+        return frames()
+
+def packet(type, turn_id, **payload):
+    msg = AgentPacket(type=type, session_id="s1", turn_id=turn_id, payload=payload)
+    return SimpleNamespace(data=msg.model_dump_json().encode("utf-8"), participant=None)
+
+@pytest.fixture
+def pool():
+    with patch("app.livekit.speaker_worker.rtc"):
+        p = SpeakerPool({"alice": {"voice": "nova"}, "bob": {"voice": "onyx"}}, tts_for=lambda voice: FakeTTS())
+    p.room.local_participant.publish_data = AsyncMock()
+    for speaker in p.speakers.values():
+        speaker.audio_source = MagicMock()
+        speaker.audio_source.capture_frame = AsyncMock()
+    return p
+
+@pytest.mark.asyncio
+async def test_commands_are_routed_to_the_named_speaker(pool):
+    alice, bob = pool.speakers["alice"], pool.speakers["bob"]
+    assert alice.room is pool.room and alice.tts is not bob.tts
+
+    pool.on_data_received(packet(MsgType.PREPARE_CMD, "t1", text="Later.", speaker_id="bob", state_version=1))
+    assert list(bob.prepared) == ["t1"] and alice.prepared == {}
+
+    with patch("app.livekit.speaker_worker.json.loads", wraps=json.loads) as loads:
+        pool.on_data_received(packet(MsgType.SPEAK_CMD, "t2", text="Now.", speaker_id="alice"))
+    # Decoded once for the whole pool
+    assert loads.call_count == 1
+    # Bob's speculation is moot once Alice has the floor
+    assert bob.prepared == {} and bob.speak_task is None
+    await alice.speak_task
+
+    assert alice.tts.calls == ["Now."]
+    done = json.loads(pool.room.local_participant.publish_data.call_args.args[0])
+    assert done["type"] == MsgType.PLAYBACK_DONE
+    assert done["payload"]["speaker_id"] == "alice" and done["turn_id"] == "t2"
+
+@pytest.mark.asyncio
+async def test_stop_reaches_every_speaker(pool):
+    for speaker in pool.speakers.values():
+        speaker.speak_task = MagicMock()
+    pool.on_data_received(packet(MsgType.STOP_CMD, None))
+    for speaker in pool.speakers.values():
+        speaker.speak_task.cancel.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_addressed_stop_only_stops_that_speaker(pool):
+    for speaker in pool.speakers.values():
+        speaker.speak_task = MagicMock()
+    pool.on_data_received(packet(MsgType.STOP_CMD, None, speaker_id="bob"))
+    pool.speakers["bob"].speak_task.cancel.assert_called_once()
+    pool.speakers["alice"].speak_task.cancel.assert_not_called()
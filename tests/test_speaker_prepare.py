@@ -0,0 +1,67 @@
+import pytest
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.livekit.speaker_worker import SpeakerWorker
+from app.livekit.protocol import AgentPacket, MsgType
+
+class FakeTTS:
+    def __init__(self):
+        self.calls = []
+    def synthesize(self, text):
+        self.calls.append(text)
+        async def frames():
+            for _ in range(3):
+                yield SimpleNamespace(frame=SimpleNamespace(data=b"\x00\x00"))
+        return frames()
+
+def packet(type, turn_id, **payload):
+    msg = AgentPacket(type=type, session_id="s1", turn_id=turn_id, payload=payload)
+    return SimpleNamespace(data=msg.model_dump_json().encode("utf-8"), participant=None)
+
+@pytest.fixture
+def worker():
+    with patch("app.livekit.speaker_worker.rtc"):
+        w = SpeakerWorker("bob")
+    w.tts = FakeTTS()
+    w.audio_source = MagicMock()
+    w.audio_source.capture_frame = AsyncMock()
+    w.room = MagicMock()
+    w.room.local_participant.publish_data = AsyncMock()
+    return w
+
+@pytest.mark.asyncio
+async def test_speak_plays_prepared_audio(worker):
+    worker.on_data_received(packet(MsgType.PREPARE_CMD, "t1", text="Hi.", speaker_id="bob", state_version=1))
+    await asyncio.sleep(0.01)
+    assert worker.tts.calls == ["Hi."]
+
+    worker.on_data_received(packet(MsgType.SPEAK_CMD, "t1", text="Hi.", speaker_id="bob"))
+    await worker.speak_task
+
+    # Played from the buffer: nothing synthesized again
+    assert worker.tts.calls == ["Hi."]
+    assert worker.audio_source.capture_frame.await_count == 3
+    done = json.loads(worker.room.local_participant.publish_data.call_args.args[0])
+    assert done["type"] == MsgType.PLAYBACK_DONE
+    assert done["payload"]["first_audio_ms"] is not None
+    assert worker.prepared == {}
+
+@pytest.mark.asyncio
+async def test_stale_prepared_audio_is_dropped(worker):
+    worker.on_data_received(packet(MsgType.PREPARE_CMD, "t1", text="Old.", speaker_id="bob", state_version=1))
+    worker.on_data_received(packet(MsgType.PREPARE_CMD, "t2", text="New.", speaker_id="bob", state_version=3))
+    worker.on_data_received(packet(MsgType.PREPARE_DROP, None, state_version=2))
+    assert list(worker.prepared) == ["t2"]
+
+    # Another speaker's turn makes the rest moot
+    worker.on_data_received(packet(MsgType.SPEAK_CMD, "t3", text="Me.", speaker_id="alice"))
+    assert worker.prepared == {}
+
+@pytest.mark.asyncio
+async def test_prepared_audio_dropped_by_turn(worker):
+    worker.on_data_received(packet(MsgType.PREPARE_CMD, "t1", text="A.", speaker_id="bob", state_version=1))
+    worker.on_data_received(packet(MsgType.PREPARE_CMD, "t2", text="B.", speaker_id="bob", state_version=1))
+    worker.on_data_received(packet(MsgType.PREPARE_DROP, None, turn_ids=["t1"]))
+    assert list(worker.prepared) == ["t2"]
@@ -0,0 +1,143 @@
+import pytest
+from app.domain.services.transcript_resolver import TranscriptResolver
+from app.domain.services.transcript_cache import TranscriptCache, BranchSegment
+from app.domain.rows import UtteranceRow
+
+class MockRepo:
+    def __init__(self):
+        self.store = {}
+        self.calls = 0
+    async def get(self, id):
+        return self.store.get(id)
+
+class MockSessionRepo(MockRepo):
+    pass
+
+class MockBranchRepo(MockRepo):
+    pass
+
+class MockUtteranceRepo(MockRepo):
+    async def get_by_branches(self, session_id, branch_ids):
+        self.calls += 1
+        utts = [u for u in self.store.values() if u["branch_id"] in branch_ids]
+        return sorted(utts, key=lambda x: x.get("seq_in_branch", 0))
+    async def get_by_branch_after(self, session_id, branch_id, after_seq):
+        self.calls += 1
+        utts = [u for u in self.store.values() if u["branch_id"] == branch_id and u["seq_in_branch"] > after_seq]
+        return sorted(utts, key=lambda x: x["seq_in_branch"])
+
+def make_resolver(cache):
+    sess_repo = MockSessionRepo()
+    br_repo = MockBranchRepo()
+    utt_repo = MockUtteranceRepo()
+    sess_repo.store["s1"] = {"_id": "s1", "write_version": 0}
+    br_repo.store["root"] = {"_id": "root", "ancestry": [{"branch_id": "root", "fork_from_utterance_id": None}]}
+    br_repo.store["br1"] = {"_id": "br1", "parent_branch_id": "root", "fork_from_utterance_id": "u1", "ancestry": [
+        {"branch_id": "root", "fork_from_utterance_id": None},
+        {"branch_id": "br1", "fork_from_utterance_id": "u1"},
+    ]}
+    utt_repo.store["u1"] = {"_id": "u1", "branch_id": "root", "kind": "seed", "seed_idx": 1, "seq_in_branch": 1, "text": "a"}
+    utt_repo.store["u2"] = {"_id": "u2", "branch_id": "root", "kind": "seed", "seed_idx": 2, "seq_in_branch": 2, "text": "b"}
+    return TranscriptResolver(br_repo, utt_repo, sess_repo, cache), sess_repo, utt_repo
+
+@pytest.mark.asyncio
+async def test_cache_hit_on_same_write_version():
+    cache = TranscriptCache(max_bytes=1_000_000)
+    resolver, _, utt_repo = make_resolver(cache)
+
+    v1 = await resolver.get_transcript_view("s1", "br1")
+    v2 = await resolver.get_transcript_view("s1", "br1")
+
+    assert [u.display_id for u in v1.utterances] == [u.display_id for u in v2.utterances] == ["1"]
+    assert utt_repo.calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_cache_extends_incrementally_after_write():
+    cache = TranscriptCache(max_bytes=1_000_000)
+    resolver, sess_repo, utt_repo = make_resolver(cache)
+
+    await resolver.get_transcript_view("s1", "br1")
+
+    # Simulate ConductorWriter appending to br1 and bumping write_version
+    utt_repo.store["u3"] = {"_id": "u3", "branch_id": "br1", "kind": "ai", "seq_in_branch": 1, "text": "c"}
+    sess_repo.store["s1"]["write_version"] = 1
+
+    view = await resolver.get_transcript_view("s1", "br1")
+
+    assert [u.display_id for u in view.utterances] == ["1", "1.1"]
+    assert cache.stats()["extensions"] == 1
+    # Full resolve + tail fetch only; root's prefix already covers the fork point
+    assert utt_repo.calls == 2
+
+    # Returned views never alias the cached segments
+    view.utterances.clear()
+    again = await resolver.get_transcript_view("s1", "br1")
+    assert len(again.utterances) == 2
+
+@pytest.mark.asyncio
+async def test_forks_share_prefix_segments():
+    cache = TranscriptCache(max_bytes=1_000_000)
+    resolver, _, utt_repo = make_resolver(cache)
+    br_repo = resolver.branch_repo
+
+    await resolver.get_transcript_view("s1", "br1")
+    assert utt_repo.calls == 1
+
+    # Many forks off the same point: each only loads its own (empty) segment
+    for i in range(50):
+        br_repo.store[f"f{i}"] = {"_id": f"f{i}", "parent_branch_id": "root", "fork_from_utterance_id": "u1", "ancestry": [
+            {"branch_id": "root", "fork_from_utterance_id": None},
+            {"branch_id": f"f{i}", "fork_from_utterance_id": "u1"},
+        ]}
+        view = await resolver.get_transcript_view("s1", f"f{i}")
+        assert [u.display_id for u in view.utterances] == ["1"]
+
+    stats = cache.stats()
+    assert stats["segments"] == 52
+    # Memory follows unique utterances, not branches x length
+    assert stats["utterances"] == 2
+    # View models are built once per utterance and shared too
+    root_row = cache.get("s1", "root").utterances[0]
+    assert view.utterances[0] is root_row.to_view()
+
+def test_cache_evicts_lru_by_bytes():
+    cache = TranscriptCache(max_bytes=1000)
+
+    for b in ["b1", "b2", "b3"]:
+        segment = BranchSegment(branch_id=b, parent_fork_disp=None, write_version=0)
+        segment.append(UtteranceRow.from_doc({"_id": "u", "seq_in_branch": 1, "kind": "ai", "text": "x" * 100}, "1"))
+        cache.put("s1", segment)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["evictions"] >= 1
+    assert cache.get("s1", "b1") is None
+    assert cache.get("s1", "b3") is not None
+
+def test_unbounded_cache_never_evicts():
+    cache = TranscriptCache(max_bytes=None)
+
+    for i in range(20):
+        segment = BranchSegment(branch_id=f"b{i}", parent_fork_disp=None, write_version=0)
+        segment.append(UtteranceRow.from_doc({"_id": "u", "seq_in_branch": 1, "kind": "ai", "text": "x" * 10_000}, "1"))
+        cache.put("s1", segment)
+
+    assert cache.stats()["segments"] == 20
+    assert cache.stats()["evictions"] == 0
+
+@pytest.mark.asyncio
+async def test_cache_reloads_after_utterances_taken_back():
+    cache = TranscriptCache(max_bytes=1_000_000)
+    resolver, sess_repo, utt_repo = make_resolver(cache)
+    utt_repo.store["u3"] = {"_id": "u3", "branch_id": "root", "kind": "ai", "seq_in_branch": 3, "text": "c"}
+    await resolver.get_transcript_view("s1", "root")
+
+    # A failed batch is undone and its seq reused by the next turn
+    del utt_repo.store["u3"]
+    utt_repo.store["u3b"] = {"_id": "u3b", "branch_id": "root", "kind": "ai", "seq_in_branch": 3, "text": "d"}
+    sess_repo.store["s1"].update(write_version=2, trim_version=1)
+
+    view = await resolver.get_transcript_view("s1", "root")
+    assert [u.utterance_id for u in view.utterances] == ["u1", "u2", "u3b"]
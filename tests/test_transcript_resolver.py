@@ -4,12 +4,18 @@ from app.domain.services.transcript_resolver import TranscriptResolver
 class MockRepo:
     def __init__(self):
         self.store = {}
+        self.calls = 0
     async def get(self, id):
+        self.calls += 1
         return self.store.get(id)
     async def get_by_branch(self, session_id, branch_id):
         # Return sorted by seq_in_branch
         utts = [u for u in self.store.values() if u["branch_id"] == branch_id]
         return sorted(utts, key=lambda x: x.get("seq_in_branch", 0))
+    async def get_by_branches(self, session_id, branch_ids):
+        self.calls += 1
+        utts = [u for u in self.store.values() if u["branch_id"] in branch_ids]
+        return sorted(utts, key=lambda x: x.get("seq_in_branch", 0))
 
 class MockBranchRepo(MockRepo):
     pass
@@ -56,3 +62,34 @@ async def test_transcript_resolver():
     ids1 = [u.display_id for u in view1.utterances]
     # Expected: 1, 2, 2.1, 2.2
     assert ids1 == ["1", "2", "2.1", "2.2"]
+
+
+@pytest.mark.asyncio
+async def test_transcript_resolver_uses_ancestry():
+    br_repo = MockBranchRepo()
+    utt_repo = MockUtteranceRepo()
+    resolver = TranscriptResolver(br_repo, utt_repo)
+
+    # Only the target branch is needed when the ancestry path is materialized
+    br_repo.store["br2"] = {
+        "_id": "br2", "parent_branch_id": "br1", "fork_from_utterance_id": "utt_2_1",
+        "ancestry": [
+            {"branch_id": "root", "fork_from_utterance_id": None},
+            {"branch_id": "br1", "fork_from_utterance_id": "utt_2"},
+            {"branch_id": "br2", "fork_from_utterance_id": "utt_2_1"},
+        ]
+    }
+
+    utt_repo.store["utt_1"] = {"_id": "utt_1", "branch_id": "root", "kind": "seed", "seed_idx": 1, "seq_in_branch": 1}
+    utt_repo.store["utt_2"] = {"_id": "utt_2", "branch_id": "root", "kind": "seed", "seed_idx": 2, "seq_in_branch": 2}
+    utt_repo.store["utt_3"] = {"_id": "utt_3", "branch_id": "root", "kind": "seed", "seed_idx": 3, "seq_in_branch": 3}
+    utt_repo.store["utt_2_1"] = {"_id": "utt_2_1", "branch_id": "br1", "kind": "ai", "seq_in_branch": 1}
+    utt_repo.store["utt_2_2"] = {"_id": "utt_2_2", "branch_id": "br1", "kind": "ai", "seq_in_branch": 2}
+    utt_repo.store["utt_2_1_1"] = {"_id": "utt_2_1_1", "branch_id": "br2", "kind": "ai", "seq_in_branch": 1}
+
+    view = await resolver.get_transcript_view("s1", "br2")
+
+    assert [u.display_id for u in view.utterances] == ["1", "2", "2.1", "2.1.1"]
+    # One branch get + one utterance query, regardless of depth
+    assert br_repo.calls == 1
+    assert utt_repo.calls == 1
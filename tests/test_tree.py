@@ -5,13 +5,18 @@ from app.domain.schemas import BranchOut
 class MockRepo:
     def __init__(self):
         self.store = {}
-    async def list_by_session(self, session_id):
+    async def list_by_session(self, session_id, projection=None):
         return [d for d in self.store.values() if d["session_id"] == session_id]
 
 class MockBranchRepo(MockRepo):
     pass
 class MockSessionRepo(MockRepo):
-    pass
+    branches_version = 0
+    async def bump_branches_version(self, session_id):
+        self.branches_version += 1
+        return self.branches_version
+    async def get_branches_version(self, session_id):
+        return self.branches_version
 
 @pytest.mark.asyncio
 async def test_tree_reconstruction():
@@ -42,3 +47,83 @@ async def test_tree_reconstruction():
     assert "b1" in children["root"]
     assert "b2" in children["b1"]
     assert node_map["b1"].created_at == "200"
+
+@pytest.mark.asyncio
+async def test_tree_index_built_once_and_updated_on_fork():
+    from app.domain.services.branch_tree import BranchTreeRegistry
+    
+    class CountingBranchRepo(MockBranchRepo):
+        calls = 0
+        async def list_by_session(self, session_id, projection=None):
+            self.calls += 1
+            return await super().list_by_session(session_id)
+        async def get(self, id):
+            return self.store.get(id)
+        async def create(self, doc):
+            self.store[doc["_id"]] = doc
+            return doc
+    
+    br_repo = CountingBranchRepo()
+    vc = VersionControl(br_repo, MockSessionRepo(), BranchTreeRegistry(max_sessions=4))
+    
+    br_repo.store["root"] = {"_id": "root", "session_id": "s1", "branch_label": "main", "created_at": "100"}
+    br_repo.store["b1"] = {"_id": "b1", "session_id": "s1", "parent_branch_id": "root", "fork_from_utterance_id": "u1", "branch_label": "b1", "created_at": "200"}
+    
+    tree = await vc.get_tree("s1")
+    assert tree.roots == ["root"]
+    assert tree.nodes["b1"].depth == 1
+    
+    res = await vc.fork_branch("s1", "b1", "u2", None, "user")
+    tree = await vc.get_tree("s1")
+    assert br_repo.calls == 1
+    assert tree.nodes["b1"].children == [res.branch_id]
+    assert tree.nodes[res.branch_id].depth == 2
+    assert [n.branch_id for n in tree.ancestry(res.branch_id)] == ["root", "b1", res.branch_id]
+    
+    out = await vc.get_session_tree("s1", {"root": 5, res.branch_id: 2})
+    counts = {b.branch_id: b.utterance_count for b in out.branches}
+    assert counts == {"root": 5, "b1": 0, res.branch_id: 2}
+    assert out.root_branch_ids == ["root"]
+
+@pytest.mark.asyncio
+async def test_utterance_count_by_branch(mock_db):
+    from app.db.repos.utterance import UtteranceRepo
+    
+    await mock_db["utterances"].insert_many([
+        {"_id": "u1", "session_id": "s1", "branch_id": "root"},
+        {"_id": "u2", "session_id": "s1", "branch_id": "root"},
+        {"_id": "u3", "session_id": "s1", "branch_id": "b1"},
+        {"_id": "u4", "session_id": "s2", "branch_id": "other"},
+    ])
+    
+    assert await UtteranceRepo().count_by_branch("s1") == {"root": 2, "b1": 1}
+
+@pytest.mark.asyncio
+async def test_tree_index_rebuilt_after_fork_in_another_process():
+    from app.domain.services.branch_tree import BranchTreeRegistry
+    
+    class CountingBranchRepo(MockBranchRepo):
+        calls = 0
+        async def list_by_session(self, session_id, projection=None):
+            self.calls += 1
+            return await super().list_by_session(session_id)
+        async def get(self, id):
+            return self.store.get(id)
+        async def create(self, doc):
+            self.store[doc["_id"]] = doc
+            return doc
+    
+    br_repo, sess_repo = CountingBranchRepo(), MockSessionRepo()
+    api = VersionControl(br_repo, sess_repo, BranchTreeRegistry(max_sessions=4))
+    host = VersionControl(br_repo, sess_repo, BranchTreeRegistry(max_sessions=4))
+    br_repo.store["root"] = {"_id": "root", "session_id": "s1", "branch_label": "main", "created_at": "100"}
+    
+    await api.get_tree("s1")
+    await api.get_tree("s1")
+    assert br_repo.calls == 1
+    
+    # The conductor host forks; the API's cached tree no longer matches
+    res = await host.fork_branch("s1", "root", "u1", None, "user")
+    tree = await api.get_tree("s1")
+    assert br_repo.calls == 2
+    assert tree.nodes["root"].children == [res.branch_id]